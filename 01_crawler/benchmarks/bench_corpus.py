@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark one-.txt-file-per-article output against the sharded corpus.
+
+For each dataset size, measures writing every article (temp file + rename
+per article vs. appending to shards), loading every text back (glob + sort
++ open per file vs. sequential shard reads) and random access to single
+articles by id (path lookup + open vs. mmap through the offset index,
+including loading the index). It first checks that convert_tree resolves
+the old {category}_{n:04d}.txt names against a database from before
+dataset slots were recorded, and that 02_text_representation reads back
+the records written here. The .txt tree is written last, since
+creating that many files slows down later measurements on some file
+systems.
+
+Usage (from 01_crawler/):
+    python -m benchmarks.bench_corpus --sizes 10000 100000
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_db import create_legacy_dataset
+from benchmarks.mock_server import build_article
+from src.corpus import CorpusWriter, CorpusReader, convert_tree
+from src.database import DatabaseManager
+from src.extractors import get_extractor
+
+
+CATEGORIES = ['thoisu', 'kinhte', 'congnghe']
+# Reader của 02_text_representation, dùng chung định dạng với src/corpus.py
+TEXT_REPRESENTATION_READER = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                          '02_text_representation', 'src', 'corpus_reader.py')
+
+
+def make_articles(n_articles):
+    """Build n article texts (a few distinct bodies reused to keep setup fast)."""
+    extractor = get_extractor('lxml')
+    bodies = [extractor.extract(build_article('thoisu', i).encode('utf-8')) for i in range(50)]
+    return [(i + 1, CATEGORIES[i % len(CATEGORIES)], bodies[i % len(bodies)]) for i in range(n_articles)]
+
+
+def write_txt(data_dir, articles):
+    for category in CATEGORIES:
+        os.makedirs(os.path.join(data_dir, 'train', category), exist_ok=True)
+    for article_id, category, text in articles:
+        path = os.path.join(data_dir, 'train', category, f"{category}_{article_id:06d}.txt")
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(path + '.tmp', path)
+
+
+def write_corpus(corpus_dir, articles, compress):
+    writer = CorpusWriter(corpus_dir, 'bench', compress)
+    for article_id, category, text in articles:
+        writer.append(article_id, category, 'train', '', text)
+    writer.close()
+
+
+def load_txt(data_dir):
+    texts = []
+    for category in CATEGORIES:
+        for path in sorted((Path(data_dir) / 'train' / category).glob('*.txt')):
+            with open(path, 'r', encoding='utf-8') as f:
+                texts.append(f.read().strip())
+    return texts
+
+
+def load_corpus(corpus_dir):
+    reader = CorpusReader(corpus_dir)
+    return [record['text'].strip() for record in reader.iter_records(split='train')]
+
+
+def random_txt(data_dir, articles, sample):
+    for article_id, category, _ in sample:
+        path = os.path.join(data_dir, 'train', category, f"{category}_{article_id:06d}.txt")
+        with open(path, 'r', encoding='utf-8') as f:
+            f.read()
+
+
+def random_corpus(corpus_dir, sample):
+    reader = CorpusReader(corpus_dir)
+    for article_id, _, _ in sample:
+        reader.get(article_id)
+    reader.close()
+
+
+def check_legacy_conversion(root):
+    """
+    Check that convert_tree resolves old index-based names against a database from before slots were recorded.
+    
+    Raises:
+        AssertionError: If an article is missing or has the wrong id
+    """
+    db_file, data_dir = create_legacy_dataset(root)
+    corpus_dir = os.path.join(root, 'legacy_corpus')
+    with DatabaseManager(db_file) as db:
+        stats = convert_tree(data_dir, corpus_dir, db=db)
+    assert stats == {'converted': 3, 'skipped': 0, 'unmatched': 0}, f"convert_tree returned {stats}"
+    
+    reader = CorpusReader(corpus_dir)
+    for article_id, split in ((1, 'train'), (2, 'train'), (4, 'test')):
+        record = reader.get(article_id)
+        assert record is not None and record['split'] == split and record['text'] == f"Nội dung bài {article_id}", \
+            f"Wrong record for article {article_id}: {record}"
+        assert record['url'] == f"https://thanhnien.vn/cu-{article_id}.htm", f"Wrong URL: {record['url']}"
+    reader.close()
+
+
+def check_text_representation_reader(root):
+    """
+    Check that 02_text_representation reads back what CorpusWriter writes, plain and gzip-compressed.
+    
+    Raises:
+        AssertionError: If a record differs
+    """
+    # Cả hai project đều đặt tên package là src: nạp reader theo đường dẫn
+    spec = importlib.util.spec_from_file_location('text_representation_corpus_reader', TEXT_REPRESENTATION_READER)
+    reader_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(reader_module)
+    
+    articles = [(i, CATEGORIES[i % len(CATEGORIES)], 'train' if i % 4 else 'test', f"Bài {i}: nội dung có dấu")
+                for i in range(1, 21)]
+    for compress in (False, True):
+        corpus_dir = os.path.join(root, f"roundtrip_{int(compress)}")
+        writer = CorpusWriter(corpus_dir, 'check', compress)
+        for article_id, category, split, text in articles:
+            writer.append(article_id, category, split, f"https://thanhnien.vn/{article_id}.htm", text)
+        # Ghi lại một bài (như khi extract lại): bản mới nhất phải được đọc
+        writer.append(5, articles[4][1], articles[4][2], "https://thanhnien.vn/5.htm", "Bài 5 đã extract lại")
+        writer.close()
+        
+        corpus = reader_module.ShardedCorpus(corpus_dir)
+        expected = {article_id: text for article_id, _, _, text in articles}
+        expected[5] = "Bài 5 đã extract lại"
+        assert corpus.ids() == set(expected), f"Wrong ids read back: {sorted(corpus.ids())}"
+        for article_id, category, split, _ in articles:
+            record = corpus.get(article_id)
+            assert (record['category'], record['split'], record['text']) == (category, split, expected[article_id]), \
+                f"Wrong record for article {article_id}: {record}"
+        train = sorted(record['id'] for record in corpus.iter_records('train', 'thoisu'))
+        assert train == [i for i, category, split, _ in articles if (category, split) == ('thoisu', 'train')], \
+            f"Wrong train/thoisu records: {train}"
+        corpus.close()
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark .txt files vs. sharded corpus')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000],
+                        help='Number of articles to test')
+    parser.add_argument('--random-reads', type=int, default=1000,
+                        help='Number of random reads by id')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        check_legacy_conversion(tmp_dir)
+        check_text_representation_reader(tmp_dir)
+        
+    print("="*86)
+    print(f"{'Articles':>10} {'Format':<14} {'Write (s)':>10} {'Load (s)':>10} "
+          f"{'Random (ms/op)':>15} {'Files':>8} {'Size (MB)':>10}")
+    print("-"*86)
+    
+    for n_articles in args.sizes:
+        articles = make_articles(n_articles)
+        sample = random.Random(0).sample(articles, min(args.random_reads, n_articles))
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            modes = [
+                ('corpus', os.path.join(tmp_dir, 'corpus')),
+                ('corpus-gzip', os.path.join(tmp_dir, 'corpus_gz')),
+                ('txt', os.path.join(tmp_dir, 'txt')),
+            ]
+            for mode, path in modes:
+                if mode == 'txt':
+                    _, write = timed(lambda: write_txt(path, articles))
+                    os.sync()
+                    texts, load = timed(lambda: load_txt(path))
+                    _, random_time = timed(lambda: random_txt(path, articles, sample))
+                else:
+                    _, write = timed(lambda: write_corpus(path, articles, mode == 'corpus-gzip'))
+                    os.sync()
+                    texts, load = timed(lambda: load_corpus(path))
+                    _, random_time = timed(lambda: random_corpus(path, sample))
+                # Đẩy dirty page của lần ghi trước ra đĩa để không ảnh hưởng phép đo tiếp theo
+                os.sync()
+                
+                files = [os.path.join(root, name) for root, _, names in os.walk(path) for name in names]
+                size = sum(os.path.getsize(name) for name in files)
+                assert len(texts) == n_articles
+                print(f"{n_articles:>10} {mode:<14} {write:>10.2f} {load:>10.2f} "
+                      f"{random_time * 1000 / len(sample):>15.3f} {len(files):>8} {size / 2**20:>10.1f}")
+                      
+    print("="*86)
+
+
+if __name__ == "__main__":
+    main()
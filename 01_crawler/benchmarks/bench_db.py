@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of crawl-state updates on a large articles table.
+
+Compares the old connect/commit/close-per-call pattern with the persistent
+WAL connection and batched write-behind queue of DatabaseManager. Before
+measuring, it checks that insert_articles still returns correct
+(new, duplicate) counts with the change_seq triggers installed, and that
+the used articles of a database from before dataset slots were recorded
+get the slots of their {category}_{n:04d}.txt files.
+
+Usage (from 01_crawler/):
+    python -m benchmarks.bench_db --rows 1000000 --updates 5000
+"""
+
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from src.database import DatabaseManager
+
+
+def create_table(db_file, n_rows):
+    """Create and fill the articles table with n_rows synthetic rows."""
+    with DatabaseManager(db_file):
+        pass
+        
+    conn = sqlite3.connect(db_file)
+    rows = (
+        (f"https://thanhnien.vn/bai-viet-{i}.htm", f"Bài viết {i}", 'thoisu', '', '', '')
+        for i in range(n_rows)
+    )
+    with conn:
+        conn.executemany('''
+            INSERT INTO articles (url, title, category, published_date, description, collected_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+    conn.close()
+
+
+def check_insert_counts(db_file):
+    """
+    Check that insert_articles returns (new, duplicate) counts, even with the change_seq triggers.
+    
+    Raises:
+        AssertionError: If a count is wrong
+    """
+    def articles(start, stop):
+        return [{'url': f"https://thanhnien.vn/kiem-tra-{i}.htm", 'title': f"Bài {i}", 'category': 'thoisu',
+                 'published_date': '', 'description': '', 'collected_at': ''} for i in range(start, stop)]
+                 
+    with DatabaseManager(db_file) as db:
+        for batch, expected in ((articles(0, 5), (5, 0)), (articles(0, 6), (1, 5)), (articles(0, 6), (0, 6))):
+            counts = db.insert_articles(batch)
+            assert counts == expected, f"insert_articles returned {counts}, expected {expected}"
+
+
+def create_legacy_dataset(root):
+    """
+    Create a database and .txt tree as written before dataset slots were recorded.
+    
+    The table has the original columns only. Articles 1, 2 and 4 of thoisu
+    are used: 1 and 2 as train/thoisu/thoisu_0001.txt and _0002.txt, 4 as
+    test/thoisu/thoisu_0001.txt; article 3 was crawled but not saved.
+    
+    Returns:
+        Tuple (db_file, data_dir)
+    """
+    db_file = os.path.join(root, 'legacy_dataset.db')
+    data_dir = os.path.join(root, 'legacy_data')
+    conn = sqlite3.connect(db_file)
+    with conn:
+        conn.execute('''
+            CREATE TABLE articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE NOT NULL,
+                title TEXT,
+                category TEXT NOT NULL,
+                published_date TEXT,
+                description TEXT,
+                collected_at TEXT,
+                crawled INTEGER DEFAULT 0,
+                used_in_dataset INTEGER DEFAULT 0
+            )
+        ''')
+        conn.executemany(
+            'INSERT INTO articles (url, title, category, crawled, used_in_dataset) VALUES (?, ?, ?, ?, ?)',
+            [(f"https://thanhnien.vn/cu-{i}.htm", f"Bài {i}", 'thoisu', int(i <= 4), int(i in (1, 2, 4)))
+             for i in range(1, 6)]
+        )
+    conn.close()
+    
+    for split, index, article_id in (('train', 1, 1), ('train', 2, 2), ('test', 1, 4)):
+        os.makedirs(os.path.join(data_dir, split, 'thoisu'), exist_ok=True)
+        with open(os.path.join(data_dir, split, 'thoisu', f"thoisu_{index:04d}.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"Nội dung bài {article_id}")
+    return db_file, data_dir
+
+
+def check_legacy_slots(root):
+    """
+    Check that used articles of an old database get the slots of their index-based files.
+    
+    Raises:
+        AssertionError: If a slot or count is wrong
+    """
+    db_file, data_dir = create_legacy_dataset(root)
+    with DatabaseManager(db_file) as db:
+        assigned = db.assign_legacy_slots(data_dir)
+        assert assigned == 3, f"assign_legacy_slots gave {assigned} slots, expected 3"
+        slots = [row[3:] for row in db.iter_used_articles()]
+        assert slots == [('train', 1), ('train', 2), ('test', 1)], f"Wrong legacy slots: {slots}"
+        counts = (db.count_used('thoisu', 'train'), db.count_used('thoisu', 'test'))
+        assert counts == (2, 1), f"count_used returned {counts}, expected (2, 1)"
+        assert db.assign_legacy_slots(data_dir) == 0, "Legacy slots assigned twice"
+
+
+def legacy_mark(db_file, sql, article_id):
+    """Old pattern: one connection, statement and commit per update."""
+    conn = sqlite3.connect(db_file)
+    cursor = conn.cursor()
+    cursor.execute(sql, (article_id,))
+    conn.commit()
+    conn.close()
+
+
+def bench_legacy(db_file, ids):
+    start = time.perf_counter()
+    for article_id in ids:
+        legacy_mark(db_file, 'UPDATE articles SET crawled = 1 WHERE id = ?', article_id)
+        legacy_mark(db_file, 'UPDATE articles SET used_in_dataset = 1 WHERE id = ?', article_id)
+    return 2 * len(ids) / (time.perf_counter() - start)
+
+
+def bench_batched(db_file, ids):
+    start = time.perf_counter()
+    with DatabaseManager(db_file) as db:
+        for article_id in ids:
+            db.mark_as_crawled(article_id)
+            db.mark_as_used(article_id)
+    # Bao gồm cả thời gian drain hàng đợi khi close
+    return 2 * len(ids) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark DatabaseManager state updates')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Rows in the articles table')
+    parser.add_argument('--updates', type=int, default=5000, help='Articles to mark per run')
+    args = parser.parse_args()
+    
+    logging.getLogger('ThanhNienCrawler').setLevel(logging.WARNING)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        check_insert_counts(os.path.join(tmp_dir, 'check.db'))
+        check_legacy_slots(tmp_dir)
+        
+        legacy_db = os.path.join(tmp_dir, 'legacy.db')
+        batched_db = os.path.join(tmp_dir, 'batched.db')
+        
+        print(f"Creating tables with {args.rows} rows...")
+        create_table(legacy_db, args.rows)
+        # Bảng legacy dùng rollback journal mặc định như trước
+        conn = sqlite3.connect(legacy_db)
+        conn.execute('PRAGMA journal_mode=DELETE')
+        conn.close()
+        create_table(batched_db, args.rows)
+        
+        ids = random.sample(range(1, args.rows + 1), min(args.updates, args.rows))
+        
+        legacy_rate = bench_legacy(legacy_db, ids)
+        batched_rate = bench_batched(batched_db, ids)
+        
+    print("="*60)
+    print(f"State updates on {args.rows} rows ({2 * len(ids)} updates)")
+    print("="*60)
+    print(f"{'Connect/commit per call':<30} {legacy_rate:>12.0f} updates/sec")
+    print(f"{'Persistent WAL + batching':<30} {batched_rate:>12.0f} updates/sec")
+    print(f"{'Speedup':<30} {batched_rate / legacy_rate:>12.1f}x")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
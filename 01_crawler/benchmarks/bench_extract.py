@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark article extraction backends on a fixture set of saved pages.
+
+Fixtures are read from a directory of .html files, from the page archive,
+or generated synthetically. Each backend runs in a fresh process so its
+peak RSS can be measured; outputs are checked against the reference
+'soup' backend.
+
+Usage (from 01_crawler/):
+    python -m benchmarks.bench_extract --synthetic 500
+    python -m benchmarks.bench_extract --pages-dir fixtures/
+    python -m benchmarks.bench_extract --archive archive/ --limit 2000
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sqlite3
+import time
+from pathlib import Path
+
+from benchmarks.mock_server import build_article
+from src.extractors import EXTRACTORS, get_extractor
+from src.page_archive import read_record
+
+
+def load_fixtures(args):
+    """
+    Load fixture pages as raw bytes.
+    
+    Returns:
+        List of page bodies
+    """
+    if args.pages_dir:
+        paths = sorted(Path(args.pages_dir).glob('*.htm*'))[:args.limit]
+        return [path.read_bytes() for path in paths]
+    
+    if args.archive:
+        conn = sqlite3.connect(os.path.join(args.archive, 'index.db'))
+        rows = conn.execute('SELECT segment, offset, length FROM records LIMIT ?', (args.limit,)).fetchall()
+        conn.close()
+        return [read_record(os.path.join(args.archive, segment), offset, length)[2]
+                for segment, offset, length in rows]
+    
+    return [build_article('thoisu', i, n_paragraphs=25, n_boilerplate=60).encode('utf-8')
+            for i in range(args.synthetic)]
+
+
+def run_backend(name, args, queue):
+    """Run one backend over all fixtures (in a child process) and report results."""
+    pages = load_fixtures(args)
+    extractor = get_extractor(name)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    
+    start = time.perf_counter()
+    outputs = [extractor.extract(page) for page in pages]
+    elapsed = time.perf_counter() - start
+    
+    # ru_maxrss tính bằng KB trên Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((name, len(pages) / elapsed, peak_rss, peak_rss - baseline_rss, outputs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark article extraction backends')
+    parser.add_argument('--pages-dir', help='Directory of saved .html pages')
+    parser.add_argument('--archive', help='Page archive directory (ARCHIVE_DIR)')
+    parser.add_argument('--synthetic', type=int, default=500, help='Number of synthetic pages')
+    parser.add_argument('--limit', type=int, default=5000, help='Maximum pages to load')
+    parser.add_argument('--backends', nargs='+', default=list(EXTRACTORS), choices=list(EXTRACTORS))
+    args = parser.parse_args()
+    
+    # Mỗi backend chạy trong process mới để đo peak RSS độc lập
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for name in args.backends:
+        queue = context.Queue()
+        process = context.Process(target=run_backend, args=(name, args, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        results[name] = result
+    
+    reference = results.get('soup', next(iter(results.values())))[4]
+    
+    print("="*80)
+    print(f"Extraction benchmark: {len(reference)} pages")
+    print("="*80)
+    print(f"{'Backend':<12} {'Pages/sec':>12} {'Peak RSS (MB)':>15} {'RSS growth (MB)':>17} {'Mismatches':>12}")
+    print("-"*80)
+    for name, (_, pages_per_sec, peak_rss, growth, outputs) in results.items():
+        mismatches = sum(1 for a, b in zip(outputs, reference) if a != b)
+        print(f"{name:<12} {pages_per_sec:>12.1f} {peak_rss / 1024:>15.1f} {growth / 1024:>17.1f} {mismatches:>12}")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    main()
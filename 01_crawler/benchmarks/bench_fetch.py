@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent article fetching against the local mock server.
+
+Usage (from 01_crawler/):
+    python -m benchmarks.bench_fetch --articles 200 --latency 0.05
+    python -m benchmarks.bench_fetch --related-blocks 50 --no-stream
+    python -m benchmarks.bench_fetch --related-blocks 50 --no-archive
+
+Pages are read to the end while they are archived, so the bytes saved by
+STREAM_EARLY_ABORT only show with --no-archive.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import config
+from benchmarks.mock_server import start_server
+
+
+def run_once(base_url, workers, n_articles, rate):
+    """
+    Crawl n_articles from the mock server with a given worker count.
+    
+    Returns:
+        Tuple (articles per second, MB read, MB not downloaded)
+    """
+    from src import ArticleCrawler, DatabaseManager
+    from src.metrics import metrics
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config.OUTPUT_DIR = os.path.join(tmp_dir, 'out')
+        config.DB_FILE = os.path.join(tmp_dir, 'urls.db')
+        config.ARCHIVE_DIR = os.path.join(tmp_dir, 'archive')
+        config.DEDUP_INDEX_FILE = os.path.join(tmp_dir, 'lsh.db')
+        config.RATE_LIMIT_PER_HOST = rate
+        
+        db = DatabaseManager()
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for i in range(1, n_articles + 1):
+            db.insert_article({
+                'url': f"{base_url}/thoisu/article-{i}.htm",
+                'title': f"Article {i}",
+                'category': 'thoisu',
+                'published_date': now,
+                'description': '',
+                'collected_at': now,
+            })
+            
+        crawler = ArticleCrawler(max_workers=workers)
+        metrics.reset()
+        start = time.perf_counter()
+        count = crawler.crawl_category('thoisu', 'train', target_count=n_articles)
+        elapsed = time.perf_counter() - start
+        
+    rate = count / elapsed if elapsed > 0 else 0.0
+    return (rate, metrics.total('crawler_fetch_bytes_total') / 2**20,
+            metrics.total('crawler_fetch_bytes_saved_total') / 2**20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent article fetching')
+    parser.add_argument('--articles', '-n', type=int, default=200, help='Articles per run')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock server latency (seconds)')
+    parser.add_argument('--rate', type=float, default=0, help='Per-host rate limit (0 = unlimited)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16, 64], help='Worker counts to test')
+    parser.add_argument('--related-blocks', type=int, default=0, help='Related-news blocks after each article body')
+    parser.add_argument('--no-stream', action='store_true', help='Download whole bodies (STREAM_FETCH = False)')
+    parser.add_argument('--no-archive', action='store_true', help='Do not archive pages (ARCHIVE_ENABLED = False)')
+    args = parser.parse_args()
+    
+    logging.getLogger('ThanhNienCrawler').setLevel(logging.WARNING)
+    config.STREAM_FETCH = not args.no_stream
+    config.ARCHIVE_ENABLED = config.ARCHIVE_ENABLED and not args.no_archive
+    server, base_url = start_server(latency=args.latency, related_blocks=args.related_blocks)
+    
+    print("="*60)
+    print(f"Fetch benchmark: {args.articles} articles, latency {args.latency}s, rate {args.rate or 'unlimited'}, "
+          f"streaming {'off' if args.no_stream else 'on'}, archive {'on' if config.ARCHIVE_ENABLED else 'off'}")
+    print("="*60)
+    print(f"{'Workers':<10} {'Articles/sec':>15} {'MB read':>10} {'MB saved':>10}")
+    print("-"*60)
+    try:
+        for workers in args.workers:
+            rate, read_mb, saved_mb = run_once(base_url, workers, args.articles, args.rate)
+            print(f"{workers:<10} {rate:>15.2f} {read_mb:>10.2f} {saved_mb:>10.2f}")
+    finally:
+        server.shutdown()
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
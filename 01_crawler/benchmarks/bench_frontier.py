@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark uncrawled-frontier scans before and after the schema indexes.
+
+For each table size, measures on the legacy schema (no indexes, full scan +
+fetchall) and after DatabaseManager migrations (partial indexes + keyset
+pagination): time to get the first page, time to walk the whole frontier
+of one category, and peak Python memory of that walk.
+
+Usage (from 01_crawler/):
+    python -m benchmarks.bench_frontier --sizes 10000 1000000 10000000
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from src.database import DatabaseManager
+
+
+CATEGORIES = ['thoisu', 'kinhte', 'congnghe']
+
+LEGACY_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        url TEXT UNIQUE NOT NULL,
+        title TEXT,
+        category TEXT NOT NULL,
+        published_date TEXT,
+        description TEXT,
+        collected_at TEXT,
+        crawled INTEGER DEFAULT 0,
+        used_in_dataset INTEGER DEFAULT 0
+    )
+'''
+
+
+def create_legacy_db(db_file, n_rows, crawled_ratio):
+    """Create a legacy-schema database where the oldest rows are already crawled."""
+    conn = sqlite3.connect(db_file)
+    conn.execute(LEGACY_SCHEMA)
+    n_crawled = int(n_rows * crawled_ratio)
+    rows = (
+        (f"https://thanhnien.vn/bai-viet-{i}.htm", CATEGORIES[i % len(CATEGORIES)], int(i < n_crawled))
+        for i in range(n_rows)
+    )
+    with conn:
+        conn.executemany('INSERT INTO articles (url, category, crawled) VALUES (?, ?, ?)', rows)
+    conn.close()
+
+
+def measure(func):
+    """Run func and return (result, seconds, peak traced bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def bench_legacy(db_file, category, page_size):
+    conn = sqlite3.connect(db_file)
+    query = 'SELECT id, url, category FROM articles WHERE crawled = 0 AND category = ?'
+    
+    _, first_page, _ = measure(lambda: conn.execute(query + ' LIMIT ?', (category, page_size)).fetchall())
+    count, walk, peak = measure(lambda: len(conn.execute(query, (category,)).fetchall()))
+    conn.close()
+    return first_page, walk, peak, count
+
+
+def bench_indexed(db_file, category, page_size):
+    start = time.perf_counter()
+    db = DatabaseManager(db_file)
+    migrate = time.perf_counter() - start
+    
+    _, first_page, _ = measure(lambda: db.get_uncrawled_urls(category=category, limit=page_size))
+    count, walk, peak = measure(
+        lambda: sum(1 for _ in db.iter_uncrawled_urls(category=category, page_size=page_size))
+    )
+    db.close()
+    return first_page, walk, peak, count, migrate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark uncrawled frontier scans')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000],
+                        help='Table sizes to test')
+    parser.add_argument('--crawled-ratio', type=float, default=0.9,
+                        help='Fraction of rows already crawled')
+    parser.add_argument('--page-size', type=int, default=1000, help='Rows per page')
+    args = parser.parse_args()
+    
+    logging.getLogger('ThanhNienCrawler').setLevel(logging.WARNING)
+    category = 'kinhte'
+    
+    print("="*96)
+    print(f"{'Rows':>10} {'Mode':<10} {'First page (ms)':>16} {'Full walk (ms)':>16} "
+          f"{'Peak mem (MB)':>14} {'Frontier':>10} {'Migrate (s)':>12}")
+    print("-"*96)
+    
+    for n_rows in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_file = os.path.join(tmp_dir, 'frontier.db')
+            create_legacy_db(db_file, n_rows, args.crawled_ratio)
+            
+            first, walk, peak, count = bench_legacy(db_file, category, args.page_size)
+            print(f"{n_rows:>10} {'legacy':<10} {first * 1000:>16.2f} {walk * 1000:>16.2f} "
+                  f"{peak / 2**20:>14.2f} {count:>10} {'-':>12}")
+            
+            first, walk, peak, count, migrate = bench_indexed(db_file, category, args.page_size)
+            print(f"{n_rows:>10} {'indexed':<10} {first * 1000:>16.2f} {walk * 1000:>16.2f} "
+                  f"{peak / 2**20:>14.2f} {count:>10} {migrate:>12.2f}")
+    
+    print("="*96)
+
+
+if __name__ == "__main__":
+    main()
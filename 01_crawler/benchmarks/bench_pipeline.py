@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark of thanhnien_crawler.py against the mock server.
+
+Each run starts a fresh process in an empty working directory, points the
+RSS feeds at the local mock server and calls the pipeline's main() exactly
+as from the command line: in sequential mode twice (--collect-only, then
+--crawl-only), in pipelined mode once with --pipeline. Reports URLs/sec
+for collection, articles/sec for crawling (both over the total wall time
+in pipelined mode, where the stages overlap), total wall time, CPU time,
+CPU utilisation and peak RSS of the crawler process, plus the 429/500
+responses the mock server sent.
+
+Usage (from 01_crawler/):
+    python -m benchmarks.bench_pipeline --items 300 --latency 0.05 --workers 4 16
+    python -m benchmarks.bench_pipeline --error-rate 0.05 --max-rps 100
+    python -m benchmarks.bench_pipeline --mode sequential pipelined
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.mock_server import start_server
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATEGORIES = ['thoisu', 'kinhte', 'congnghe']
+
+
+def run_child(options):
+    """Run the pipeline in this process (the benchmark's child) and write the measurements."""
+    sys.path.insert(0, ROOT)
+    os.chdir(options['workdir'])
+    
+    import config
+    # Đường dẫn tương đối trong config (database, output, archive...) nằm trong thư mục tạm
+    config.RSS_FEEDS = {category: f"{options['base_url']}/rss/{category}.rss" for category in CATEGORIES}
+    train = int(options['items'] * 0.8)
+    config.TRAIN_SAMPLES = {category: train for category in CATEGORIES}
+    config.TEST_SAMPLES = {category: options['items'] - train for category in CATEGORIES}
+    config.LOG_LEVEL = 'WARNING'
+    config.BACKOFF_BASE = options['backoff']
+    
+    import thanhnien_crawler
+    from src.metrics import metrics
+    
+    if options['mode'] == 'pipelined':
+        phases = (('pipeline', '--pipeline'),)
+    else:
+        phases = (('collect', '--collect-only'), ('crawl', '--crawl-only'))
+        
+    results = {}
+    for phase, flag in phases:
+        sys.argv = ['thanhnien_crawler.py', flag, '--workers', str(options['workers'])]
+        before = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.perf_counter()
+        thanhnien_crawler.main()
+        elapsed = time.perf_counter() - start
+        after = resource.getrusage(resource.RUSAGE_SELF)
+        results[phase] = {
+            'seconds': elapsed,
+            'cpu_seconds': (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime),
+        }
+        
+    counters = metrics.snapshot()['counters']
+    results['urls'] = sum(series['value'] for series in counters.get('crawler_rss_new_total', []))
+    results['articles'] = sum(series['value'] for series in counters.get('crawler_articles_total', [])
+                              if series['result'] == 'saved')
+    # ru_maxrss tính bằng KB trên Linux
+    results['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    
+    with open(os.path.join(options['workdir'], 'result.json'), 'w', encoding='utf-8') as f:
+        json.dump(results, f)
+
+
+def run_once(base_url, mode, workers, items, backoff):
+    """
+    Run the pipeline in a fresh process.
+    
+    Returns:
+        Dictionary of measurements written by run_child
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        options = {'workdir': workdir, 'base_url': base_url, 'mode': mode, 'workers': workers,
+                   'items': items, 'backoff': backoff}
+        process = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_pipeline', '--child', json.dumps(options)],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"Pipeline run failed:\n{process.stderr[-2000:]}")
+        with open(os.path.join(workdir, 'result.json'), encoding='utf-8') as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end crawler throughput benchmark')
+    parser.add_argument('--items', type=int, default=300, help='RSS items (articles) per category')
+    parser.add_argument('--workers', type=int, nargs='+', default=[4, 16], help='Worker counts to test')
+    parser.add_argument('--mode', nargs='+', choices=['sequential', 'pipelined'], default=['sequential'],
+                        help='Run collection and crawling one after another and/or overlapped')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock server latency (seconds)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500')
+    parser.add_argument('--max-rps', type=float, default=0.0, help='Mock server requests/second before 429')
+    parser.add_argument('--max-inflight', type=int, default=0, help='Mock server concurrent requests before 429')
+    parser.add_argument('--backoff', type=float, default=0.2, help='BACKOFF_BASE used by the crawler (seconds)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        run_child(json.loads(args.child))
+        return
+        
+    print("="*118)
+    print(f"Pipeline benchmark: {len(CATEGORIES)} x {args.items} articles, latency {args.latency}s, "
+          f"error rate {args.error_rate}, max rps {args.max_rps or 'unlimited'}, "
+          f"max in-flight {args.max_inflight or 'unlimited'}")
+    print("="*118)
+    print(f"{'Mode':<10} {'Workers':<8} {'URLs':>6} {'URLs/s':>9} {'Articles':>9} {'Articles/s':>11} "
+          f"{'Total (s)':>10} {'CPU (s)':>8} {'CPU %':>6} {'Peak RSS (MB)':>14} {'429':>6} {'500':>6}")
+    print("-"*118)
+    
+    for mode in args.mode:
+        for workers in args.workers:
+            # Mock server mới cho mỗi lần chạy để đếm response riêng
+            server, base_url = start_server(latency=args.latency, rss_items=args.items, error_rate=args.error_rate,
+                                            max_rps=args.max_rps, max_inflight=args.max_inflight)
+            try:
+                result = run_once(base_url, mode, workers, args.items, args.backoff)
+            finally:
+                server.shutdown()
+                server.server_close()
+                
+            phases = [value for value in result.values() if isinstance(value, dict)]
+            total_seconds = sum(phase['seconds'] for phase in phases)
+            cpu_seconds = sum(phase['cpu_seconds'] for phase in phases)
+            # Chế độ pipelined: hai bước chồng lên nhau nên tính tốc độ trên tổng thời gian
+            collect_seconds = result['collect']['seconds'] if 'collect' in result else total_seconds
+            crawl_seconds = result['crawl']['seconds'] if 'crawl' in result else total_seconds
+            responses = server.stats()
+            print(f"{mode:<10} {workers:<8} {result['urls']:>6} {result['urls'] / collect_seconds:>9.1f} "
+                  f"{result['articles']:>9} {result['articles'] / crawl_seconds:>11.1f} {total_seconds:>10.2f} "
+                  f"{cpu_seconds:>8.2f} {100 * cpu_seconds / total_seconds:>6.1f} {result['peak_rss_mb']:>14.1f} "
+                  f"{responses.get(429, 0):>6} {responses.get(500, 0):>6}")
+                  
+    print("="*118)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Local mock of the Thanh Nien site for offline benchmarks.
+
+Serves RSS feeds at /rss/<category>.rss and article pages at
+/<category>/article-<n>.htm using the same markup as thanhnien.vn.
+Latency, injected server errors and throttling (429 with Retry-After)
+are configurable.
+
+Usage (from 01_crawler/):
+    python -m benchmarks.mock_server --port 8000 --latency 0.05 --error-rate 0.02 --max-rps 100
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+ARTICLE_TEMPLATE = """<!DOCTYPE html>
+<html lang="vi">
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<div class="header">Thanh Niên</div>
+{boilerplate}
+<h1 class="detail-title"><span data-role="title">{title}</span></h1>
+<h2 class="detail-sapo">{sapo}</h2>
+<div class="detail-content">
+{paragraphs}
+<template><p>Đoạn trong template không hiển thị, không thuộc nội dung bài viết.</p></template>
+</div>
+{related}
+<div class="footer">Footer</div>
+</body>
+</html>
+"""
+
+RSS_ITEM_TEMPLATE = """<item>
+<title>{title}</title>
+<link>{link}</link>
+<description>{description}</description>
+<pubDate>Mon, 27 Oct 2025 10:30:00 +0700</pubDate>
+</item>"""
+
+
+BOILERPLATE_BLOCK = """<div class="box-category"><ul>
+<li><a href="/thoi-su.htm">Thời sự</a></li><li><a href="/kinh-te.htm">Kinh tế</a></li>
+<li><a href="/cong-nghe.htm">Công nghệ</a></li><li><a href="/the-gioi.htm">Thế giới</a></li>
+</ul><div class="box-related"><h3><a href="/tin-lien-quan.htm">Tin liên quan có tiêu đề khá dài</a></h3>
+<p>Mô tả tin liên quan xuất hiện trong sidebar của trang.</p></div>
+<script>window.dataLayer = window.dataLayer || []; dataLayer.push({{'event': 'pageview'}});</script></div>"""
+
+# Từ vựng để sinh nội dung khác nhau giữa các bài (không bị coi là gần trùng)
+VOCABULARY = (
+    "chính phủ người dân thành phố kinh tế doanh nghiệp thị trường công nghệ dữ liệu giáo dục y tế "
+    "giao thông nông nghiệp xuất khẩu đầu tư ngân hàng lãi suất giá cả sản xuất lao động việc làm "
+    "quốc hội chính sách pháp luật môi trường khí hậu năng lượng điện lực xây dựng hạ tầng du lịch "
+    "văn hóa thể thao bóng đá học sinh sinh viên bệnh viện bác sĩ phần mềm điện thoại trí tuệ nhân tạo "
+    "mạng xã hội an ninh quốc phòng tài chính chứng khoán bất động sản nhà ở thu nhập tăng trưởng"
+).split()
+
+
+def build_article(category, index, n_paragraphs=10, n_boilerplate=0, n_related=0):
+    """
+    Build a synthetic article page.
+    
+    The text of each paragraph is drawn from a fixed vocabulary with a
+    generator seeded by category and index, so the same article is always
+    identical and different articles are not near-duplicates.
+    
+    Args:
+        category: Category name
+        index: Article number
+        n_paragraphs: Number of body paragraphs
+        n_boilerplate: Number of navigation/sidebar blocks, to mimic real page weight
+        n_related: Number of related-news/comment blocks after the article body
+        
+    Returns:
+        HTML string
+    """
+    generator = random.Random(f"{category}-{index}")
+    title = f"Bài viết {category} số {index}"
+    sapo = f"Mô tả ngắn của bài viết {category} số {index}."
+    paragraphs = '\n'.join(
+        f"<p>Đoạn {i} của bài viết {category} số {index}: {' '.join(generator.choices(VOCABULARY, k=30))}.</p>"
+        for i in range(n_paragraphs)
+    )
+    boilerplate = '\n'.join(BOILERPLATE_BLOCK.format() for _ in range(n_boilerplate))
+    related = '\n'.join(BOILERPLATE_BLOCK.format() for _ in range(n_related))
+    return ARTICLE_TEMPLATE.format(title=title, sapo=sapo, paragraphs=paragraphs, boilerplate=boilerplate,
+                                   related=related)
+
+
+def build_rss(base_url, category, n_items=50):
+    """
+    Build a synthetic RSS feed.
+    
+    Args:
+        base_url: Base URL of the mock server
+        category: Category name
+        n_items: Number of items in the feed
+        
+    Returns:
+        XML string
+    """
+    items = '\n'.join(
+        RSS_ITEM_TEMPLATE.format(
+            title=f"Bài viết {category} số {i}",
+            link=f"{base_url}/{category}/article-{i}.htm",
+            description=f"Mô tả bài viết {category} số {i}",
+        )
+        for i in range(1, n_items + 1)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>\n{items}\n</channel></rss>'
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Request handler serving synthetic feeds and articles."""
+    
+    # Được ghi đè bởi start_server
+    latency = 0.0
+    rss_items = 50
+    error_rate = 0.0
+    max_rps = 0.0
+    max_inflight = 0
+    retry_after = 1
+    related_blocks = 0
+    state = None
+    
+    def do_GET(self):
+        state = self.state
+        with state['lock']:
+            state['inflight'] += 1
+            throttled = self.is_throttled(state)
+        try:
+            if throttled:
+                self.send_status(429, {'Retry-After': str(self.retry_after)})
+                return
+                
+            if self.latency > 0:
+                time.sleep(self.latency)
+                
+            if self.error_rate and state['random'].random() < self.error_rate:
+                self.send_status(500)
+                return
+                
+            self.route()
+        finally:
+            with state['lock']:
+                state['inflight'] -= 1
+    
+    def is_throttled(self, state):
+        """Decide whether to answer 429 (called with the state lock held)."""
+        if self.max_inflight and state['inflight'] > self.max_inflight:
+            return True
+        if self.max_rps:
+            # Token bucket: max_rps token/giây, dồn tối đa max_rps token
+            now = time.monotonic()
+            state['tokens'] = min(self.max_rps, state['tokens'] + (now - state['updated']) * self.max_rps)
+            state['updated'] = now
+            if state['tokens'] < 1:
+                return True
+            state['tokens'] -= 1
+        return False
+    
+    def route(self):
+        path = self.path.split('?', 1)[0]
+        parts = path.strip('/').split('/')
+        
+        if len(parts) == 2 and parts[0] == 'rss' and parts[1].endswith('.rss'):
+            base_url = f"http://{self.headers.get('Host')}"
+            body = build_rss(base_url, parts[1][:-4], self.rss_items)
+            # Hỗ trợ conditional GET bằng ETag
+            etag = '"' + hashlib.md5(body.encode('utf-8')).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_status(304, {'ETag': etag})
+                return
+            self.send_body(body, 'application/rss+xml; charset=utf-8', {'ETag': etag})
+        elif len(parts) == 2 and parts[1].startswith('article-') and parts[1].endswith('.htm'):
+            index = parts[1][len('article-'):-len('.htm')]
+            self.send_body(build_article(parts[0], index, n_related=self.related_blocks), 'text/html; charset=utf-8')
+        else:
+            self.send_status(404)
+    
+    def count(self, status):
+        with self.state['lock']:
+            self.state['responses'][status] = self.state['responses'].get(status, 0) + 1
+    
+    def send_status(self, status, headers=None):
+        self.count(status)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def send_body(self, body, content_type, headers=None):
+        self.count(200)
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        # Không in access log ra console
+        pass
+
+
+def create_server(host='127.0.0.1', port=0, latency=0.0, rss_items=50, error_rate=0.0,
+                  max_rps=0.0, max_inflight=0, retry_after=1, seed=0, related_blocks=0):
+    """
+    Create the mock server without starting it.
+    
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 = random free port)
+        latency: Seconds to sleep before answering each request
+        rss_items: Number of items in each RSS feed
+        error_rate: Fraction of requests answered with 500
+        max_rps: Requests per second above which 429 is returned (0 = unlimited)
+        max_inflight: Concurrent requests above which 429 is returned (0 = unlimited)
+        retry_after: Retry-After value (seconds) sent with 429
+        seed: Seed of the error injection
+        related_blocks: Number of related-news blocks after each article body
+        
+    Returns:
+        ThreadingHTTPServer; server.stats() gives response counts by status
+    """
+    state = {
+        'lock': threading.Lock(),
+        'random': random.Random(seed),
+        'inflight': 0,
+        'tokens': float(max_rps),
+        'updated': time.monotonic(),
+        'responses': {},
+    }
+    handler = type('ConfiguredMockHandler', (MockHandler,), {
+        'latency': latency,
+        'rss_items': rss_items,
+        'error_rate': error_rate,
+        'max_rps': max_rps,
+        'max_inflight': max_inflight,
+        'retry_after': retry_after,
+        'related_blocks': related_blocks,
+        'state': state,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    
+    def stats():
+        with state['lock']:
+            return dict(state['responses'])
+    server.stats = stats
+    return server
+
+
+def start_server(host='127.0.0.1', port=0, latency=0.0, rss_items=50, **options):
+    """
+    Start the mock server in a background thread.
+    
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 = random free port)
+        latency: Seconds to sleep before answering each request
+        rss_items: Number of items in each RSS feed
+        **options: Error injection and throttling options (see create_server)
+        
+    Returns:
+        Tuple (server, base_url); call server.shutdown() to stop
+    """
+    server = create_server(host, port, latency, rss_items, **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    return server, base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local mock of the Thanh Nien site')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8000, help='Port to bind')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds before each response')
+    parser.add_argument('--rss-items', type=int, default=50, help='Items per RSS feed')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 500')
+    parser.add_argument('--max-rps', type=float, default=0.0, help='Requests/second before 429 (0 = unlimited)')
+    parser.add_argument('--max-inflight', type=int, default=0, help='Concurrent requests before 429 (0 = unlimited)')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429')
+    parser.add_argument('--related-blocks', type=int, default=0, help='Related-news blocks after each article body')
+    args = parser.parse_args()
+    
+    server = create_server(args.host, args.port, args.latency, args.rss_items, args.error_rate,
+                           args.max_rps, args.max_inflight, args.retry_after, related_blocks=args.related_blocks)
+    base_url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+    print(f"Mock server at {base_url} (feeds: {base_url}/rss/<category>.rss)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Responses by status: {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
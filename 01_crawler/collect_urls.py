@@ -4,22 +4,31 @@ Script to collect article URLs from RSS feeds and save to database.
 """
 
 import argparse
-from src import setup_logger, URLCollector, DatabaseManager
+from src import setup_logger, DatabaseManager, start_reporter
 
 
 def main():
     """Main function to collect URLs from RSS feeds."""
     parser = argparse.ArgumentParser(description='Collect article URLs from RSS feeds')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+    parser.add_argument('--metrics-port', type=int, 
+                        help='Serve Prometheus metrics on this local port (overrides config)')
     args = parser.parse_args()
     
     # Setup logger
     logger = setup_logger()
     logger.info("Starting URL collection from RSS feeds...")
     
-    # Tạo collector và thu thập URLs
-    collector = URLCollector()
-    total_new = collector.collect_all()
+    # Ghi thống kê theo giai đoạn ra file JSON (và endpoint Prometheus nếu bật)
+    reporter = start_reporter(args.metrics_port)
+    
+    # Tạo collector và thu thập URLs (import muộn để --help khởi động nhanh)
+    from src import URLCollector
+    try:
+        collector = URLCollector()
+        total_new = collector.collect_all()
+    finally:
+        reporter.stop()
     
     # Hiển thị thống kê
     db = DatabaseManager()
@@ -54,30 +63,26 @@ if __name__ == "__main__":
             Số lượng bài viết mới được thêm vào
         """
         conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
         
-        new_count = 0
-        duplicate_count = 0
+        rows = [(
+            article['url'],
+            article['title'],
+            article['category'],
+            article['published_date'],
+            article['description'],
+            article['collected_at']
+        ) for article in articles]
         
-        for article in articles:
-            try:
-                cursor.execute('''
-                    INSERT INTO articles (url, title, category, published_date, description, collected_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    article['url'],
-                    article['title'],
-                    article['category'],
-                    article['published_date'],
-                    article['description'],
-                    article['collected_at']
-                ))
-                new_count += 1
-            except sqlite3.IntegrityError:
-                # URL đã tồn tại
-                duplicate_count += 1
+        # Insert cả feed trong một transaction, bỏ qua URL đã tồn tại
+        with conn:
+            # rowcount không tính các dòng do trigger cập nhật (khác total_changes)
+            cursor = conn.executemany('''
+                INSERT OR IGNORE INTO articles (url, title, category, published_date, description, collected_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+            new_count = cursor.rowcount
+        duplicate_count = len(rows) - new_count
         
-        conn.commit()
         conn.close()
         
         self.logger.info(f"Đã thêm {new_count} bài viết mới, {duplicate_count} bài viết trùng")
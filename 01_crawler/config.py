@@ -1,7 +1,7 @@
 # URL gốc của Thanh Niên
 BASE_URL = "https://thanhnien.vn"
 
-# RSS Feeds cho các danh mục
+# RSS Feeds cho các danh mục (mỗi danh mục có thể là một URL hoặc list nhiều URL)
 RSS_FEEDS = {
     "thoisu": "https://thanhnien.vn/rss/thoi-su.rss",
     "kinhte": "https://thanhnien.vn/rss/kinh-te.rss",
@@ -32,16 +32,86 @@ HEADERS = {
 }
 
 # Cấu hình crawl
-DELAY_BETWEEN_REQUESTS = 1  # Giây giữa các request (tránh bị ban)
+DELAY_BETWEEN_REQUESTS = 1  # Giây chờ cơ sở giữa các lần thử lại (tránh bị ban)
 MAX_RETRIES = 3  # Số lần thử lại khi request thất bại
 TIMEOUT = 30  # Timeout cho mỗi request (giây)
+EXTRACTOR = "lxml"  # Backend extract nội dung: "soup" (BeautifulSoup đầy đủ), "strainer" (SoupStrainer) hoặc "lxml" (XPath)
+
+# Cấu hình tải trang dạng stream
+STREAM_FETCH = True  # Đọc body theo từng chunk, kiểm tra header trước khi đọc (False = tải cả body một lần)
+STREAM_CHUNK_SIZE = 16384  # Số byte mỗi lần đọc
+STREAM_EARLY_ABORT = True  # Ngừng đọc khi thẻ đóng của khung nội dung bài (div.detail-content) đã tới (không áp dụng khi ARCHIVE_ENABLED)
+MAX_BODY_BYTES = 5 * 2**20  # Kích thước body tối đa (byte); trang lớn hơn bị bỏ qua
+ALLOWED_CONTENT_TYPES = ("text/html", "application/xhtml+xml")  # Content-Type được chấp nhận (gallery, video... bị bỏ qua)
+
+# Cấu hình crawl song song
+MAX_WORKERS = 16  # Số luồng fetch bài viết song song (giới hạn trên của số request đồng thời mỗi host)
+RATE_LIMIT_PER_HOST = 0  # Trần cứng số request/giây cho mỗi host (0 = không giới hạn, để AIMD tự điều chỉnh)
+RATE_LIMIT_BURST = 1  # Số request được phép dồn liên tiếp cho mỗi host (dung lượng token bucket)
+RSS_MAX_WORKERS = 8  # Số RSS feed được tải song song
+RSS_INSERT_BATCH = 500  # Số item RSS gom lại cho mỗi lần insert khi đang stream feed
+URL_FILTER_CAPACITY = 1_000_000  # Số URL dự kiến; vượt quá thì tỉ lệ false positive tăng
+URL_FILTER_ERROR_RATE = 0.001  # Tỉ lệ false positive mục tiêu khi filter đầy
+# Tham số query bị bỏ khi chuẩn hóa URL (hỗ trợ wildcard kiểu shell)
+TRACKING_PARAMS = ("utm_*", "fbclid", "gclid", "zarsrc", "gidzl", "_ga")
+
+# Điều khiển tải thích ứng (AIMD) và backoff
+ADAPTIVE_CONCURRENCY = True  # Tự điều chỉnh số request đồng thời mỗi host (False = luôn dùng MAX_WORKERS)
+ADAPTIVE_INITIAL_CONCURRENCY = 1  # Số request đồng thời lúc bắt đầu
+ADAPTIVE_INCREASE = 1.0  # Mức tăng cộng sau mỗi "cửa sổ" request thành công
+ADAPTIVE_DECREASE = 0.5  # Hệ số giảm nhân khi bị throttle (429/503), lỗi nhiều hoặc latency tăng vọt
+ADAPTIVE_LATENCY_TOLERANCE = 2.0  # Latency trung bình vượt quá bội số này của latency tốt nhất thì giảm tải
+ADAPTIVE_ERROR_THRESHOLD = 0.15  # Tỉ lệ lỗi (EWMA) vượt ngưỡng này thì giảm tải
+BACKOFF_BASE = DELAY_BETWEEN_REQUESTS  # Backoff của lần retry đầu (giây), tăng gấp đôi mỗi lần, có jitter
+BACKOFF_MAX = 60  # Backoff tối đa (giây)
+MAX_RETRY_AFTER = 300  # Giới hạn thời gian chờ theo header Retry-After (giây)
 
 # Thư mục lưu dữ liệu
 OUTPUT_DIR = "thanhnien"
 DB_FILE = "thanhnien_urls.db"
+RSS_CACHE_FILE = "rss_cache.json"  # Lưu ETag/Last-Modified của từng RSS feed
+URL_FILTER_FILE = "url_filter.bloom"  # Bloom filter các URL đã có trong database, lưu giữa các lần chạy
+OUTPUT_FORMAT = "corpus"  # "corpus" (shard JSONL + index offset) hoặc "txt" (một file .txt mỗi bài)
+CORPUS_DIR = "corpus"  # Thư mục corpus dạng shard (nằm trong OUTPUT_DIR)
+CORPUS_COMPRESS = False  # Nén từng record bằng gzip (.jsonl.gz)
+CORPUS_SHARD_SIZE = 64 * 1024 * 1024  # Kích thước tối đa mỗi shard (bytes)
+MANIFEST_FILE = "manifest.jsonl"  # Checkpoint các bài đã ghi xong (nằm trong OUTPUT_DIR), dùng để resume
+ARCHIVE_ENABLED = True  # Lưu response gốc của mỗi bài viết (WARC nén gzip)
+ARCHIVE_DIR = "archive"  # Thư mục chứa các segment WARC và index theo URL
 TRAIN_DIR = "train"
 TEST_DIR = "test"
 
+# Cấu hình database
+DB_BATCH_SIZE = 500  # Số cập nhật trạng thái gom lại trong một transaction
+DB_FLUSH_INTERVAL = 2.0  # Thời gian tối đa (giây) một cập nhật nằm trong hàng đợi trước khi ghi
+DB_CACHE_SIZE_KB = 65536  # Kích thước page cache của SQLite (KB)
+DB_PAGE_SIZE = 1000  # Số dòng mỗi lần đọc khi duyệt frontier (keyset pagination)
+LEASE_SECONDS = 300  # Thời hạn lease khi một worker claim URL (giây)
+
+# Cấu hình chế độ pipeline (thu thập, tải, extract và ghi chạy chồng lên nhau)
+PIPELINE_QUEUE_SIZE = 256  # Sức chứa mỗi hàng đợi giữa các bước; đầy thì bước trước phải chờ
+PIPELINE_PARSE_WORKERS = 2  # Số luồng extract nội dung
+
+# Cấu hình export (export_articles.py)
+EXPORT_DIR = "export"  # Thư mục export mặc định (nằm trong OUTPUT_DIR)
+EXPORT_FORMAT = "jsonl"  # "jsonl", "csv" hoặc "parquet" (cần pyarrow)
+EXPORT_COMPRESS = True  # Nén gzip (JSONL/CSV) hoặc zstd (Parquet)
+EXPORT_COMPRESS_LEVEL = 6  # Mức nén gzip (1-9)
+EXPORT_CHUNK_SIZE = 5000  # Số dòng đọc từ database và ghi mỗi lần
+
+# Cấu hình lọc bài gần trùng (MinHash + LSH)
+DEDUP_ENABLED = True  # Bỏ qua bài có nội dung gần trùng với một bài đã có trong dataset
+DEDUP_INDEX_FILE = "thanhnien_lsh.db"  # Index LSH (SQLite) đặt cạnh DB_FILE
+DEDUP_THRESHOLD = 0.8  # Độ tương đồng Jaccard (ước lượng) để coi là gần trùng
+DEDUP_NUM_PERM = 128  # Số hàm hash MinHash (độ dài signature)
+DEDUP_SHINGLE_SIZE = 5  # Số từ mỗi shingle
+DEDUP_MAX_CANDIDATES = 20  # Số ứng viên tối đa được so sánh mỗi lần tra cứu
+
+# Cấu hình metrics
+STATS_FILE = "crawl_stats.json"  # File JSON thống kê theo từng giai đoạn, ghi lại định kỳ (nằm trong OUTPUT_DIR)
+STATS_INTERVAL = 10  # Số giây giữa các lần ghi lại STATS_FILE
+METRICS_PORT = 0  # Cổng endpoint Prometheus /metrics trên localhost (0 = tắt)
+
 # Cấu hình logging
 LOG_FILE = "crawler.log"
 LOG_LEVEL = "INFO"
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Script to convert a train/<category>/*.txt tree into the sharded corpus format.
+"""
+
+import os
+import argparse
+import config
+from src import setup_logger, DatabaseManager
+from src.corpus import convert_tree
+
+
+def main():
+    """Main function to convert the .txt dataset into a sharded corpus."""
+    parser = argparse.ArgumentParser(description='Convert one-file-per-article output into a sharded corpus')
+    parser.add_argument('--data-dir', '-d', default=config.OUTPUT_DIR, 
+                        help='Directory containing train/ and test/ (default: OUTPUT_DIR)')
+    parser.add_argument('--output', '-o', 
+                        help='Corpus directory (default: <data-dir>/corpus)')
+    parser.add_argument('--compress', action='store_true', default=config.CORPUS_COMPRESS, 
+                        help='Compress each record with gzip')
+    args = parser.parse_args()
+    
+    # Setup logger
+    logger = setup_logger()
+    
+    corpus_dir = args.output or os.path.join(args.data_dir, config.CORPUS_DIR)
+    logger.info(f"Converting {args.data_dir} into {corpus_dir}...")
+    
+    # Database dùng để tra id của các file đặt tên theo số thứ tự kiểu cũ
+    with DatabaseManager() as db:
+        stats = convert_tree(args.data_dir, corpus_dir, args.compress, config.CORPUS_SHARD_SIZE, db=db)
+    logger.info(f"Converted {stats['converted']} articles ({stats['skipped']} empty files skipped, "
+                f"{stats['unmatched']} files without a matching article skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ Script to crawl article content from URLs in database.
 """
 
 import argparse
-from src import setup_logger, ArticleCrawler
+from src import setup_logger, start_reporter
 
 
 def main():
@@ -16,31 +16,52 @@ def main():
                         help='Crawl specific split only')
     parser.add_argument('--count', '-n', type=int, 
                         help='Number of articles to crawl (overrides config)')
+    parser.add_argument('--workers', '-w', type=int, 
+                        help='Number of concurrent fetch workers (overrides config)')
+    parser.add_argument('--extractor', '-e', choices=['soup', 'strainer', 'lxml'], 
+                        help='HTML extraction backend (overrides config)')
+    parser.add_argument('--from-archive', action='store_true', 
+                        help='Re-extract dataset articles from the page archive (no network)')
+    parser.add_argument('--jobs', '-j', type=int, 
+                        help='Number of processes for --from-archive (default: CPU count)')
+    parser.add_argument('--metrics-port', type=int, 
+                        help='Serve Prometheus metrics on this local port (overrides config)')
     args = parser.parse_args()
     
     # Setup logger
     logger = setup_logger()
     logger.info("Starting article crawler...")
     
-    # Tạo crawler
-    crawler = ArticleCrawler()
+    # Ghi thống kê theo giai đoạn ra file JSON (và endpoint Prometheus nếu bật)
+    reporter = start_reporter(args.metrics_port)
     
-    # Crawl dựa trên arguments
-    if args.category and args.split:
-        # Crawl một category và split cụ thể
-        count = crawler.crawl_category(args.category, args.split, args.count)
-        logger.info(f"Crawled {count} articles for {args.category} ({args.split})")
-    elif args.category:
-        # Crawl một category cho cả train và test
-        stats = {}
-        for split in ['train', 'test']:
-            count = crawler.crawl_category(args.category, split, args.count)
-            stats[split] = count
-        logger.info(f"Crawled {args.category}: {stats}")
-    else:
-        # Crawl tất cả
-        stats = crawler.crawl_all()
-        logger.info("Crawling completed!")
+    # Tạo crawler (import muộn để --help khởi động nhanh)
+    from src import ArticleCrawler
+    crawler = ArticleCrawler(max_workers=args.workers, extractor=args.extractor)
+    
+    try:
+        # Crawl dựa trên arguments
+        if args.from_archive:
+            # Extract lại từ archive, không gửi request
+            stats = crawler.reextract_from_archive(jobs=args.jobs)
+            logger.info(f"Re-extraction completed: {stats}")
+        elif args.category and args.split:
+            # Crawl một category và split cụ thể
+            count = crawler.crawl_category(args.category, args.split, args.count)
+            logger.info(f"Crawled {count} articles for {args.category} ({args.split})")
+        elif args.category:
+            # Crawl một category cho cả train và test
+            stats = {}
+            for split in ['train', 'test']:
+                count = crawler.crawl_category(args.category, split, args.count)
+                stats[split] = count
+            logger.info(f"Crawled {args.category}: {stats}")
+        else:
+            # Crawl tất cả
+            stats = crawler.crawl_all()
+            logger.info("Crawling completed!")
+    finally:
+        reporter.stop()
 
 
 if __name__ == "__main__":
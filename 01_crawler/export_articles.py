@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Script to export the articles database to JSONL, CSV or Parquet files.
+"""
+
+import os
+import argparse
+import config
+from src import setup_logger
+
+
+def main():
+    """Main function to export articles."""
+    parser = argparse.ArgumentParser(description='Stream the articles database into JSONL/CSV/Parquet part files')
+    parser.add_argument('--output', '-o',
+                        help='Export directory (default: <OUTPUT_DIR>/export)')
+    parser.add_argument('--format', '-f', choices=['jsonl', 'csv', 'parquet'], default=config.EXPORT_FORMAT,
+                        help='Output format (parquet requires pyarrow)')
+    parser.add_argument('--no-compress', action='store_true', default=not config.EXPORT_COMPRESS,
+                        help='Do not compress the part files')
+    parser.add_argument('--with-text', action='store_true',
+                        help='Add the saved article text (from the corpus or the .txt files)')
+    parser.add_argument('--used-only', action='store_true',
+                        help='Only export articles that are in the dataset')
+    parser.add_argument('--incremental', '-i', action='store_true',
+                        help='Only export articles added or changed since the last export')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Replace an existing export instead of refusing to run')
+    parser.add_argument('--chunk-size', type=int, default=config.EXPORT_CHUNK_SIZE,
+                        help='Rows read and written per batch')
+    args = parser.parse_args()
+    
+    # Setup logger
+    logger = setup_logger()
+    
+    # Import muộn để --help khởi động nhanh
+    from src import DatabaseManager, ArticleExporter
+    
+    export_dir = args.output or os.path.join(config.OUTPUT_DIR, config.EXPORT_DIR)
+    with DatabaseManager() as db:
+        exporter = ArticleExporter(db, export_dir, fmt=args.format, compress=not args.no_compress,
+                                   with_text=args.with_text, used_only=args.used_only, chunk_size=args.chunk_size)
+        try:
+            stats = exporter.export(incremental=args.incremental, overwrite=args.overwrite)
+        except (ValueError, FileExistsError, ImportError) as e:
+            logger.error(str(e))
+            raise SystemExit(1)
+            
+    logger.info(f"Export completed: {stats['rows']} articles, change_seq {stats['from']}-{stats['to']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,33 @@
-from .logger_utils import setup_logger
-from .file_utils import create_output_dir, save_to_csv, save_to_json, clean_text
-from .database import DatabaseManager
-from .url_collector import URLCollector
-from .article_crawler import ArticleCrawler
+import importlib
 
-__all__ = [
-    'setup_logger',
-    'create_output_dir',
-    'save_to_csv',
-    'save_to_json',
-    'clean_text',
-    'DatabaseManager',
-    'URLCollector',
-    'ArticleCrawler',
-]
+# Import lười (PEP 562): submodule chỉ được import khi truy cập tên lần đầu,
+# nên các lệnh nhẹ như --stats hay --help không phải tải requests, bs4, numpy...
+_EXPORTS = {
+    'setup_logger': 'logger_utils',
+    'create_output_dir': 'file_utils',
+    'save_to_csv': 'file_utils',
+    'save_to_json': 'file_utils',
+    'clean_text': 'file_utils',
+    'DatabaseManager': 'database',
+    'URLCollector': 'url_collector',
+    'ArticleCrawler': 'article_crawler',
+    'CrawlPipeline': 'pipeline',
+    'ArticleExporter': 'exporter',
+    'metrics': 'metrics',
+    'start_reporter': 'metrics',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    # Lưu lại để các lần truy cập sau không gọi __getattr__ nữa
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,27 +1,137 @@
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import os
 import time
+import functools
+import socket
+import uuid
 import logging
+from urllib.parse import urlparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
 from tqdm import tqdm
-import random
 
 import config
 from .database import DatabaseManager
-from .file_utils import clean_text
+from .rate_limiter import HostRateLimiter, HostAIMDController, backoff_delay, parse_retry_after
+from .page_archive import PageArchive, read_record
+from .extractors import get_extractor, ArticleEndScanner
+from .manifest import CrawlManifest
+from .corpus import CorpusWriter, CorpusReader
+from .file_utils import article_path
+from .dedup import NearDuplicateIndex
+from .metrics import metrics
+
+
+def reextract_record(task, backend=None):
+    """
+    Re-run extraction on one archived page (executed in a worker process).
+    
+    Args:
+        task: Tuple (article_id, category, split, url, segment path, offset, length)
+        backend: Extraction backend name (default: config.EXTRACTOR)
+        
+    Returns:
+        String containing article content or None if failed
+    """
+    _, _, _, _, path, offset, length = task
+    try:
+        _, _, body = read_record(path, offset, length)
+        return get_extractor(backend or config.EXTRACTOR).extract(body)
+    except Exception:
+        return None
+
+
+def is_dead_local_worker(worker_id):
+    """
+    Check whether a worker identifier belongs to a process of this host that has exited.
+    
+    Args:
+        worker_id: Identifier built as "{hostname}-{pid}-{suffix}"
+        
+    Returns:
+        True if the process is known to be gone, False if alive or unknown
+    """
+    try:
+        hostname, pid, _ = worker_id.rsplit('-', 2)
+        pid = int(pid)
+    except ValueError:
+        return False
+        
+    # Chỉ kiểm tra được process trên cùng máy
+    if hostname != socket.gethostname() or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
 
 
 class ArticleCrawler:
     """Crawler for article content from URLs in database."""
     
-    def __init__(self):
-        """Initialize article crawler."""
+    def __init__(self, max_workers=None, extractor=None):
+        """
+        Initialize article crawler.
+        
+        Args:
+            max_workers: Number of concurrent fetch workers (default: config.MAX_WORKERS)
+            extractor: Extraction backend name: soup, strainer or lxml (default: config.EXTRACTOR)
+        """
+        self.max_workers = max(1, max_workers or config.MAX_WORKERS)
+        self.extractor = get_extractor(extractor or config.EXTRACTOR)
         self.session = requests.Session()
         self.session.headers.update(config.HEADERS)
+        # Connection pool đủ lớn cho tất cả worker dùng chung session
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=max(10, self.max_workers))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.rate_limiter = HostRateLimiter(config.RATE_LIMIT_PER_HOST, config.RATE_LIMIT_BURST)
+        # Số request đồng thời mỗi host tự điều chỉnh theo latency và tín hiệu throttle
+        self.controller = HostAIMDController(
+            self.max_workers,
+            initial=config.ADAPTIVE_INITIAL_CONCURRENCY,
+            increase=config.ADAPTIVE_INCREASE,
+            decrease=config.ADAPTIVE_DECREASE,
+            latency_tolerance=config.ADAPTIVE_LATENCY_TOLERANCE,
+            error_threshold=config.ADAPTIVE_ERROR_THRESHOLD,
+            adaptive=config.ADAPTIVE_CONCURRENCY,
+        )
+        # Định danh worker duy nhất giữa các process/máy dùng chung database
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
         self.logger = logging.getLogger('ThanhNienCrawler')
         self.db = DatabaseManager()
-        self.setup_folders()
-        
+        # Lưu response gốc để có thể extract lại mà không cần crawl lại
+        self.archive = PageArchive(config.ARCHIVE_DIR, self.worker_id) if config.ARCHIVE_ENABLED else None
+        # Corpus dạng shard thay cho một file .txt mỗi bài
+        self.corpus = None
+        if config.OUTPUT_FORMAT == 'corpus':
+            self.corpus = CorpusWriter(self.corpus_dir(), self.worker_id,
+                                       config.CORPUS_COMPRESS, config.CORPUS_SHARD_SIZE)
+        else:
+            self.setup_folders()
+        # Checkpoint các bài đã ghi xong, dùng để resume
+        self.manifest = CrawlManifest(os.path.join(config.OUTPUT_DIR, config.MANIFEST_FILE))
+        # Index LSH để bỏ qua bài gần trùng với bài đã có trong dataset
+        self.dedup = None
+        if config.DEDUP_ENABLED:
+            self.dedup = NearDuplicateIndex(
+                config.DEDUP_INDEX_FILE,
+                threshold=config.DEDUP_THRESHOLD,
+                num_perm=config.DEDUP_NUM_PERM,
+                shingle_size=config.DEDUP_SHINGLE_SIZE,
+                max_candidates=config.DEDUP_MAX_CANDIDATES,
+            )
+        self.resumed = False
+    
+    def corpus_dir(self):
+        """Get the root directory of the sharded corpus."""
+        return os.path.join(config.OUTPUT_DIR, config.CORPUS_DIR)
+    
     def setup_folders(self):
         """Create directory structure for storing articles."""
         base_dir = config.OUTPUT_DIR
@@ -30,37 +140,191 @@ class ArticleCrawler:
         for category in config.TRAIN_SAMPLES.keys():
             train_path = os.path.join(base_dir, config.TRAIN_DIR, category)
             os.makedirs(train_path, exist_ok=True)
-        
+            
         # Test folders
         for category in config.TEST_SAMPLES.keys():
             test_path = os.path.join(base_dir, config.TEST_DIR, category)
             os.makedirs(test_path, exist_ok=True)
-        
+            
         self.logger.info(f"Created folder structure at: {base_dir}")
     
-    def get_page(self, url, retries=config.MAX_RETRIES):
+    def fetch_page(self, url, retries=config.MAX_RETRIES):
         """
-        Get page content from URL.
+        Fetch the raw body of a page.
+        
+        Requests go through the host's adaptive concurrency limiter. 429/503
+        responses pause the host for their Retry-After (or an exponential
+        backoff with jitter) and are retried, like 5xx and network errors;
+        other 4xx responses fail immediately. The body is read by read_body.
         
         Args:
             url: URL to fetch
             retries: Number of retry attempts
             
         Returns:
-            BeautifulSoup object or None if failed
+            Response body (bytes) or None if failed
         """
+        limiter = self.controller.for_url(url)
+        
         for attempt in range(retries):
+            # Trần cứng theo token bucket (nếu có), sau đó chờ slot đồng thời của host
+            self.rate_limiter.wait(url)
+            limiter.acquire()
+            start = time.monotonic()
+            response = None
+            released = False  # Slot của limiter đã được trả chưa
             try:
-                response = self.session.get(url, timeout=config.TIMEOUT)
-                response.raise_for_status()
-                return BeautifulSoup(response.content, 'lxml')
+                response = self.session.get(url, timeout=config.TIMEOUT, stream=config.STREAM_FETCH)
+                # Chỉ đọc body của response thành công; lỗi khi đang đọc cũng được thử lại
+                body, truncated = self.read_body(url, response) if response.status_code < 400 else (b'', False)
             except requests.RequestException as e:
-                self.logger.warning(f"Error accessing {url} (attempt {attempt + 1}/{retries}): {e}")
-                if attempt < retries - 1:
-                    time.sleep(config.DELAY_BETWEEN_REQUESTS)
+                limiter.release(time.monotonic() - start, 'error')
+                released = True
+                metrics.inc('crawler_fetch_requests_total', status='error')
+                error = e
+            else:
+                latency = time.monotonic() - start
+                status = response.status_code
+                metrics.observe('crawler_fetch_seconds', latency)
+                metrics.inc('crawler_fetch_requests_total', status=str(status))
+                metrics.inc('crawler_fetch_bytes_total', len(body or b''))
+                
+                if status in (429, 503):
+                    # Server yêu cầu giảm tải: dừng cả host theo Retry-After
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if retry_after is None:
+                        retry_after = backoff_delay(attempt, config.BACKOFF_BASE, config.BACKOFF_MAX)
+                    limiter.release(latency, 'throttled', min(retry_after, config.MAX_RETRY_AFTER))
+                    released = True
+                    error = f"HTTP {status}, retry after {retry_after:.1f}s"
+                elif status >= 500:
+                    limiter.release(latency, 'error')
+                    released = True
+                    error = f"HTTP {status}"
                 else:
-                    self.logger.error(f"Failed to access {url} after {retries} attempts")
-                    return None
+                    limiter.release(latency, 'ok')
+                    released = True
+                    if status >= 400:
+                        # Lỗi phía client (404, 410...): thử lại cũng không có kết quả
+                        self.logger.warning(f"Error accessing {url}: HTTP {status}")
+                        return None
+                    if body is None:
+                        # Không phải trang HTML hoặc quá lớn: bỏ qua, không thử lại
+                        return None
+                    if self.archive:
+                        self.archive.add(url, response, body, truncated)
+                    return body
+            finally:
+                if not released:
+                    # Lỗi ngoài RequestException (khi đọc body, lỗi lập trình...): vẫn trả slot để host không bị kẹt
+                    limiter.release(time.monotonic() - start, 'error')
+                if response is not None:
+                    response.close()
+                metrics.set('crawler_concurrency_limit', round(limiter.limit, 2), host=urlparse(url).netloc)
+                
+            self.logger.warning(f"Error accessing {url} (attempt {attempt + 1}/{retries}): {error}")
+            if attempt < retries - 1:
+                metrics.inc('crawler_fetch_retries_total')
+                time.sleep(backoff_delay(attempt, config.BACKOFF_BASE, config.BACKOFF_MAX))
+                
+        self.logger.error(f"Failed to access {url} after {retries} attempts")
+        return None
+    
+    def read_body(self, url, response):
+        """
+        Read the body of a response, streaming it when STREAM_FETCH is enabled.
+        
+        Content-Type and Content-Length are checked before anything is read:
+        pages that are not HTML or larger than MAX_BODY_BYTES are dropped.
+        With STREAM_EARLY_ABORT, reading stops once the closing tag of the
+        article body container has arrived, unless pages are archived: the
+        archive keeps full bodies, so that re-extraction from it does not
+        depend on where the current extractor stops. Bytes not downloaded
+        are counted in crawler_fetch_bytes_saved_total.
+        
+        Args:
+            url: Requested URL
+            response: requests.Response opened with stream=True
+            
+        Returns:
+            Tuple (body bytes or None if the page was dropped, True if reading stopped early)
+        """
+        if not config.STREAM_FETCH:
+            return response.content, False
+            
+        content_type = response.headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        length = response.headers.get('Content-Length', '')
+        length = int(length) if length.isdigit() else None
+        
+        if content_type and content_type not in config.ALLOWED_CONTENT_TYPES:
+            self.abort_fetch(url, 'content_type', length, f"Content-Type {content_type}")
+            return None, False
+        if length is not None and length > config.MAX_BODY_BYTES:
+            self.abort_fetch(url, 'too_large', length, f"Content-Length {length}")
+            return None, False
+        
+        def unread():
+            # Số byte chưa tải, tính trên dữ liệu truyền qua mạng (trước khi giải nén)
+            return max(0, length - response.raw.tell()) if length is not None else None
+            
+        # Khi lưu archive thì đọc hết body: extract lại từ archive cần cả trang, không chỉ tới hết khung bài
+        scanner = ArticleEndScanner() if config.STREAM_EARLY_ABORT and not self.archive else None
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(config.STREAM_CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > config.MAX_BODY_BYTES:
+                # Không có (hoặc sai) Content-Length: chỉ phát hiện được khi đang đọc
+                self.abort_fetch(url, 'too_large', unread(), f"body larger than {config.MAX_BODY_BYTES} bytes")
+                return None, False
+            if scanner and scanner.feed(chunk):
+                self.abort_fetch(url, 'early_abort', unread())
+                return b''.join(chunks), True
+        return b''.join(chunks), False
+    
+    def abort_fetch(self, url, reason, bytes_saved, detail=None):
+        """
+        Record a download stopped before the end of the body.
+        
+        Args:
+            url: Requested URL
+            reason: content_type, too_large or early_abort
+            bytes_saved: Bytes left unread, or None if the size is unknown
+            detail: Message logged as a warning when the page is dropped
+        """
+        metrics.inc('crawler_fetch_aborted_total', reason=reason)
+        if bytes_saved:
+            metrics.inc('crawler_fetch_bytes_saved_total', bytes_saved, reason=reason)
+        if detail:
+            self.logger.warning(f"Skipping {url}: {detail}")
+    
+    def log_bytes_saved(self):
+        """Log how much download the streaming checks avoided so far."""
+        if not config.STREAM_FETCH:
+            return
+        saved = metrics.total('crawler_fetch_bytes_saved_total')
+        downloaded = metrics.total('crawler_fetch_bytes_total')
+        self.logger.info(f"  Streaming: {saved / 2**20:.1f} MB not downloaded ({downloaded / 2**20:.1f} MB read), "
+                         f"{metrics.total('crawler_fetch_aborted_total', reason='early_abort')} pages stopped early, "
+                         f"{metrics.total('crawler_fetch_aborted_total', reason='content_type')} not HTML, "
+                         f"{metrics.total('crawler_fetch_aborted_total', reason='too_large')} too large")
+    
+    def get_page(self, url, retries=config.MAX_RETRIES):
+        """
+        Get page content from URL.
+        
+        Args:
+            url: URL to fetch
+            retries: Number of retry attempts
+            
+        Returns:
+            BeautifulSoup object or None if failed
+        """
+        html = self.fetch_page(url, retries)
+        if html is None:
+            return None
+        return BeautifulSoup(html, 'lxml')
     
     def extract_article_content(self, url):
         """
@@ -72,126 +336,432 @@ class ArticleCrawler:
         Returns:
             String containing article content or None if failed
         """
-        soup = self.get_page(url)
-        if not soup:
+        html = self.fetch_page(url)
+        if not html:
             return None
+        return self.extract_html(html, url)
+    
+    def extract_html(self, html, url=''):
+        """
+        Extract article content from a downloaded page.
         
+        Args:
+            html: Page bytes
+            url: Article URL (for log messages)
+            
+        Returns:
+            String containing article content or None if failed
+        """
         try:
-            content_parts = []
-            
-            # Tiêu đề
-            title_tag = soup.find('h1', class_='detail-title')
-            if title_tag:
-                title_span = title_tag.find('span', {'data-role': 'title'})
-                if title_span:
-                    content_parts.append(title_span.get_text(strip=True))
-            
-            # Mô tả/Sapo
-            description_tag = soup.find('h2', class_='detail-sapo')
-            if not description_tag:
-                description_tag = soup.find('div', class_='detail-sapo')
-            if description_tag:
-                content_parts.append(description_tag.get_text(strip=True))
-            
-            # Nội dung chính
-            content_div = soup.find('div', class_='detail-content')
-            if not content_div:
-                content_div = soup.find('div', id='main-detail-content')
-            
-            if content_div:
-                paragraphs = content_div.find_all('p')
-                for p in paragraphs:
-                    text = p.get_text(strip=True)
-                    if text and len(text) > 20:  # Bỏ qua đoạn quá ngắn
-                        content_parts.append(text)
-            
-            if content_parts:
-                full_content = '\n\n'.join(content_parts)
-                return clean_text(full_content)
-            else:
+            with metrics.timer('crawler_parse_seconds'):
+                content = self.extractor.extract(html)
+            if not content:
                 self.logger.warning(f"No content found for {url}")
-                return None
-                
+            return content
+            
         except Exception as e:
             self.logger.error(f"Error extracting content from {url}: {e}")
             return None
     
-    def save_article(self, content, category, split, index):
+    def fingerprint(self, content):
+        """
+        Compute the near-duplicate fingerprint of article content.
+        
+        Args:
+            content: Article content (may be None)
+            
+        Returns:
+            MinHash signature, or None if there is no content or filtering is disabled
+        """
+        if not content or not self.dedup:
+            return None
+        with metrics.timer('crawler_fingerprint_seconds'):
+            return self.dedup.signature(content)
+    
+    def fetch_article(self, url):
         """
-        Save article content to file.
+        Extract article content and compute its near-duplicate fingerprint.
+        
+        Args:
+            url: Article URL
+            
+        Returns:
+            Tuple (content, MinHash signature); both None if extraction failed,
+            signature None when near-duplicate filtering is disabled
+        """
+        content = self.extract_article_content(url)
+        # Tính signature ở luồng worker, không chiếm luồng chính
+        return content, self.fingerprint(content)
+    
+    def article_path(self, category, split, article_id):
+        """
+        Get the output path of an article.
+        
+        Args:
+            category: Category name (thoisu, kinhte, congnghe)
+            split: train or test
+            article_id: ID of the article in database
+            
+        Returns:
+            Path of the article file
+        """
+        return article_path(category, split, article_id)
+    
+    def save_article(self, content, category, split, article_id, url=''):
+        """
+        Save article content to the corpus or to its own file.
+        
+        With OUTPUT_FORMAT = "corpus" the article is appended to the sharded
+        corpus; otherwise it is written to a temporary .txt path and renamed,
+        so an interrupted run never leaves a partial article behind.
         
         Args:
             content: Article content string
             category: Category name (thoisu, kinhte, congnghe)
             split: train or test
-            index: Index number for filename
+            article_id: ID of the article in database (used in the filename)
+            url: Article URL (stored in corpus records)
             
         Returns:
-            Path to saved file or None if failed
+            Path to saved file ("shard:offset" for the corpus) or None if failed
         """
         if not content:
             return None
-        
-        filename = f"{category}_{index:04d}.txt"
-        filepath = os.path.join(config.OUTPUT_DIR, split, category, filename)
+            
+        if self.corpus:
+            try:
+                with metrics.timer('crawler_write_seconds'):
+                    return self.corpus.append(article_id, category, split, url, content)
+            except OSError as e:
+                self.logger.error(f"Error appending article {article_id} to corpus: {e}")
+                return None
+                
+        filepath = self.article_path(category, split, article_id)
+        tmp_path = filepath + '.tmp'
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            with metrics.timer('crawler_write_seconds'):
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(tmp_path, filepath)
             return filepath
         except Exception as e:
             self.logger.error(f"Error saving file {filepath}: {e}")
             return None
     
+    def resume(self):
+        """
+        Reconcile the database with the files on disk after an interrupted run.
+        
+        Claims left by dead processes of this host are released, dataset
+        slots that were reserved but never written go back to the frontier,
+        and articles written before the manifest existed (corpus records,
+        .txt files and the old index-based names) are adopted into it; in
+        corpus mode, .txt files are appended to the corpus. Used articles
+        from before slots were recorded first get the slot of their
+        index-based file, then the file is renamed after the article id. Articles already
+        in the manifest are trusted without touching the disk. Dataset
+        articles missing from the near-duplicate index are indexed.
+        
+        Returns:
+            Dictionary with counts of completed, adopted, released and indexed articles
+        """
+        stats = {'completed': 0, 'adopted': 0, 'released': 0, 'dead_workers': 0, 'indexed': 0, 'legacy': 0}
+        
+        # Trả lại claim của các process đã chết trên máy này, không cần chờ hết lease
+        for worker_id in self.db.get_claim_holders():
+            if is_dead_local_worker(worker_id):
+                self.db.release_claims(worker_id)
+                stats['dead_workers'] += 1
+                
+        # Bài đã dùng từ phiên bản cũ (chưa có split/file_index): gán slot theo các file {category}_{n:04d}.txt
+        stats['legacy'] = self.db.assign_legacy_slots(config.OUTPUT_DIR)
+        
+        completed = self.manifest.load()
+        # Bài đã nằm trong corpus nhưng chưa kịp ghi manifest
+        in_corpus = CorpusReader(self.corpus_dir()).ids() if self.corpus else set()
+        orphans = []
+        for article_id, url, category, split, index in self.db.iter_used_articles():
+            if article_id in completed:
+                stats['completed'] += 1
+                continue
+                
+            if article_id in in_corpus:
+                self.manifest.record(article_id, url, category, split, self.corpus_dir())
+                stats['adopted'] += 1
+                continue
+                
+            filepath = self.article_path(category, split, article_id)
+            if not os.path.exists(filepath) and index is not None:
+                # File đặt tên theo số thứ tự kiểu cũ
+                legacy_path = os.path.join(config.OUTPUT_DIR, split, category, f"{category}_{index:04d}.txt")
+                if os.path.exists(legacy_path):
+                    os.replace(legacy_path, filepath)
+                    
+            if os.path.exists(filepath):
+                if self.corpus:
+                    # Đang dùng corpus: chuyển file .txt cũ vào corpus
+                    with open(filepath, 'r', encoding='utf-8') as f:
+                        filepath = self.corpus.append(article_id, category, split, url, f.read())
+                self.manifest.record(article_id, url, category, split, filepath)
+                stats['adopted'] += 1
+            else:
+                orphans.append(article_id)
+                
+        # Slot đã giữ nhưng chưa ghi file: đưa URL về lại frontier
+        for article_id in orphans:
+            if self.db.release_stale_slot(article_id):
+                self.forget_fingerprint(article_id)
+                stats['released'] += 1
+                
+        if self.dedup:
+            stats['indexed'] = self.index_existing()
+            
+        self.resumed = True
+        self.logger.info(f"Resume: {stats['completed']} completed, {stats['adopted']} adopted, "
+                         f"{stats['released']} unfinished slots released, "
+                         f"{stats['dead_workers']} dead workers' claims released, "
+                         f"{stats['legacy']} legacy files given a slot")
+        return stats
+    
+    def forget_fingerprint(self, article_id):
+        """Remove an article that did not make it into the dataset from the near-duplicate index."""
+        if self.dedup:
+            self.dedup.remove(article_id)
+    
+    def index_existing(self):
+        """
+        Add dataset articles that are missing from the near-duplicate index.
+        
+        Covers articles saved before filtering was enabled or after the index
+        file was deleted; only their stored text is read again.
+        
+        Returns:
+            Number of articles added to the index
+        """
+        indexed = self.dedup.ids()
+        missing = [row for row in self.db.iter_used_articles() if row[0] not in indexed]
+        if not missing:
+            return 0
+            
+        reader = CorpusReader(self.corpus_dir()) if self.corpus else None
+        added = 0
+        for article_id, _, category, split, _ in tqdm(missing, desc="Indexing near-duplicates"):
+            if reader is not None:
+                record = reader.get(article_id)
+                content = record['text'] if record else None
+            else:
+                filepath = self.article_path(category, split, article_id)
+                content = None
+                if os.path.exists(filepath):
+                    with open(filepath, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                        
+            signature = self.dedup.signature(content) if content else None
+            if signature is not None:
+                self.dedup.add(article_id, signature)
+                added += 1
+                
+        if reader is not None:
+            reader.close()
+        self.logger.info(f"Added {added} existing articles to the near-duplicate index")
+        return added
+    
+    def store_article(self, article_id, url, category, content, signature, slots):
+        """
+        Add one fetched article to the dataset and record the outcome in the database.
+        
+        Near-duplicates are marked and skipped; otherwise a slot is reserved
+        in the first split of slots whose global quota is not full, the
+        article is saved, and the slot is confirmed after the manifest entry
+        is written.
+        
+        Args:
+            article_id: ID of the article in database
+            url: Article URL
+            category: Category name (thoisu, kinhte, congnghe)
+            content: Extracted content (None if fetching or extraction failed)
+            signature: MinHash signature or None
+            slots: List of (split, quota) tried in order
+            
+        Returns:
+            Tuple (result, split); result is saved, duplicate, quota_full,
+            write_failed or failed
+        """
+        result, split = self._store_article(article_id, url, category, content, signature, slots)
+        metrics.inc('crawler_articles_total', category=category, split=split, result=result)
+        return result, split
+    
+    def _store_article(self, article_id, url, category, content, signature, slots):
+        if not content:
+            # Đánh dấu là đã crawl nhưng không dùng
+            self.db.mark_as_crawled(article_id)
+            return 'failed', slots[0][0]
+            
+        if signature is not None:
+            # Tra index LSH và thêm bài vào index trong cùng một transaction
+            with metrics.timer('crawler_dedup_seconds'):
+                duplicate = self.dedup.check_and_add(article_id, signature)
+            if duplicate:
+                duplicate_of, similarity = duplicate
+                self.logger.debug(f"Article {article_id} is a near-duplicate of {duplicate_of} "
+                                  f"(similarity {similarity:.2f}): {url}")
+                self.db.mark_as_duplicate(article_id, duplicate_of)
+                return 'duplicate', slots[0][0]
+                
+        # Giữ slot trong quota toàn cục, nhận số thứ tự file không trùng
+        for split, quota in slots:
+            if self.db.reserve_slot(article_id, category, split, quota) is not None:
+                break
+        else:
+            # Quota đã đủ: trả URL lại cho split/worker khác
+            self.db.release_claim(article_id)
+            self.forget_fingerprint(article_id)
+            return 'quota_full', slots[0][0]
+            
+        filepath = self.save_article(content, category, split, article_id, url)
+        if not filepath:
+            self.db.release_slot(article_id)
+            self.forget_fingerprint(article_id)
+            return 'write_failed', split
+            
+        # Checkpoint: ghi manifest rồi mới xác nhận slot trong database
+        self.manifest.record(article_id, url, category, split, filepath)
+        self.db.complete_slot(article_id)
+        return 'saved', split
+    
     def crawl_category(self, category, split='train', target_count=None):
         """
         Crawl articles for a specific category and split.
         
+        URLs are claimed from the database with a lease, so several crawler
+        processes can run on the same database; target_count is enforced
+        globally across all of them. Interrupted runs are reconciled first
+        (see resume), so a restart continues where the last run stopped.
+        Articles whose content nearly duplicates one already in the dataset
+        are marked in the database and skipped.
+        
         Args:
             category: Category name (thoisu, kinhte, congnghe)
             split: train or test
-            target_count: Number of articles to crawl
+            target_count: Total number of articles wanted for this category and split
             
         Returns:
-            Number of articles successfully crawled
+            Number of articles successfully crawled by this worker
         """
         if target_count is None:
             target_count = config.TRAIN_SAMPLES.get(category, 0) if split == 'train' else config.TEST_SAMPLES.get(category, 0)
+            
+        if not self.resumed:
+            self.resume()
+            
+        used_count = self.db.count_used(category, split)
+        self.logger.info(f"Crawling {target_count} articles for {category} ({split}), {used_count} already in dataset")
         
-        self.logger.info(f"Crawling {target_count} articles for {category} ({split})")
-        
-        # Lấy URLs chưa crawl từ database
-        urls = self.db.get_uncrawled_urls(category=category, limit=target_count * 2)  # Lấy dư để đề phòng
+        success_count = 0
+        claimed = deque()
+        pending = {}  # {future: (article_id, url)}
+        exhausted = False
+        last_heartbeat = time.monotonic()
         
-        if not urls:
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                    tqdm(total=target_count, initial=min(used_count, target_count), desc=f"{category} ({split})") as pbar:
+                while True:
+                    # Chỉ fetch thêm khi số bài trong dataset (mọi worker) + đang fetch chưa đủ target
+                    while len(pending) < self.max_workers and not exhausted:
+                        if self.db.count_used(category, split) + len(pending) >= target_count:
+                            break
+                        if not claimed:
+                            # Claim URL từ database với lease, tránh trùng với worker khác
+                            claimed.extend(self.db.claim_urls(self.worker_id, category, self.max_workers * 2))
+                            if not claimed:
+                                exhausted = True
+                                break
+                        article_id, url, _ = claimed.popleft()
+                        pending[executor.submit(self.fetch_article, url)] = (article_id, url)
+                        
+                    if not pending:
+                        break
+                        
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        article_id, url = pending.pop(future)
+                        try:
+                            content, signature = future.result()
+                        except Exception as e:
+                            # Lỗi không lường trước chỉ bỏ qua bài này. Claim được giữ đến release_claims bên dưới:
+                            # trả lại ngay thì claim_urls lấy lại URL này và lặp lỗi mãi trong lần chạy này
+                            self.logger.error(f"Error fetching {url}: {e}")
+                            continue
+                            
+                        # Ghi file và cập nhật database ở luồng chính
+                        result, _ = self.store_article(article_id, url, category, content, signature,
+                                                       [(split, target_count)])
+                        if result == 'saved':
+                            success_count += 1
+                            pbar.update(1)
+                            
+                    # Gia hạn lease cho các URL đang giữ
+                    if time.monotonic() - last_heartbeat > config.LEASE_SECONDS / 3:
+                        self.db.heartbeat(self.worker_id)
+                        last_heartbeat = time.monotonic()
+        finally:
+            # Trả lại các URL đã claim nhưng không dùng tới, kể cả khi bị dừng giữa chừng
+            self.db.release_claims(self.worker_id)
+            
+        for host, limiter in self.controller.limiters.items():
+            self.logger.info(f"Host {host}: concurrency limit {limiter.limit:.1f}, "
+                             f"{limiter.stats['ok']} ok, {limiter.stats['throttled']} throttled, "
+                             f"{limiter.stats['error']} errors")
+                             
+        if exhausted and success_count == 0:
             self.logger.warning(f"No URLs available for {category}")
-            return 0
+            
+        self.logger.info(f"Successfully crawled {success_count}/{target_count} articles for {category} ({split})")
+        return success_count
+    
+    def reextract_from_archive(self, jobs=None):
+        """
+        Re-run extraction for every article in the dataset from archived pages.
         
-        success_count = 0
+        No network requests are made; pages are parsed in parallel across
+        processes and the dataset files are rewritten in place.
         
-        for article_id, url, _ in tqdm(urls, desc=f"{category} ({split})"):
-            if success_count >= target_count:
-                break
-            
-            # Crawl content
-            content = self.extract_article_content(url)
+        Args:
+            jobs: Number of worker processes (default: number of CPU cores)
             
-            if content:
-                # Lưu vào file
-                filepath = self.save_article(content, category, split, success_count + 1)
-                if filepath:
-                    success_count += 1
-                    self.db.mark_as_crawled(article_id)
-                    self.db.mark_as_used(article_id)
-            else:
-                # Đánh dấu là đã crawl nhưng không dùng
-                self.db.mark_as_crawled(article_id)
+        Returns:
+            Dictionary with counts of rewritten, failed and missing articles
+        """
+        archive = self.archive or PageArchive(config.ARCHIVE_DIR)
+        
+        tasks = []
+        missing = 0
+        for article_id, url, category, split, _ in self.db.iter_used_articles():
+            location = archive.locate(url)
+            if location is None:
+                missing += 1
+                continue
+            tasks.append((article_id, category, split, url) + location)
             
-            # Delay giữa các request
-            time.sleep(config.DELAY_BETWEEN_REQUESTS + random.uniform(0, 0.5))
+        self.logger.info(f"Re-extracting {len(tasks)} archived articles ({missing} not in archive)")
         
-        self.logger.info(f"Successfully crawled {success_count}/{target_count} articles for {category} ({split})")
-        return success_count
+        stats = {'rewritten': 0, 'failed': 0, 'missing': missing}
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            extract = functools.partial(reextract_record, backend=self.extractor.name)
+            results = executor.map(extract, tasks, chunksize=64)
+            for task, content in tqdm(zip(tasks, results), total=len(tasks), desc="Re-extracting"):
+                article_id, category, split, url = task[:4]
+                # Giữ nguyên bản cũ nếu extract lại thất bại; trong corpus bản ghi mới nhất được dùng
+                if content and self.save_article(content, category, split, article_id, url):
+                    stats['rewritten'] += 1
+                else:
+                    stats['failed'] += 1
+                    self.logger.warning(f"Re-extraction failed for article {task[0]}")
+                    
+        self.logger.info(f"Re-extraction summary: {stats}")
+        return stats
     
     def crawl_all(self):
         """
@@ -210,7 +780,7 @@ class ArticleCrawler:
         for category in config.TRAIN_SAMPLES.keys():
             count = self.crawl_category(category, 'train')
             stats['train'][category] = count
-        
+            
         # Crawl test data
         self.logger.info("\n" + "="*50)
         self.logger.info("Crawling TEST data")
@@ -219,12 +789,13 @@ class ArticleCrawler:
         for category in config.TEST_SAMPLES.keys():
             count = self.crawl_category(category, 'test')
             stats['test'][category] = count
-        
+            
         # In summary
         self.logger.info("\n" + "="*50)
         self.logger.info("Crawling Summary:")
         self.logger.info(f"  Train: {stats['train']}")
         self.logger.info(f"  Test: {stats['test']}")
+        self.log_bytes_saved()
         self.logger.info("="*50 + "\n")
         
         return stats
@@ -0,0 +1,338 @@
+import os
+import re
+import json
+import gzip
+import mmap
+import time
+import struct
+import logging
+import threading
+from pathlib import Path
+
+
+# 02_text_representation/src/corpus_reader.py nạp file này theo đường dẫn để đọc corpus:
+# chỉ import thư viện chuẩn, không import phần còn lại của crawler
+
+# Mỗi entry trong file .idx: article_id, offset, length, thời điểm ghi
+INDEX_ENTRY = struct.Struct('<QQId')
+SHARD_PATTERN = re.compile(r'^shard-.+\.jsonl(\.gz)?$')
+
+
+def encode_record(article_id, category, split, url, text, compress=False):
+    """
+    Serialize one article as a corpus record.
+    
+    Args:
+        article_id: ID of the article
+        category: Category name
+        split: train or test
+        url: Article URL
+        text: Article content
+        compress: Wrap the record in its own gzip member
+        
+    Returns:
+        Record bytes (one JSON line, optionally gzip-compressed)
+    """
+    record = {'id': article_id, 'category': category, 'split': split, 'url': url, 'text': text}
+    data = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+    # Mỗi record là một gzip member riêng: cả shard vẫn đọc tuần tự được bằng gzip,
+    # đồng thời có thể giải nén một record bất kỳ theo offset
+    return gzip.compress(data, compresslevel=6) if compress else data
+
+
+def decode_record(data, compressed=False):
+    """
+    Parse record bytes produced by encode_record.
+    
+    Args:
+        data: Record bytes
+        compressed: Whether the record is a gzip member
+        
+    Returns:
+        Dictionary with id, category, split, url and text
+    """
+    if compressed:
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+class CorpusWriter:
+    """Appends articles to size-rotated shards under corpus/<split>/<category>/."""
+    
+    def __init__(self, corpus_dir, writer_id='main', compress=False, shard_size=64 * 1024 * 1024):
+        """
+        Initialize corpus writer.
+        
+        Args:
+            corpus_dir: Root directory of the corpus
+            writer_id: Unique writer identifier, part of the shard names (one writer per process)
+            compress: Store records as individual gzip members (.jsonl.gz)
+            shard_size: Size in bytes after which a new shard is started
+        """
+        self.corpus_dir = corpus_dir
+        self.writer_id = writer_id
+        self.compress = compress
+        self.shard_size = shard_size
+        self.logger = logging.getLogger('ThanhNienCrawler')
+        self.lock = threading.Lock()
+        self.shards = {}  # {(split, category): (data file, index file, path)}
+    
+    def _shard_path(self, split, category, number):
+        extension = '.jsonl.gz' if self.compress else '.jsonl'
+        return os.path.join(self.corpus_dir, split, category, f"shard-{self.writer_id}-{number:05d}{extension}")
+    
+    def _open_shard(self, split, category):
+        """Open the current (or next) shard of a split and category for appending."""
+        os.makedirs(os.path.join(self.corpus_dir, split, category), exist_ok=True)
+        
+        number = 0
+        while True:
+            path = self._shard_path(split, category, number)
+            if not os.path.exists(path) or os.path.getsize(path) < self.shard_size:
+                break
+            number += 1
+            
+        data_file = open(path, 'ab')
+        index_file = open(path + '.idx', 'ab')
+        self.shards[(split, category)] = (data_file, index_file, path)
+        return self.shards[(split, category)]
+    
+    def append(self, article_id, category, split, url, text):
+        """
+        Append an article to the corpus.
+        
+        Args:
+            article_id: ID of the article
+            category: Category name
+            split: train or test
+            url: Article URL
+            text: Article content
+            
+        Returns:
+            Location string "shard path:offset"
+        """
+        record = encode_record(article_id, category, split, url, text, self.compress)
+        
+        with self.lock:
+            shard = self.shards.get((split, category)) or self._open_shard(split, category)
+            data_file, index_file, path = shard
+            
+            offset = data_file.tell()
+            if offset and offset + len(record) > self.shard_size:
+                # Shard đầy: đóng lại và chuyển sang shard mới
+                data_file.close()
+                index_file.close()
+                data_file, index_file, path = self._open_shard(split, category)
+                offset = data_file.tell()
+                
+            # Ghi dữ liệu trước, index sau: entry trong index luôn trỏ tới record hoàn chỉnh
+            data_file.write(record)
+            data_file.flush()
+            index_file.write(INDEX_ENTRY.pack(article_id, offset, len(record), time.time()))
+            index_file.flush()
+            
+        return f"{path}:{offset}"
+    
+    def close(self):
+        """Close all open shards."""
+        with self.lock:
+            for data_file, index_file, _ in self.shards.values():
+                data_file.close()
+                index_file.close()
+            self.shards = {}
+
+
+class CorpusReader:
+    """Reads a sharded corpus sequentially or by article id."""
+    
+    def __init__(self, corpus_dir):
+        """
+        Initialize corpus reader and load the offset indexes.
+        
+        When an article id appears several times (e.g. after re-extraction),
+        the most recently written record wins.
+        
+        Args:
+            corpus_dir: Root directory of the corpus
+        """
+        self.corpus_dir = corpus_dir
+        self.entries = {}  # {article_id: (written_at, shard path, offset, length)}
+        self.maps = {}     # {shard path: mmap}
+        self.load_index()
+    
+    def shard_paths(self):
+        """
+        List the shard files of the corpus.
+        
+        Returns:
+            Sorted list of shard paths
+        """
+        if not os.path.isdir(self.corpus_dir):
+            return []
+        return sorted(str(path) for path in Path(self.corpus_dir).rglob('shard-*') if SHARD_PATTERN.match(path.name))
+    
+    def load_index(self):
+        """Read every .idx file into the id -> location table."""
+        for path in self.shard_paths():
+            index_path = path + '.idx'
+            if not os.path.exists(index_path):
+                continue
+                
+            with open(index_path, 'rb') as f:
+                data = f.read()
+            # Bỏ entry cuối bị cắt dở nếu process bị dừng giữa chừng
+            usable = len(data) - len(data) % INDEX_ENTRY.size
+            for article_id, offset, length, written_at in INDEX_ENTRY.iter_unpack(data[:usable]):
+                current = self.entries.get(article_id)
+                if current is None or written_at >= current[0]:
+                    self.entries[article_id] = (written_at, path, offset, length)
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __contains__(self, article_id):
+        return article_id in self.entries
+    
+    def ids(self):
+        """
+        Get the ids of all articles in the corpus.
+        
+        Returns:
+            Set of article ids
+        """
+        return set(self.entries)
+    
+    def _map(self, path):
+        mapped = self.maps.get(path)
+        if mapped is None:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.maps[path] = mapped
+        return mapped
+    
+    def get(self, article_id):
+        """
+        Read one article by id.
+        
+        Args:
+            article_id: ID of the article
+            
+        Returns:
+            Record dictionary or None if not in the corpus
+        """
+        entry = self.entries.get(article_id)
+        if entry is None:
+            return None
+            
+        _, path, offset, length = entry
+        return decode_record(self._map(path)[offset:offset + length], path.endswith('.gz'))
+    
+    def iter_records(self, split=None, category=None):
+        """
+        Stream records shard by shard in file order.
+        
+        Args:
+            split: Only records of this split (optional)
+            category: Only records of this category (optional)
+            
+        Yields:
+            Record dictionaries
+        """
+        by_shard = {}
+        for _, path, offset, length in self.entries.values():
+            by_shard.setdefault(path, []).append((offset, length))
+            
+        for path in sorted(by_shard):
+            shard_split, shard_category = Path(path).parent.parent.name, Path(path).parent.name
+            if (split and shard_split != split) or (category and shard_category != category):
+                continue
+                
+            compressed = path.endswith('.gz')
+            mapped = self._map(path)
+            # Đọc tuần tự theo offset tăng dần qua mmap, không seek/read từng record
+            for offset, length in sorted(by_shard[path]):
+                yield decode_record(mapped[offset:offset + length], compressed)
+    
+    def close(self):
+        """Release the memory maps."""
+        for mapped in self.maps.values():
+            mapped.close()
+        self.maps = {}
+
+
+# Tên file mới: {category}_{article_id:06d}.txt; tên kiểu cũ: {category}_{file_index:04d}.txt
+ID_NAME_DIGITS = 6
+
+
+def convert_tree(data_dir, corpus_dir, compress=False, shard_size=64 * 1024 * 1024, db=None):
+    """
+    Convert a <split>/<category>/*.txt tree into a sharded corpus.
+    
+    Files named after the article id (e.g. thoisu_000123.txt) keep that id.
+    Old index-based names (e.g. thoisu_0001.txt) carry a per-category,
+    per-split file index instead, so they are resolved to the article id
+    through the (category, split, file_index) slot in the database, as
+    ArticleCrawler.resume() does. Databases from before slots were recorded
+    first get them from the old files (DatabaseManager.assign_legacy_slots).
+    Files that cannot be resolved are skipped and reported instead of being
+    given a made-up id.
+    
+    Args:
+        data_dir: Directory containing train/ and test/
+        corpus_dir: Output corpus directory
+        compress: Store records as gzip members
+        shard_size: Maximum shard size in bytes
+        db: DatabaseManager used to resolve old index-based names and fill in URLs (optional)
+        
+    Returns:
+        Dictionary with counts of converted, skipped (empty) and unmatched files
+    """
+    logger = logging.getLogger('ThanhNienCrawler')
+    files = []
+    for split_dir in sorted(Path(data_dir).iterdir()):
+        if not split_dir.is_dir() or split_dir.name == os.path.basename(os.path.normpath(corpus_dir)):
+            continue
+        for category_dir in sorted(split_dir.iterdir()):
+            if category_dir.is_dir():
+                files.extend((split_dir.name, category_dir.name, path) for path in sorted(category_dir.glob('*.txt')))
+                
+    # Slot trong dataset -> id, và id -> URL
+    slots, urls = {}, {}
+    if db is not None:
+        # Database kiểu cũ chỉ có used_in_dataset: gán slot theo các file {category}_{n:04d}.txt trước
+        db.assign_legacy_slots(data_dir)
+        for article_id, url, category, split, index in db.iter_used_articles():
+            urls[article_id] = url
+            if index is not None:
+                slots[(category, split, index)] = article_id
+                
+    writer = CorpusWriter(corpus_dir, 'converted', compress, shard_size)
+    stats = {'converted': 0, 'skipped': 0, 'unmatched': 0}
+    used_ids = set()
+    
+    for split, category, path in files:
+        match = re.search(r'(\d+)$', path.stem)
+        if match is None:
+            article_id = None
+        elif len(match.group(1)) >= ID_NAME_DIGITS:
+            article_id = int(match.group(1))
+        else:
+            # Số thứ tự file chỉ duy nhất trong một category và split: tra id trong database
+            article_id = slots.get((category, split, int(match.group(1))))
+            
+        if article_id is None or article_id in used_ids:
+            reason = 'already converted under another name' if article_id is not None else 'no matching article in the database'
+            logger.warning(f"Skipping {path}: {reason}")
+            stats['unmatched'] += 1
+            continue
+            
+        text = path.read_text(encoding='utf-8').strip()
+        if not text:
+            stats['skipped'] += 1
+            continue
+        used_ids.add(article_id)
+        writer.append(article_id, category, split, urls.get(article_id, ''), text)
+        stats['converted'] += 1
+        
+    writer.close()
+    return stats
@@ -1,45 +1,224 @@
 import sqlite3
 import logging
+import threading
+import atexit
+import time
+from itertools import islice
 import config
+from .metrics import metrics
+from .file_utils import legacy_slots
+
+
+# Các bước migrate schema, đánh số theo PRAGMA user_version (bước i đưa schema lên version i + 1)
+MIGRATIONS = [
+    [
+        # Frontier theo category: partial index chỉ gồm các dòng chưa crawl
+        'CREATE INDEX IF NOT EXISTS idx_articles_frontier_category ON articles (category, id) WHERE crawled = 0',
+        # Frontier không lọc category
+        'CREATE INDEX IF NOT EXISTS idx_articles_frontier ON articles (id) WHERE crawled = 0',
+        # Các dòng đã crawl, dùng cho thống kê theo category và used_in_dataset
+        'CREATE INDEX IF NOT EXISTS idx_articles_crawled ON articles (category, used_in_dataset) WHERE crawled = 1',
+    ],
+    [
+        # Lease cho nhiều worker dùng chung database
+        'ALTER TABLE articles ADD COLUMN claimed_by TEXT',
+        'ALTER TABLE articles ADD COLUMN lease_expires REAL',
+        # Slot trong dataset: split và số thứ tự file, cấp phát toàn cục
+        'ALTER TABLE articles ADD COLUMN split TEXT',
+        'ALTER TABLE articles ADD COLUMN file_index INTEGER',
+        'CREATE INDEX IF NOT EXISTS idx_articles_slots ON articles (category, split, file_index) WHERE used_in_dataset = 1',
+        'CREATE INDEX IF NOT EXISTS idx_articles_claims ON articles (claimed_by) WHERE claimed_by IS NOT NULL',
+    ],
+    [
+        # Bài gần trùng: id của bài đã có trong dataset mà nó trùng với
+        'ALTER TABLE articles ADD COLUMN duplicate_of INTEGER',
+        'CREATE INDEX IF NOT EXISTS idx_articles_duplicates ON articles (duplicate_of) WHERE duplicate_of IS NOT NULL',
+    ],
+    [
+        # Số thứ tự thay đổi: tăng mỗi khi một bài được thêm hoặc đổi nội dung/trạng thái, dùng cho export tăng dần
+        'ALTER TABLE articles ADD COLUMN change_seq INTEGER',
+        'UPDATE articles SET change_seq = id',
+        'CREATE INDEX IF NOT EXISTS idx_articles_change_seq ON articles (change_seq)',
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_articles_change_seq_insert AFTER INSERT ON articles
+            BEGIN
+                UPDATE articles SET change_seq = (SELECT IFNULL(MAX(change_seq), 0) + 1 FROM articles)
+                WHERE id = NEW.id;
+            END
+        ''',
+        # Claim/lease không đổi dữ liệu export nên không tăng change_seq
+        '''
+            CREATE TRIGGER IF NOT EXISTS trg_articles_change_seq_update
+            AFTER UPDATE OF title, description, published_date, crawled, used_in_dataset, split, file_index, duplicate_of
+            ON articles
+            WHEN OLD.title IS NOT NEW.title OR OLD.description IS NOT NEW.description
+                OR OLD.published_date IS NOT NEW.published_date OR OLD.crawled IS NOT NEW.crawled
+                OR OLD.used_in_dataset IS NOT NEW.used_in_dataset OR OLD.split IS NOT NEW.split
+                OR OLD.file_index IS NOT NEW.file_index OR OLD.duplicate_of IS NOT NEW.duplicate_of
+            BEGIN
+                UPDATE articles SET change_seq = (SELECT IFNULL(MAX(change_seq), 0) + 1 FROM articles)
+                WHERE id = NEW.id;
+            END
+        ''',
+    ],
+]
+
+# Các cột được export, theo thứ tự
+EXPORT_COLUMNS = [
+    'id', 'url', 'title', 'category', 'published_date', 'description', 'collected_at',
+    'crawled', 'used_in_dataset', 'split', 'file_index', 'duplicate_of', 'change_seq',
+]
 
 
 class DatabaseManager:
     """Manager for SQLite database operations."""
     
-    def __init__(self, db_file=None):
+    def __init__(self, db_file=None, batch_size=None, flush_interval=None):
         """
         Initialize database manager.
         
         Args:
             db_file: Path to SQLite database file
+            batch_size: Number of queued updates that triggers a flush (default: config.DB_BATCH_SIZE)
+            flush_interval: Maximum seconds an update stays queued (default: config.DB_FLUSH_INTERVAL)
         """
         self.db_file = db_file or config.DB_FILE
+        self.batch_size = batch_size or config.DB_BATCH_SIZE
+        self.flush_interval = flush_interval if flush_interval is not None else config.DB_FLUSH_INTERVAL
         self.logger = logging.getLogger('ThanhNienCrawler')
+        
+        # Một connection dùng suốt vòng đời, được bảo vệ bởi lock
+        self.lock = threading.RLock()
+        self.conn = self.connect()
+        self.pending = []  # Hàng đợi write-behind: [(sql, params)]
+        self.closed = False
         self.setup_database()
+        
+        # Luồng nền flush hàng đợi theo thời gian
+        self.stop_event = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_loop, name='db-flusher', daemon=True)
+        self.flusher.start()
+        atexit.register(self.close)
+    
+    def connect(self):
+        """
+        Open the long-lived connection with WAL journaling and tuned pragmas.
+        
+        Returns:
+            sqlite3.Connection object
+        """
+        conn = sqlite3.connect(self.db_file, check_same_thread=False, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')  # Đủ an toàn với WAL, ít fsync hơn
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute(f'PRAGMA cache_size=-{int(config.DB_CACHE_SIZE_KB)}')
+        conn.execute('PRAGMA busy_timeout=30000')
+        return conn
     
     def setup_database(self):
         """Create database and tables if they don't exist."""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS articles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT UNIQUE NOT NULL,
-                title TEXT,
-                category TEXT NOT NULL,
-                published_date TEXT,
-                description TEXT,
-                collected_at TEXT,
-                crawled INTEGER DEFAULT 0,
-                used_in_dataset INTEGER DEFAULT 0
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        with self.lock, self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS articles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT UNIQUE NOT NULL,
+                    title TEXT,
+                    category TEXT NOT NULL,
+                    published_date TEXT,
+                    description TEXT,
+                    collected_at TEXT,
+                    crawled INTEGER DEFAULT 0,
+                    used_in_dataset INTEGER DEFAULT 0
+                )
+            ''')
+            
+        self.migrate()
         self.logger.info(f"Database ready: {self.db_file}")
     
+    def migrate(self):
+        """Apply pending schema migrations tracked by PRAGMA user_version."""
+        with self.lock:
+            while True:
+                with self.conn:
+                    # Khóa ghi trước khi đọc version để các process không migrate trùng
+                    self.conn.execute('BEGIN IMMEDIATE')
+                    version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+                    if version >= len(MIGRATIONS):
+                        break
+                        
+                    self.logger.info(f"Migrating database schema to version {version + 1}")
+                    for statement in MIGRATIONS[version]:
+                        self.conn.execute(statement)
+                    self.conn.execute(f'PRAGMA user_version = {version + 1}')
+    
+    def queue_update(self, sql, params):
+        """
+        Queue a state update to be written in the next batched transaction.
+        
+        Args:
+            sql: SQL statement
+            params: Statement parameters
+        """
+        with self.lock:
+            self.pending.append((sql, params))
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+    
+    def flush(self):
+        """Write all queued updates in a single transaction (kept queued if it fails)."""
+        with self.lock:
+            if not self.pending:
+                return
+                
+            batch, self.pending = self.pending, []
+            try:
+                with metrics.timer('crawler_db_seconds', op='flush'), self.conn:
+                    # Gom các câu lệnh giống nhau liên tiếp để dùng executemany
+                    start = 0
+                    while start < len(batch):
+                        sql = batch[start][0]
+                        end = start
+                        while end < len(batch) and batch[end][0] == sql:
+                            end += 1
+                        self.conn.executemany(sql, [params for _, params in batch[start:end]])
+                        start = end
+            except sqlite3.Error:
+                # Transaction đã rollback: đưa cả batch về đầu hàng đợi để lần flush sau ghi lại theo đúng thứ tự
+                self.pending[:0] = batch
+                raise
+    
+    def _flush_loop(self):
+        """Background loop flushing the queue every flush_interval seconds."""
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                self.logger.error(f"Error flushing database updates: {e}")
+    
+    def close(self):
+        """Drain queued updates and close the connection."""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            
+        self.stop_event.set()
+        if self.flusher is not threading.current_thread():
+            self.flusher.join()
+            
+        with self.lock:
+            try:
+                self.flush()
+            finally:
+                self.conn.close()
+        atexit.unregister(self.close)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def insert_article(self, article):
         """
         Insert article into database.
@@ -50,28 +229,59 @@ class DatabaseManager:
         Returns:
             True if successful, False otherwise
         """
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                INSERT INTO articles (url, title, category, published_date, description, collected_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                article['url'],
-                article['title'],
-                article['category'],
-                article['published_date'],
-                article['description'],
-                article['collected_at']
-            ))
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            # URL đã tồn tại
-            return False
-        finally:
-            conn.close()
+        with self.lock:
+            try:
+                with self.conn:
+                    self.conn.execute('''
+                        INSERT INTO articles (url, title, category, published_date, description, collected_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (
+                        article['url'],
+                        article['title'],
+                        article['category'],
+                        article['published_date'],
+                        article['description'],
+                        article['collected_at']
+                    ))
+                return True
+            except sqlite3.IntegrityError:
+                # URL đã tồn tại
+                return False
+    
+    @metrics.timed('crawler_db_seconds', op='insert_articles')
+    def insert_articles(self, articles):
+        """
+        Insert many articles in a single transaction, ignoring existing URLs.
+        
+        Args:
+            articles: Iterable of article dictionaries
+            
+        Returns:
+            Tuple (new_count, duplicate_count)
+        """
+        rows = [(
+            article['url'],
+            article['title'],
+            article['category'],
+            article['published_date'],
+            article['description'],
+            article['collected_at']
+        ) for article in articles]
+        
+        if not rows:
+            return 0, 0
+            
+        with self.lock:
+            with self.conn:
+                # rowcount chỉ đếm các dòng được chính INSERT thêm vào; total_changes còn đếm cả
+                # UPDATE của trigger change_seq nên không dùng được
+                cursor = self.conn.executemany('''
+                    INSERT OR IGNORE INTO articles (url, title, category, published_date, description, collected_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', rows)
+                new_count = cursor.rowcount
+                
+        return new_count, len(rows) - new_count
     
     def get_uncrawled_urls(self, category=None, limit=None):
         """
@@ -84,79 +294,538 @@ class DatabaseManager:
         Returns:
             List of tuples (id, url, category)
         """
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        return list(islice(self.iter_uncrawled_urls(category=category), limit))
+    
+    def iter_uncrawled_urls(self, category=None, page_size=None, start_after=0):
+        """
+        Stream uncrawled URLs in id order using keyset pagination.
         
-        query = 'SELECT id, url, category FROM articles WHERE crawled = 0'
-        params = []
+        Only one page is held in memory at a time, so the whole frontier can
+        be walked in constant memory. Rows marked as crawled while iterating
+        are skipped by later pages.
+        
+        Args:
+            category: Filter by category (optional)
+            page_size: Number of rows fetched per query (default: config.DB_PAGE_SIZE)
+            start_after: Only return rows with id greater than this value
+            
+        Yields:
+            Tuples (id, url, category)
+        """
+        page_size = page_size or config.DB_PAGE_SIZE
         
+        query = 'SELECT id, url, category FROM articles WHERE crawled = 0'
         if category:
             query += ' AND category = ?'
-            params.append(category)
+        query += ' AND id > ? ORDER BY id LIMIT ?'
+        
+        last_id = start_after
+        while True:
+            params = [category] if category else []
+            params += [last_id, page_size]
+            
+            with self.lock:
+                # Ghi các cập nhật đang chờ trước khi đọc
+                self.flush()
+                rows = self.conn.execute(query, params).fetchall()
+                
+            yield from rows
+            
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+    
+    def iter_urls(self, page_size=None):
+        """
+        Stream every stored URL in id order using keyset pagination.
+        
+        Args:
+            page_size: Number of rows fetched per query (default: config.DB_PAGE_SIZE)
+            
+        Yields:
+            URL strings
+        """
+        page_size = page_size or config.DB_PAGE_SIZE
         
-        if limit:
-            query += ' LIMIT ?'
-            params.append(limit)
+        last_id = 0
+        while True:
+            with self.lock:
+                self.flush()
+                rows = self.conn.execute(
+                    'SELECT id, url FROM articles WHERE id > ? ORDER BY id LIMIT ?', (last_id, page_size)
+                ).fetchall()
+                
+            for _, url in rows:
+                yield url
+                
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+    
+    def iter_used_articles(self, page_size=None):
+        """
+        Stream articles that have a slot in the dataset, in id order.
+        
+        Args:
+            page_size: Number of rows fetched per query (default: config.DB_PAGE_SIZE)
+            
+        Yields:
+            Tuples (id, url, category, split, file_index)
+        """
+        page_size = page_size or config.DB_PAGE_SIZE
+        query = '''
+            SELECT id, url, category, split, file_index FROM articles
+            WHERE used_in_dataset = 1 AND split IS NOT NULL AND id > ?
+            ORDER BY id LIMIT ?
+        '''
         
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        conn.close()
+        last_id = 0
+        while True:
+            with self.lock:
+                self.flush()
+                rows = self.conn.execute(query, (last_id, page_size)).fetchall()
+                
+            yield from rows
+            
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+    
+    def max_change_seq(self):
+        """
+        Get the latest change sequence number.
+        
+        Returns:
+            Highest change_seq in the database (0 when empty)
+        """
+        with self.lock:
+            self.flush()
+            return self.conn.execute('SELECT IFNULL(MAX(change_seq), 0) FROM articles').fetchone()[0]
+    
+    def iter_changed_articles(self, since=0, until=None, used_only=False, page_size=None):
+        """
+        Stream articles added or changed after a change sequence number, in change order.
+        
+        The upper bound is fixed when iteration starts, so rows changed while
+        the export runs are left for the next one instead of being read twice.
+        
+        Args:
+            since: Only rows with change_seq greater than this (0 = all rows)
+            until: Only rows with change_seq up to this (default: current maximum)
+            used_only: Only articles that have a slot in the dataset
+            page_size: Number of rows fetched per query (default: config.DB_PAGE_SIZE)
+            
+        Yields:
+            Dictionaries keyed by EXPORT_COLUMNS
+        """
+        page_size = page_size or config.DB_PAGE_SIZE
+        if until is None:
+            until = self.max_change_seq()
+        query = f'''
+            SELECT {', '.join(EXPORT_COLUMNS)} FROM articles
+            WHERE change_seq > ? AND change_seq <= ? {'AND used_in_dataset = 1' if used_only else ''}
+            ORDER BY change_seq LIMIT ?
+        '''
+        seq_column = EXPORT_COLUMNS.index('change_seq')
         
-        return results
+        last_seq = since
+        while True:
+            with self.lock:
+                self.flush()
+                rows = self.conn.execute(query, (last_seq, until, page_size)).fetchall()
+                
+            for row in rows:
+                yield dict(zip(EXPORT_COLUMNS, row))
+                
+            if len(rows) < page_size:
+                return
+            last_seq = rows[-1][seq_column]
     
     def mark_as_crawled(self, article_id):
         """
-        Mark article as crawled.
+        Mark article as crawled (written in the next batched flush).
+        
+        Args:
+            article_id: ID of the article in database
+        """
+        self.queue_update('UPDATE articles SET crawled = 1 WHERE id = ?', (article_id,))
+    
+    def mark_as_duplicate(self, article_id, duplicate_of):
+        """
+        Mark article as a near-duplicate and release its claim (written in the next batched flush).
         
         Args:
             article_id: ID of the article in database
+            duplicate_of: ID of the article it duplicates
         """
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('UPDATE articles SET crawled = 1 WHERE id = ?', (article_id,))
-        conn.commit()
-        conn.close()
+        self.queue_update(
+            '''UPDATE articles
+            SET crawled = 1, used_in_dataset = 0, duplicate_of = ?, claimed_by = NULL, lease_expires = NULL
+            WHERE id = ?''',
+            (duplicate_of, article_id)
+        )
     
     def mark_as_used(self, article_id):
         """
-        Mark article as used in dataset.
+        Mark article as used in dataset (written in the next batched flush).
         
         Args:
             article_id: ID of the article in database
         """
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('UPDATE articles SET used_in_dataset = 1 WHERE id = ?', (article_id,))
-        conn.commit()
-        conn.close()
+        self.queue_update('UPDATE articles SET used_in_dataset = 1 WHERE id = ?', (article_id,))
     
-    def get_stats(self):
+    @metrics.timed('crawler_db_seconds', op='claim_urls')
+    def claim_urls(self, worker_id, category=None, limit=1, lease_seconds=None):
         """
-        Get database statistics.
+        Atomically claim uncrawled URLs for a worker.
+        
+        Rows that are unclaimed or whose lease has expired are assigned to
+        worker_id until now + lease_seconds, so concurrent processes never
+        receive the same row.
         
+        Args:
+            worker_id: Unique identifier of the claiming worker
+            category: Filter by category (optional)
+            limit: Maximum number of URLs to claim
+            lease_seconds: Lease duration (default: config.LEASE_SECONDS)
+            
         Returns:
-            Dictionary with statistics
+            List of tuples (id, url, category)
+        """
+        lease_seconds = lease_seconds or config.LEASE_SECONDS
+        now = time.time()
+        
+        query = '''
+            SELECT id, url, category FROM articles
+            WHERE crawled = 0 AND (claimed_by IS NULL OR lease_expires < ?)
+        '''
+        params = [now]
+        if category:
+            query += ' AND category = ?'
+            params.append(category)
+        query += ' ORDER BY id LIMIT ?'
+        params.append(limit)
+        
+        with self.lock:
+            self.flush()
+            with self.conn:
+                # BEGIN IMMEDIATE giữ khóa ghi giữa SELECT và UPDATE
+                self.conn.execute('BEGIN IMMEDIATE')
+                rows = self.conn.execute(query, params).fetchall()
+                self.conn.executemany(
+                    'UPDATE articles SET claimed_by = ?, lease_expires = ? WHERE id = ?',
+                    [(worker_id, now + lease_seconds, row[0]) for row in rows]
+                )
+                
+        return rows
+    
+    @metrics.timed('crawler_db_seconds', op='claim_listed')
+    def claim_listed(self, worker_id, urls, lease_seconds=None):
         """
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        Atomically claim specific URLs (e.g. just collected) for a worker.
         
-        stats = {}
+        Only rows that are uncrawled and unclaimed (or whose lease has
+        expired) are claimed, as in claim_urls.
         
-        # Tổng số bài viết
-        cursor.execute('SELECT COUNT(*) FROM articles')
-        stats['total'] = cursor.fetchone()[0]
+        Args:
+            worker_id: Unique identifier of the claiming worker
+            urls: List of URLs
+            lease_seconds: Lease duration (default: config.LEASE_SECONDS)
+            
+        Returns:
+            List of tuples (id, url, category)
+        """
+        lease_seconds = lease_seconds or config.LEASE_SECONDS
+        now = time.time()
+        rows = []
+        
+        with self.lock:
+            self.flush()
+            with self.conn:
+                self.conn.execute('BEGIN IMMEDIATE')
+                # Chia nhỏ để không vượt giới hạn số tham số của SQLite
+                for start in range(0, len(urls), 500):
+                    chunk = urls[start:start + 500]
+                    rows += self.conn.execute(
+                        f'''SELECT id, url, category FROM articles
+                        WHERE url IN ({','.join('?' * len(chunk))})
+                            AND crawled = 0 AND (claimed_by IS NULL OR lease_expires < ?)
+                        ORDER BY id''',
+                        chunk + [now]
+                    ).fetchall()
+                self.conn.executemany(
+                    'UPDATE articles SET claimed_by = ?, lease_expires = ? WHERE id = ?',
+                    [(worker_id, now + lease_seconds, row[0]) for row in rows]
+                )
+                
+        return rows
+    
+    @metrics.timed('crawler_db_seconds', op='heartbeat')
+    def heartbeat(self, worker_id, lease_seconds=None):
+        """
+        Extend the lease of every uncrawled row claimed by a worker.
+        
+        Args:
+            worker_id: Worker identifier
+            lease_seconds: New lease duration from now (default: config.LEASE_SECONDS)
+            
+        Returns:
+            Number of leases extended
+        """
+        lease_seconds = lease_seconds or config.LEASE_SECONDS
+        with self.lock:
+            with self.conn:
+                cursor = self.conn.execute(
+                    'UPDATE articles SET lease_expires = ? WHERE claimed_by = ? AND crawled = 0',
+                    (time.time() + lease_seconds, worker_id)
+                )
+        return cursor.rowcount
+    
+    def release_claim(self, article_id):
+        """
+        Release the lease on one article (written in the next batched flush).
+        
+        Args:
+            article_id: ID of the article in database
+        """
+        self.queue_update(
+            'UPDATE articles SET claimed_by = NULL, lease_expires = NULL WHERE id = ?', (article_id,)
+        )
+    
+    def release_claims(self, worker_id):
+        """
+        Release every lease still held by a worker.
+        
+        Args:
+            worker_id: Worker identifier
+            
+        Returns:
+            Number of leases released
+        """
+        with self.lock:
+            self.flush()
+            with self.conn:
+                cursor = self.conn.execute(
+                    'UPDATE articles SET claimed_by = NULL, lease_expires = NULL WHERE claimed_by = ?',
+                    (worker_id,)
+                )
+        return cursor.rowcount
+    
+    def reclaim_expired(self):
+        """
+        Clear leases that have expired (e.g. left by a crashed worker).
+        
+        Returns:
+            Number of leases cleared
+        """
+        with self.lock:
+            with self.conn:
+                cursor = self.conn.execute(
+                    '''UPDATE articles SET claimed_by = NULL, lease_expires = NULL
+                    WHERE claimed_by IS NOT NULL AND lease_expires < ?''',
+                    (time.time(),)
+                )
+        return cursor.rowcount
+    
+    @metrics.timed('crawler_db_seconds', op='count_used')
+    def count_used(self, category, split):
+        """
+        Count articles used in the dataset for a category and split, across all workers.
+        
+        Args:
+            category: Category name
+            split: train or test
+            
+        Returns:
+            Number of used articles
+        """
+        with self.lock:
+            return self.conn.execute(
+                'SELECT COUNT(*) FROM articles WHERE used_in_dataset = 1 AND category = ? AND split = ?',
+                (category, split)
+            ).fetchone()[0]
+    
+    def assign_legacy_slots(self, output_dir=None):
+        """
+        Give dataset slots to articles used before slots were recorded.
+        
+        Older versions only set used_in_dataset and wrote {category}_{n:04d}.txt
+        files, taking URLs in id order and the train split before the test
+        split. The used articles of a category without a slot are matched in
+        id order to those files, so count_used() sees the existing dataset
+        instead of a new quota being crawled next to it. Files whose slot is
+        already taken are left out.
+        
+        Args:
+            output_dir: Root directory of the .txt tree (default: config.OUTPUT_DIR)
+            
+        Returns:
+            Number of articles given a slot
+        """
+        assigned = 0
+        for category, files in legacy_slots(output_dir).items():
+            with self.lock:
+                self.flush()
+                with self.conn:
+                    taken = set(self.conn.execute(
+                        '''SELECT split, file_index FROM articles
+                        WHERE used_in_dataset = 1 AND category = ? AND split IS NOT NULL''',
+                        (category,)
+                    ).fetchall())
+                    ids = [row[0] for row in self.conn.execute(
+                        '''SELECT id FROM articles
+                        WHERE used_in_dataset = 1 AND category = ? AND split IS NULL
+                        ORDER BY id''',
+                        (category,)
+                    )]
+                    # Bài thứ k (theo id) của category ứng với file thứ k: train trước, test sau
+                    free = [slot for slot in files if slot not in taken]
+                    updates = [(split, index, article_id) for article_id, (split, index) in zip(ids, free)]
+                    self.conn.executemany('UPDATE articles SET split = ?, file_index = ? WHERE id = ?', updates)
+            assigned += len(updates)
+        return assigned
+    
+    @metrics.timed('crawler_db_seconds', op='reserve_slot')
+    def reserve_slot(self, article_id, category, split, quota):
+        """
+        Atomically reserve a dataset slot for a crawled article.
+        
+        The article is marked as crawled and used and receives the next free
+        file index of (category, split), unless the global quota is reached.
+        The claim is kept until complete_slot, so a reservation whose file was
+        never written can be told apart from one still being saved.
+        
+        Args:
+            article_id: ID of the article in database
+            category: Category name
+            split: train or test
+            quota: Maximum number of used articles for (category, split)
+            
+        Returns:
+            File index assigned to the article, or None if the quota is full
+        """
+        with self.lock:
+            with self.conn:
+                self.conn.execute('BEGIN IMMEDIATE')
+                used, max_index = self.conn.execute(
+                    '''SELECT COUNT(*), COALESCE(MAX(file_index), 0) FROM articles
+                    WHERE used_in_dataset = 1 AND category = ? AND split = ?''',
+                    (category, split)
+                ).fetchone()
+                if used >= quota:
+                    return None
+                    
+                self.conn.execute(
+                    '''UPDATE articles
+                    SET crawled = 1, used_in_dataset = 1, split = ?, file_index = ?
+                    WHERE id = ?''',
+                    (split, max_index + 1, article_id)
+                )
+        return max_index + 1
+    
+    def complete_slot(self, article_id):
+        """
+        Mark a reserved slot as written to disk (written in the next batched flush).
+        
+        Args:
+            article_id: ID of the article in database
+        """
+        self.release_claim(article_id)
+    
+    @metrics.timed('crawler_db_seconds', op='release_slot')
+    def release_slot(self, article_id):
+        """
+        Undo reserve_slot, returning the article to the uncrawled frontier.
+        
+        Args:
+            article_id: ID of the article in database
+        """
+        with self.lock:
+            with self.conn:
+                self.conn.execute(
+                    '''UPDATE articles
+                    SET crawled = 0, used_in_dataset = 0, split = NULL, file_index = NULL,
+                        claimed_by = NULL, lease_expires = NULL
+                    WHERE id = ?''',
+                    (article_id,)
+                )
+    
+    @metrics.timed('crawler_db_seconds', op='release_stale_slot')
+    def release_stale_slot(self, article_id):
+        """
+        Undo a reservation whose file was never written.
         
-        # Số bài đã crawl
-        cursor.execute('SELECT COUNT(*) FROM articles WHERE crawled = 1')
-        stats['crawled'] = cursor.fetchone()[0]
+        Slots still claimed under a live lease are left alone, since another
+        worker may be saving the file right now.
         
-        # Số bài chưa crawl
-        cursor.execute('SELECT COUNT(*) FROM articles WHERE crawled = 0')
-        stats['uncrawled'] = cursor.fetchone()[0]
+        Args:
+            article_id: ID of the article in database
+            
+        Returns:
+            True if the slot was released, False otherwise
+        """
+        with self.lock:
+            self.flush()
+            with self.conn:
+                cursor = self.conn.execute(
+                    '''UPDATE articles
+                    SET crawled = 0, used_in_dataset = 0, split = NULL, file_index = NULL,
+                        claimed_by = NULL, lease_expires = NULL
+                    WHERE id = ? AND used_in_dataset = 1
+                        AND (claimed_by IS NULL OR lease_expires < ?)''',
+                    (article_id, time.time())
+                )
+        return cursor.rowcount > 0
+    
+    def get_claim_holders(self):
+        """
+        List the workers currently holding at least one claim.
         
-        # Theo từng category
-        cursor.execute('SELECT category, COUNT(*) FROM articles GROUP BY category')
-        stats['by_category'] = dict(cursor.fetchall())
+        Returns:
+            List of worker identifiers
+        """
+        with self.lock:
+            self.flush()
+            rows = self.conn.execute(
+                'SELECT DISTINCT claimed_by FROM articles WHERE claimed_by IS NOT NULL'
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    @metrics.timed('crawler_db_seconds', op='get_stats')
+    def get_stats(self):
+        """
+        Get database statistics.
         
-        conn.close()
+        Returns:
+            Dictionary with statistics
+        """
+        with self.lock:
+            self.flush()
+            cursor = self.conn.cursor()
+            
+            stats = {}
+            
+            # Đếm theo category trên hai partial index (chưa crawl / đã crawl)
+            cursor.execute('SELECT category, COUNT(*) FROM articles WHERE crawled = 0 GROUP BY category')
+            uncrawled_by_category = dict(cursor.fetchall())
+            cursor.execute('SELECT category, COUNT(*) FROM articles WHERE crawled = 1 GROUP BY category')
+            crawled_by_category = dict(cursor.fetchall())
+            
+            # Số bài chưa crawl / đã crawl
+            stats['uncrawled'] = sum(uncrawled_by_category.values())
+            stats['crawled'] = sum(crawled_by_category.values())
+            
+            # Số bài bị bỏ qua vì gần trùng
+            cursor.execute('SELECT COUNT(*) FROM articles WHERE duplicate_of IS NOT NULL')
+            stats['duplicates'] = cursor.fetchone()[0]
+            
+            # Tổng số bài viết
+            stats['total'] = stats['crawled'] + stats['uncrawled']
+            
+            # Theo từng category
+            stats['by_category'] = {
+                category: uncrawled_by_category.get(category, 0) + crawled_by_category.get(category, 0)
+                for category in sorted(set(uncrawled_by_category) | set(crawled_by_category))
+            }
+            
         return stats
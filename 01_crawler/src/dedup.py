@@ -0,0 +1,296 @@
+import re
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+import numpy as np
+
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+WORD_PATTERN = re.compile(r'\w+')
+# numpy 2.x đổi tên trapz thành trapezoid
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
+
+def shingles(text, size):
+    """
+    Split text into overlapping word n-grams.
+    
+    Args:
+        text: Article content
+        size: Number of words per shingle
+        
+    Returns:
+        Set of shingle strings
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def optimal_bands(threshold, num_perm):
+    """
+    Choose the LSH banding (bands, rows) for a Jaccard threshold.
+    
+    Minimizes the sum of the false positive and false negative areas of the
+    S-curve 1 - (1 - s^rows)^bands, with bands * rows <= num_perm.
+    
+    Args:
+        threshold: Jaccard similarity threshold
+        num_perm: Number of MinHash permutations
+        
+    Returns:
+        Tuple (bands, rows)
+    """
+    below = np.linspace(0.0, threshold, 200)
+    above = np.linspace(threshold, 1.0, 200)
+    
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_positive = _trapezoid(1 - (1 - below ** rows) ** bands, below)
+            false_negative = _trapezoid((1 - above ** rows) ** bands, above)
+            if false_positive + false_negative < best_error:
+                best, best_error = (bands, rows), false_positive + false_negative
+    return best
+
+
+class MinHasher:
+    """MinHash signatures of word shingles."""
+    
+    def __init__(self, num_perm=128, shingle_size=5, seed=1):
+        """
+        Initialize MinHash permutations.
+        
+        Args:
+            num_perm: Number of hash permutations (signature length)
+            shingle_size: Number of words per shingle
+            seed: Random seed; must stay the same for a persisted index
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+    
+    def signature(self, text):
+        """
+        Compute the MinHash signature of a text.
+        
+        Args:
+            text: Article content
+            
+        Returns:
+            numpy uint32 array of length num_perm, or None for empty text
+        """
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return None
+            
+        hashes = np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in grams), dtype=np.uint64, count=len(grams))
+        # Hoán vị (a * h + b) mod p cho mọi shingle và mọi permutation cùng lúc
+        permuted = ((hashes[:, None] * self.a + self.b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def jaccard(signature, other):
+    """
+    Estimate the Jaccard similarity of two MinHash signatures.
+    
+    Args:
+        signature: numpy uint32 array
+        other: numpy uint32 array of the same length
+        
+    Returns:
+        Fraction of equal positions
+    """
+    return float(np.mean(signature == other))
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index persisted in SQLite, with constant-time lookups."""
+    
+    def __init__(self, index_file, threshold=0.8, num_perm=128, shingle_size=5, max_candidates=20):
+        """
+        Open (or create) the index.
+        
+        Args:
+            index_file: SQLite file holding signatures and LSH buckets
+            threshold: Estimated Jaccard similarity at which an article is a duplicate
+            num_perm: Number of MinHash permutations
+            shingle_size: Number of words per shingle
+            max_candidates: Maximum number of bucket candidates verified per lookup
+            
+        Raises:
+            ValueError: If the file was built with different parameters
+        """
+        self.index_file = index_file
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.logger = logging.getLogger('ThanhNienCrawler')
+        self.lock = threading.RLock()
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        
+        self.conn = sqlite3.connect(index_file, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.conn:
+            self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS signatures (article_id INTEGER PRIMARY KEY, signature BLOB NOT NULL)')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS buckets (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    article_id INTEGER NOT NULL,
+                    PRIMARY KEY (band, bucket, article_id)
+                ) WITHOUT ROWID
+            ''')
+        self.check_params(f"{num_perm}/{shingle_size}/{self.bands}x{self.rows}")
+    
+    def check_params(self, params):
+        """Store the index parameters, or verify them against an existing file."""
+        with self.conn:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'params'").fetchone()
+            if row is None:
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('params', ?)", (params,))
+            elif row[0] != params:
+                raise ValueError(f"{self.index_file} was built with parameters {row[0]}, not {params}; "
+                                 f"delete it to rebuild the index")
+    
+    def signature(self, text):
+        """
+        Compute the MinHash signature of a text.
+        
+        Args:
+            text: Article content
+            
+        Returns:
+            numpy uint32 array or None for empty text
+        """
+        return self.hasher.signature(text)
+    
+    def band_keys(self, signature):
+        """
+        Hash each band of a signature to a bucket key.
+        
+        Args:
+            signature: numpy uint32 array
+            
+        Returns:
+            List of (band, bucket) tuples
+        """
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            bucket = int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), 'little', signed=True)
+            keys.append((band, bucket))
+        return keys
+    
+    def _query(self, signature, keys, exclude=None):
+        # Số band cố định và số candidate bị giới hạn: chi phí không phụ thuộc kích thước corpus
+        candidates = set()
+        for band, bucket in keys:
+            rows = self.conn.execute(
+                'SELECT article_id FROM buckets WHERE band = ? AND bucket = ? LIMIT ?',
+                (band, bucket, self.max_candidates)
+            ).fetchall()
+            candidates.update(row[0] for row in rows if row[0] != exclude)
+            if len(candidates) >= self.max_candidates:
+                break
+                
+        best = None
+        for article_id in candidates:
+            row = self.conn.execute('SELECT signature FROM signatures WHERE article_id = ?', (article_id,)).fetchone()
+            if row is None:
+                continue
+            similarity = jaccard(signature, np.frombuffer(row[0], dtype=np.uint32))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (article_id, similarity)
+        return best
+    
+    def query(self, signature):
+        """
+        Find the most similar indexed article above the threshold.
+        
+        Args:
+            signature: numpy uint32 array
+            
+        Returns:
+            Tuple (article_id, similarity) or None
+        """
+        with self.lock:
+            return self._query(signature, self.band_keys(signature))
+    
+    def _insert(self, article_id, signature, keys):
+        self.conn.execute('INSERT OR REPLACE INTO signatures (article_id, signature) VALUES (?, ?)',
+                          (article_id, signature.tobytes()))
+        self.conn.executemany('INSERT OR IGNORE INTO buckets (band, bucket, article_id) VALUES (?, ?, ?)',
+                              [(band, bucket, article_id) for band, bucket in keys])
+    
+    def add(self, article_id, signature):
+        """
+        Index an article.
+        
+        Args:
+            article_id: ID of the article
+            signature: numpy uint32 array
+        """
+        keys = self.band_keys(signature)
+        with self.lock, self.conn:
+            self._insert(article_id, signature, keys)
+    
+    def check_and_add(self, article_id, signature):
+        """
+        Atomically look for a near-duplicate and index the article if there is none.
+        
+        Args:
+            article_id: ID of the article
+            signature: numpy uint32 array
+            
+        Returns:
+            Tuple (duplicate article_id, similarity), or None if the article was indexed
+        """
+        keys = self.band_keys(signature)
+        with self.lock, self.conn:
+            # BEGIN IMMEDIATE: hai process không thể cùng nhận hai bản sao là "mới"
+            self.conn.execute('BEGIN IMMEDIATE')
+            # Bỏ qua chính bài này (signature còn sót lại nếu lần crawl trước bị dừng giữa chừng)
+            duplicate = self._query(signature, keys, exclude=article_id)
+            if duplicate is None:
+                self._insert(article_id, signature, keys)
+            return duplicate
+    
+    def remove(self, article_id):
+        """
+        Remove an article from the index (e.g. when it could not be saved).
+        
+        Args:
+            article_id: ID of the article
+        """
+        with self.lock, self.conn:
+            row = self.conn.execute('SELECT signature FROM signatures WHERE article_id = ?', (article_id,)).fetchone()
+            if row is None:
+                return
+            keys = self.band_keys(np.frombuffer(row[0], dtype=np.uint32))
+            self.conn.executemany('DELETE FROM buckets WHERE band = ? AND bucket = ? AND article_id = ?',
+                                  [(band, bucket, article_id) for band, bucket in keys])
+            self.conn.execute('DELETE FROM signatures WHERE article_id = ?', (article_id,))
+    
+    def ids(self):
+        """
+        Get the ids of all indexed articles.
+        
+        Returns:
+            Set of article ids
+        """
+        with self.lock:
+            return {row[0] for row in self.conn.execute('SELECT article_id FROM signatures')}
+    
+    def close(self):
+        """Close the index connection."""
+        with self.lock:
+            self.conn.close()
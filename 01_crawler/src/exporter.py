@@ -0,0 +1,280 @@
+import os
+import csv
+import json
+import gzip
+import logging
+from datetime import datetime
+
+import config
+from .database import EXPORT_COLUMNS
+from .corpus import CorpusReader
+from .file_utils import article_path
+
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+WATERMARK_FILE = '_watermark.json'
+
+
+class JsonlPartWriter:
+    """Writes rows as JSON Lines, optionally gzip-compressed."""
+    
+    extension = 'jsonl'
+    
+    def __init__(self, path, columns, compress=False):
+        self.handle = gzip.open(path, 'wt', encoding='utf-8', compresslevel=config.EXPORT_COMPRESS_LEVEL) \
+            if compress else open(path, 'w', encoding='utf-8')
+    
+    def write_rows(self, rows):
+        self.handle.writelines(json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n' for row in rows)
+    
+    def close(self):
+        self.handle.close()
+
+
+class CsvPartWriter:
+    """Writes rows as CSV with a header line, optionally gzip-compressed."""
+    
+    extension = 'csv'
+    
+    def __init__(self, path, columns, compress=False):
+        self.handle = gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=config.EXPORT_COMPRESS_LEVEL) \
+            if compress else open(path, 'w', encoding='utf-8', newline='')
+        self.writer = csv.DictWriter(self.handle, fieldnames=columns)
+        self.writer.writeheader()
+    
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+    
+    def close(self):
+        self.handle.close()
+
+
+class ParquetPartWriter:
+    """Writes rows as Parquet, one row group per chunk (requires pyarrow)."""
+    
+    extension = 'parquet'
+    
+    def __init__(self, path, columns, compress=False):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+            
+        self.pa = pa
+        # Schema cố định để các chunk toàn giá trị NULL vẫn cùng kiểu cột
+        integer_columns = {'id', 'crawled', 'used_in_dataset', 'file_index', 'duplicate_of', 'change_seq'}
+        self.schema = pa.schema([(column, pa.int64() if column in integer_columns else pa.string())
+                                 for column in columns])
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd' if compress else 'none')
+    
+    def write_rows(self, rows):
+        self.writer.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+    
+    def close(self):
+        self.writer.close()
+
+
+PART_WRITERS = {
+    'jsonl': JsonlPartWriter,
+    'csv': CsvPartWriter,
+    'parquet': ParquetPartWriter,
+}
+
+
+class ArticleTextLookup:
+    """Reads the saved text of dataset articles from the corpus or the .txt files."""
+    
+    def __init__(self, output_dir=None):
+        """
+        Initialize text lookup.
+        
+        Args:
+            output_dir: Root output directory (default: config.OUTPUT_DIR)
+        """
+        self.output_dir = output_dir or config.OUTPUT_DIR
+        # Chỉ đọc index của corpus (id -> vị trí), nội dung được đọc qua mmap khi cần
+        self.corpus = CorpusReader(os.path.join(self.output_dir, config.CORPUS_DIR))
+    
+    def get(self, row):
+        """
+        Get the text of one article.
+        
+        Args:
+            row: Article row from the database
+            
+        Returns:
+            Article text or None if it was not saved
+        """
+        record = self.corpus.get(row['id'])
+        if record is not None:
+            return record['text']
+        if not row['used_in_dataset'] or not row['split']:
+            return None
+            
+        try:
+            with open(article_path(row['category'], row['split'], row['id'], self.output_dir), encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+    
+    def close(self):
+        self.corpus.close()
+
+
+class ArticleExporter:
+    """
+    Streams the articles table into JSONL/CSV/Parquet part files.
+    
+    Rows are read from the database with keyset pagination on change_seq and
+    written chunk by chunk, so memory stays constant whatever the size of the
+    table. Each export writes one part file named after the change_seq range
+    it covers and records that range in a watermark file; an incremental
+    export only writes the rows added or changed since the watermark. A row
+    changed again later appears in a newer part, so consumers should keep
+    the last version of each id.
+    """
+    
+    def __init__(self, db, export_dir, fmt=None, compress=None, with_text=False, used_only=False, chunk_size=None):
+        """
+        Initialize exporter.
+        
+        Args:
+            db: DatabaseManager
+            export_dir: Directory of the part files and the watermark
+            fmt: "jsonl", "csv" or "parquet" (default: config.EXPORT_FORMAT)
+            compress: gzip for JSONL/CSV, zstd for Parquet (default: config.EXPORT_COMPRESS)
+            with_text: Add the saved article text as a "text" column
+            used_only: Only export articles that have a slot in the dataset
+            chunk_size: Rows read and written per batch (default: config.EXPORT_CHUNK_SIZE)
+        """
+        self.db = db
+        self.export_dir = export_dir
+        self.fmt = fmt or config.EXPORT_FORMAT
+        if self.fmt not in PART_WRITERS:
+            raise ValueError(f"Unknown export format: {self.fmt} (expected one of {', '.join(FORMATS)})")
+        self.compress = config.EXPORT_COMPRESS if compress is None else compress
+        self.with_text = with_text
+        self.used_only = used_only
+        self.chunk_size = chunk_size or config.EXPORT_CHUNK_SIZE
+        self.columns = EXPORT_COLUMNS + (['text'] if with_text else [])
+        self.logger = logging.getLogger('ThanhNienCrawler')
+    
+    def options(self):
+        """Options that must stay the same across the parts of one export directory."""
+        return {'format': self.fmt, 'compress': self.compress, 'with_text': self.with_text, 'used_only': self.used_only}
+    
+    def part_name(self, first_seq, last_seq):
+        extension = PART_WRITERS[self.fmt].extension
+        if self.compress and self.fmt != 'parquet':
+            extension += '.gz'
+        return f"part-{first_seq:010d}-{last_seq:010d}.{extension}"
+    
+    def part_paths(self):
+        """
+        List the part files in the export directory.
+        
+        Returns:
+            Sorted list of part paths
+        """
+        if not os.path.isdir(self.export_dir):
+            return []
+        return sorted(os.path.join(self.export_dir, name) for name in os.listdir(self.export_dir)
+                      if name.startswith('part-') and not name.endswith('.tmp'))
+    
+    def read_watermark(self):
+        """
+        Read the watermark of the last export.
+        
+        Returns:
+            Watermark dictionary or None if there is none
+        """
+        path = os.path.join(self.export_dir, WATERMARK_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def write_watermark(self, change_seq, parts):
+        path = os.path.join(self.export_dir, WATERMARK_FILE)
+        watermark = {
+            'change_seq': change_seq,
+            'parts': parts,
+            'exported_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            **self.options(),
+        }
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(watermark, f, ensure_ascii=False, indent=2)
+        os.replace(path + '.tmp', path)
+    
+    def export(self, incremental=False, overwrite=False):
+        """
+        Export changed rows (or every row) into a new part file.
+        
+        Args:
+            incremental: Only export rows changed since the watermark
+            overwrite: Delete existing parts before a full export
+            
+        Returns:
+            Dictionary with the part path (None when nothing changed), row count and change_seq range
+        """
+        os.makedirs(self.export_dir, exist_ok=True)
+        watermark = self.read_watermark()
+        
+        since = 0
+        if incremental and watermark:
+            previous = {key: watermark.get(key) for key in self.options()}
+            if previous != self.options():
+                raise ValueError(f"Export options {self.options()} differ from the existing export "
+                                 f"in {self.export_dir}: {previous}")
+            since = watermark['change_seq']
+        elif self.part_paths() or watermark:
+            if not overwrite:
+                raise FileExistsError(f"{self.export_dir} already contains an export; "
+                                      "use incremental mode or overwrite it")
+            for path in self.part_paths():
+                os.remove(path)
+            watermark = None
+            
+        # Cố định cận trên trước khi đọc: dòng thay đổi trong lúc export thuộc lần export sau
+        until = self.db.max_change_seq()
+        stats = {'path': None, 'rows': 0, 'from': since + 1, 'to': until}
+        if until <= since:
+            self.logger.info(f"No articles changed since change_seq {since}")
+            return stats
+            
+        path = os.path.join(self.export_dir, self.part_name(since + 1, until))
+        tmp_path = path + '.tmp'
+        lookup = ArticleTextLookup() if self.with_text else None
+        writer = PART_WRITERS[self.fmt](tmp_path, self.columns, self.compress)
+        
+        try:
+            chunk = []
+            for row in self.db.iter_changed_articles(since, until, self.used_only, page_size=self.chunk_size):
+                if lookup:
+                    row['text'] = lookup.get(row)
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    writer.write_rows(chunk)
+                    stats['rows'] += len(chunk)
+                    chunk = []
+            if chunk:
+                writer.write_rows(chunk)
+                stats['rows'] += len(chunk)
+        except BaseException:
+            writer.close()
+            os.remove(tmp_path)
+            raise
+        finally:
+            if lookup:
+                lookup.close()
+                
+        writer.close()
+        # Part chỉ xuất hiện khi đã ghi xong, watermark chỉ tiến sau khi part đã có
+        os.replace(tmp_path, path)
+        parts = (watermark or {}).get('parts', []) + [os.path.basename(path)]
+        self.write_watermark(until, parts)
+        
+        stats['path'] = path
+        self.logger.info(f"Exported {stats['rows']} articles (change_seq {since + 1}-{until}) to {path}")
+        return stats
@@ -0,0 +1,354 @@
+import re
+import threading
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import EncodingDetector
+from lxml import etree
+
+from .file_utils import clean_text
+
+
+# Thẻ mở của khung nội dung bài (div có class detail-content)
+_CONTENT_OPEN = re.compile(
+    rb'<div\b[^>]*?\bclass\s*=\s*["\'][^"\'>]*(?<![\w-])detail-content(?![\w-])', re.IGNORECASE
+)
+# Các token cần theo dõi sau thẻ mở; div trong comment và script không được tính
+_CONTENT_TOKENS = re.compile(rb'<!--|-->|<script\b|</script\s*>|<div\b|</div\s*>', re.IGNORECASE)
+
+
+def parse_article(soup):
+    """
+    Extract article text from a parsed page.
+    
+    Args:
+        soup: BeautifulSoup object of an article page
+        
+    Returns:
+        String containing article content or None if nothing was found
+    """
+    content_parts = []
+    
+    # Tiêu đề
+    title_tag = soup.find('h1', class_='detail-title')
+    if title_tag:
+        title_span = title_tag.find('span', {'data-role': 'title'})
+        if title_span:
+            content_parts.append(title_span.get_text(strip=True))
+            
+    # Mô tả/Sapo
+    description_tag = soup.find('h2', class_='detail-sapo')
+    if not description_tag:
+        description_tag = soup.find('div', class_='detail-sapo')
+    if description_tag:
+        content_parts.append(description_tag.get_text(strip=True))
+        
+    # Nội dung chính
+    content_div = soup.find('div', class_='detail-content')
+    if not content_div:
+        content_div = soup.find('div', id='main-detail-content')
+        
+    if content_div:
+        paragraphs = content_div.find_all('p')
+        for p in paragraphs:
+            text = p.get_text(strip=True)
+            if text and len(text) > 20:  # Bỏ qua đoạn quá ngắn
+                content_parts.append(text)
+                
+    if content_parts:
+        full_content = '\n\n'.join(content_parts)
+        return clean_text(full_content)
+    return None
+
+
+class SoupExtractor:
+    """Reference backend: full BeautifulSoup tree built with lxml."""
+    
+    name = 'soup'
+    
+    def extract(self, html):
+        """
+        Extract article content from raw HTML.
+        
+        Args:
+            html: Page body (bytes)
+            
+        Returns:
+            String containing article content or None if nothing was found
+        """
+        return parse_article(BeautifulSoup(html, 'lxml'))
+
+
+def _is_article_tag(name, attrs=None):
+    """Tag filter keeping only the containers parse_article reads."""
+    attrs = attrs or {}
+    classes = attrs.get('class') or ''
+    if isinstance(classes, str):
+        classes = classes.split()
+        
+    if name == 'h1':
+        return 'detail-title' in classes
+    if name == 'h2':
+        return 'detail-sapo' in classes
+    if name == 'div':
+        return ('detail-sapo' in classes or 'detail-content' in classes
+                or attrs.get('id') == 'main-detail-content')
+    return False
+
+
+class ArticleStrainer(SoupStrainer):
+    """SoupStrainer building only the title, sapo and content subtrees."""
+    
+    def __init__(self):
+        # bs4 < 4.13 gọi hàm lọc với (name, attrs)
+        super().__init__(_is_article_tag)
+    
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        # bs4 >= 4.13 hỏi strainer qua các hàm allow_*
+        return _is_article_tag(name, attrs)
+    
+    def allow_string_creation(self, string):
+        return False
+
+
+class StrainerExtractor:
+    """BeautifulSoup backend that only builds the title, sapo and content subtrees."""
+    
+    name = 'strainer'
+    
+    def __init__(self):
+        self.strainer = ArticleStrainer()
+    
+    def extract(self, html):
+        """
+        Extract article content from raw HTML.
+        
+        Args:
+            html: Page body (bytes)
+            
+        Returns:
+            String containing article content or None if nothing was found
+        """
+        return parse_article(BeautifulSoup(html, 'lxml', parse_only=self.strainer))
+
+
+def _class_xpath(tag, class_name):
+    """XPath matching the first tag whose class list contains class_name."""
+    return f"(//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')])[1]"
+
+
+# Nội dung của các thẻ này không được BeautifulSoup.get_text tính là text
+_NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+
+def _get_text_strip(element):
+    """
+    Equivalent of BeautifulSoup's get_text(strip=True) for an lxml element.
+    
+    Args:
+        element: lxml element
+        
+    Returns:
+        Concatenation of the stripped, non-empty text nodes
+    """
+    parts = []
+    
+    def walk(node):
+        # Comment/processing instruction có tag không phải str
+        if isinstance(node.tag, str) and node.tag not in _NON_TEXT_TAGS:
+            if node.text:
+                parts.append(node.text)
+            for child in node:
+                walk(child)
+                if child.tail:
+                    parts.append(child.tail)
+                    
+    walk(element)
+    return ''.join(text for text in (part.strip() for part in parts) if text)
+
+
+class LxmlExtractor:
+    """lxml backend using compiled XPath selectors, without building a BeautifulSoup tree."""
+    
+    name = 'lxml'
+    
+    def __init__(self):
+        # XPath đã compile không dùng chung giữa các thread
+        self.local = threading.local()
+    
+    def xpaths(self):
+        """
+        Get the compiled selectors of the current thread.
+        
+        Returns:
+            Dictionary of compiled etree.XPath objects
+        """
+        compiled = getattr(self.local, 'xpaths', None)
+        if compiled is None:
+            compiled = {
+                'title': [etree.XPath(_class_xpath('h1', 'detail-title'))],
+                'title_span': [etree.XPath("(.//span[@data-role='title'])[1]")],
+                'sapo': [
+                    etree.XPath(_class_xpath('h2', 'detail-sapo')),
+                    etree.XPath(_class_xpath('div', 'detail-sapo')),
+                ],
+                'content': [
+                    etree.XPath(_class_xpath('div', 'detail-content')),
+                    etree.XPath("(//div[@id='main-detail-content'])[1]"),
+                ],
+                # <p> trong <template> không phải nội dung hiển thị (backend soup không lấy)
+                'paragraphs': etree.XPath('.//p[not(ancestor::template)]'),
+            }
+            self.local.xpaths = compiled
+        return compiled
+    
+    def parse(self, html):
+        """
+        Parse raw HTML with the same encoding choice as BeautifulSoup.
+        
+        Args:
+            html: Page body (bytes)
+            
+        Returns:
+            Root lxml element or None
+        """
+        detector = EncodingDetector(html, is_html=True)
+        encoding = next(iter(detector.encodings), None)
+        parser = etree.HTMLParser(encoding=encoding, recover=True, strip_cdata=False)
+        return etree.fromstring(detector.markup, parser)
+    
+    def first(self, xpaths, node):
+        """Return the first match of the first XPath that matches."""
+        for xpath in xpaths:
+            matches = xpath(node)
+            if matches:
+                return matches[0]
+        return None
+    
+    def extract(self, html):
+        """
+        Extract article content from raw HTML.
+        
+        Args:
+            html: Page body (bytes)
+            
+        Returns:
+            String containing article content or None if nothing was found
+        """
+        root = self.parse(html)
+        if root is None:
+            return None
+            
+        xpaths = self.xpaths()
+        content_parts = []
+        
+        # Tiêu đề
+        title_tag = self.first(xpaths['title'], root)
+        if title_tag is not None:
+            title_span = self.first(xpaths['title_span'], title_tag)
+            if title_span is not None:
+                content_parts.append(_get_text_strip(title_span))
+                
+        # Mô tả/Sapo
+        description_tag = self.first(xpaths['sapo'], root)
+        if description_tag is not None:
+            content_parts.append(_get_text_strip(description_tag))
+            
+        # Nội dung chính
+        content_div = self.first(xpaths['content'], root)
+        if content_div is not None:
+            for p in xpaths['paragraphs'](content_div):
+                text = _get_text_strip(p)
+                if text and len(text) > 20:  # Bỏ qua đoạn quá ngắn
+                    content_parts.append(text)
+                    
+        if content_parts:
+            return clean_text('\n\n'.join(content_parts))
+        return None
+
+
+class ArticleEndScanner:
+    """
+    Detects the end of the article body container in a page read chunk by chunk.
+    
+    The title and sapo come before div.detail-content on article pages, so
+    once the container's closing tag has arrived the rest of the page
+    (comments, related articles, footer) is not needed for extraction.
+    Nested divs are counted; markup inside comments and scripts is ignored.
+    Pages using only the #main-detail-content fallback are never cut short.
+    """
+    
+    # Phần cuối dữ liệu được giữ lại để không bỏ sót thẻ bị cắt giữa hai chunk
+    OPEN_OVERLAP = 512
+    TOKEN_OVERLAP = 16
+    
+    def __init__(self):
+        self.tail = b''
+        self.depth = 0      # Số div đang mở trong khung nội dung (0 = chưa gặp khung)
+        self.skipping = None  # Token đóng đang chờ khi ở trong comment/script
+        self.done = False
+    
+    def feed(self, chunk):
+        """
+        Scan the next chunk of the body.
+        
+        Args:
+            chunk: Bytes following the previously fed chunks
+            
+        Returns:
+            True once the closing tag of the content container has been seen
+        """
+        if self.done:
+            return True
+            
+        data = self.tail + chunk
+        start = 0
+        if not self.depth:
+            match = _CONTENT_OPEN.search(data)
+            if match is None:
+                self.tail = data[-self.OPEN_OVERLAP:]
+                return False
+            self.depth = 1
+            start = match.end()
+            
+        keep_from = max(start, len(data) - self.TOKEN_OVERLAP)
+        for token in _CONTENT_TOKENS.finditer(data, start):
+            keep_from = max(keep_from, token.end())
+            text = token.group().lower()
+            if self.skipping:
+                if text.startswith(self.skipping):
+                    self.skipping = None
+            elif text == b'<!--':
+                self.skipping = b'-->'
+            elif text.startswith(b'<script'):
+                self.skipping = b'</script'
+            elif text.startswith(b'</div'):
+                self.depth -= 1
+                if not self.depth:
+                    self.done = True
+                    return True
+            elif text.startswith(b'<div'):
+                self.depth += 1
+                
+        self.tail = data[keep_from:]
+        return False
+
+
+EXTRACTORS = {
+    SoupExtractor.name: SoupExtractor,
+    StrainerExtractor.name: StrainerExtractor,
+    LxmlExtractor.name: LxmlExtractor,
+}
+
+
+def get_extractor(name):
+    """
+    Create an extraction backend by name.
+    
+    Args:
+        name: Backend name ('soup', 'strainer' or 'lxml')
+        
+    Returns:
+        Extractor object with an extract(html) method
+    """
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor backend: {name}")
+    return EXTRACTORS[name]()
@@ -1,6 +1,8 @@
 import os
+import re
 import json
 import csv
+import itertools
 import config
 
 
@@ -11,39 +13,98 @@ def create_output_dir():
         print(f"Created directory: {config.OUTPUT_DIR}")
 
 
-def save_to_csv(articles, filepath):
+def article_path(category, split, article_id, output_dir=None):
+    """
+    Get the .txt path of an article (OUTPUT_FORMAT = "txt").
+    
+    Args:
+        category: Category name (thoisu, kinhte, congnghe)
+        split: train or test
+        article_id: ID of the article in database
+        output_dir: Root output directory (default: config.OUTPUT_DIR)
+        
+    Returns:
+        Path of the article file
+    """
+    filename = f"{category}_{article_id:06d}.txt"
+    return os.path.join(output_dir or config.OUTPUT_DIR, split, category, filename)
+
+
+def legacy_slots(output_dir=None):
+    """
+    List the .txt files written under the old index-based names.
+    
+    Before files were named after the article id, each split of a category
+    was numbered from 1 ({category}_{n:04d}.txt), and the train split of a
+    category was crawled before its test split.
+    
+    Args:
+        output_dir: Root output directory (default: config.OUTPUT_DIR)
+        
+    Returns:
+        Dictionary category -> list of (split, file_index), train before test, in file order
+    """
+    output_dir = output_dir or config.OUTPUT_DIR
+    slots = {}
+    for split in ('train', 'test'):
+        split_dir = os.path.join(output_dir, split)
+        if not os.path.isdir(split_dir):
+            continue
+        for category in sorted(os.listdir(split_dir)):
+            category_dir = os.path.join(split_dir, category)
+            if not os.path.isdir(category_dir):
+                continue
+            # Tên kiểu cũ có ít chữ số hơn tên theo id ({category}_{article_id:06d}.txt)
+            pattern = re.compile(rf'{re.escape(category)}_(\d{{1,5}})\.txt')
+            indices = sorted(int(match.group(1)) for match in map(pattern.fullmatch, os.listdir(category_dir)) if match)
+            slots.setdefault(category, []).extend((split, index) for index in indices)
+    return slots
+
+
+def save_to_csv(articles, filepath, fieldnames=None, message="Saved {count} articles to {filepath}"):
     """
     Save data to CSV file.
     
+    Rows are written as they are read, so any iterable (e.g. a generator
+    over the database) can be saved without loading it into memory.
+    
     Args:
-        articles: List of dictionaries containing article information
+        articles: Iterable of dictionaries containing article information
         filepath: Path to CSV file
+        fieldnames: Column names (default: keys of the first row)
+        message: Message printed when done, formatted with count and filepath
     """
-    if not articles:
+    rows = iter(articles)
+    first = next(rows, None)
+    if first is None:
         return
-    
-    keys = articles[0].keys()
-    
+        
+    count = 0
     with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=keys)
+        writer = csv.DictWriter(f, fieldnames=fieldnames or list(first.keys()))
         writer.writeheader()
-        writer.writerows(articles)
-    
-    print(f"Saved {len(articles)} articles to {filepath}")
+        for row in itertools.chain([first], rows):
+            writer.writerow(row)
+            count += 1
+            
+    print(message.format(count=count, filepath=filepath))
 
 
-def save_to_json(articles, filepath):
+def save_to_json(articles, filepath, indent=None, message="Saved {count} articles to {filepath}"):
     """
     Save data to JSON file.
     
     Args:
         articles: List of dictionaries containing article information
         filepath: Path to JSON file
+        indent: Indentation for pretty-printing (default: compact output)
+        message: Message printed when done, formatted with count and filepath
     """
     with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(articles, f, ensure_ascii=False, indent=2)
-    
-    print(f"Saved {len(articles)} articles to {filepath}")
+        json.dump(articles, f, ensure_ascii=False, indent=indent,
+                  separators=None if indent is not None else (',', ':'))
+                  
+    print(message.format(count=len(articles), filepath=filepath))
 
 
 def clean_text(text):
@@ -58,7 +119,7 @@ def clean_text(text):
     """
     if not text:
         return ""
-    
+        
     # Loại bỏ khoảng trắng thừa
     text = ' '.join(text.split())
     text = text.strip()
@@ -0,0 +1,92 @@
+import os
+import json
+import logging
+import threading
+
+
+class ValidatorCache:
+    """On-disk cache of HTTP validators (ETag, Last-Modified) per URL."""
+    
+    def __init__(self, cache_file):
+        """
+        Initialize validator cache.
+        
+        Args:
+            cache_file: Path to JSON cache file
+        """
+        self.cache_file = cache_file
+        self.logger = logging.getLogger('ThanhNienCrawler')
+        self.lock = threading.Lock()
+        self.entries = self.load()
+        self.stats = {'hit': 0, 'miss': 0, 'not_modified': 0}
+    
+    def load(self):
+        """
+        Load cache entries from disk.
+        
+        Returns:
+            Dictionary {url: {'etag': ..., 'last_modified': ...}}
+        """
+        if not os.path.exists(self.cache_file):
+            return {}
+        
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable HTTP cache {self.cache_file}: {e}")
+            return {}
+    
+    def save(self):
+        """Write cache entries to disk atomically."""
+        with self.lock:
+            tmp_file = self.cache_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+    
+    def request_headers(self, url):
+        """
+        Build conditional request headers for a URL.
+        
+        Args:
+            url: Requested URL
+            
+        Returns:
+            Dictionary with If-None-Match / If-Modified-Since (empty on cache miss)
+        """
+        with self.lock:
+            entry = self.entries.get(url)
+            if not entry:
+                self.stats['miss'] += 1
+                return {}
+            
+            self.stats['hit'] += 1
+            headers = {}
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+            return headers
+    
+    def record_not_modified(self):
+        """Count a 304 Not Modified response."""
+        with self.lock:
+            self.stats['not_modified'] += 1
+    
+    def update(self, url, response):
+        """
+        Store the validators of a successful response.
+        
+        Args:
+            url: Requested URL
+            response: requests.Response object
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        
+        with self.lock:
+            if etag or last_modified:
+                self.entries[url] = {'etag': etag, 'last_modified': last_modified}
+            else:
+                self.entries.pop(url, None)
@@ -0,0 +1,78 @@
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+
+
+class CrawlManifest:
+    """Append-only JSON Lines log of the articles written to the dataset."""
+    
+    def __init__(self, manifest_file):
+        """
+        Initialize crawl manifest.
+        
+        Args:
+            manifest_file: Path to JSON Lines manifest file
+        """
+        self.manifest_file = manifest_file
+        self.logger = logging.getLogger('ThanhNienCrawler')
+        self.lock = threading.Lock()
+        self.file = None
+    
+    def load(self):
+        """
+        Load completed entries from disk.
+        
+        A truncated last line (left by an interrupted run) is skipped.
+        
+        Returns:
+            Dictionary {article_id: entry}
+        """
+        entries = {}
+        if not os.path.exists(self.manifest_file):
+            return entries
+            
+        with open(self.manifest_file, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                    entries[entry['article_id']] = entry
+                except (ValueError, KeyError, TypeError):
+                    self.logger.warning(f"Skipping malformed manifest line {line_number} in {self.manifest_file}")
+        return entries
+    
+    def record(self, article_id, url, category, split, path):
+        """
+        Append a completed article to the manifest.
+        
+        Args:
+            article_id: ID of the article in database
+            url: Article URL
+            category: Category name
+            split: train or test
+            path: Path of the saved file
+        """
+        entry = {
+            'article_id': article_id,
+            'url': url,
+            'category': category,
+            'split': split,
+            'path': path,
+            'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.manifest_file, 'a', encoding='utf-8')
+            # Mỗi dòng được flush ngay để checkpoint không mất khi process bị kill
+            self.file.write(line)
+            self.file.flush()
+    
+    def close(self):
+        """Close the manifest file."""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
@@ -0,0 +1,438 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+import functools
+from datetime import datetime
+
+import config
+
+
+# Cận trên (giây) của các bucket histogram thời gian
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Mô tả các metric cho output Prometheus
+HELP = {
+    'crawler_fetch_seconds': 'Latency of article page requests',
+    'crawler_fetch_bytes_total': 'Bytes downloaded for article pages',
+    'crawler_fetch_requests_total': 'Article page requests by status',
+    'crawler_fetch_retries_total': 'Article page request retries',
+    'crawler_fetch_aborted_total': 'Article page downloads stopped before the end of the body, by reason',
+    'crawler_fetch_bytes_saved_total': 'Bytes of article pages not downloaded thanks to streaming checks, by reason',
+    'crawler_parse_seconds': 'Time spent extracting article content',
+    'crawler_fingerprint_seconds': 'Time spent computing MinHash signatures',
+    'crawler_dedup_seconds': 'Time spent in near-duplicate index lookups',
+    'crawler_write_seconds': 'Time spent writing article files',
+    'crawler_db_seconds': 'Time spent in database operations',
+    'crawler_articles_total': 'Articles processed by category, split and result',
+    'crawler_concurrency_limit': 'Current adaptive concurrency limit per host',
+    'crawler_rss_fetch_seconds': 'Time spent downloading and parsing RSS feeds',
+    'crawler_rss_items_total': 'RSS items parsed by category',
+    'crawler_rss_new_total': 'New URLs inserted from RSS by category',
+}
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=None):
+    items = list(key) + list(extra or [])
+    if not items:
+        return ''
+    parts = []
+    for name, value in items:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{name}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values."""
+    
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize histogram.
+        
+        Args:
+            buckets: Sorted upper bounds of the buckets
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value):
+        """Record one value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+    
+    def quantile(self, q):
+        """
+        Estimate a quantile from the buckets (upper bound of the matching bucket).
+        
+        Args:
+            q: Quantile in [0, 1]
+            
+        Returns:
+            Estimated value or None if empty
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+    
+    def snapshot(self):
+        """
+        Summarize the histogram for JSON export.
+        
+        Returns:
+            Dictionary with count, sum, mean, p50, p90, p99 and bucket counts
+        """
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets + ('+Inf',), self.counts)},
+        }
+
+
+class Timer:
+    """Context manager observing elapsed time into a histogram."""
+    
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and histograms."""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}    # {name: {label_key: value}}
+        self.gauges = {}      # {name: {label_key: value}}
+        self.histograms = {}  # {name: {label_key: Histogram}}
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.start_time = time.monotonic()
+    
+    def inc(self, name, value=1, **labels):
+        """
+        Increase a counter.
+        
+        Args:
+            name: Metric name
+            value: Amount to add
+            **labels: Metric labels
+        """
+        key = _label_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+    
+    def total(self, name, **labels):
+        """
+        Sum a counter over every series carrying the given labels.
+        
+        Args:
+            name: Metric name
+            **labels: Labels a series must have to be counted
+            
+        Returns:
+            Sum of the matching series (0 if none)
+        """
+        wanted = set(_label_key(labels))
+        with self.lock:
+            return sum(value for key, value in self.counters.get(name, {}).items() if wanted <= set(key))
+    
+    def set(self, name, value, **labels):
+        """
+        Set a gauge.
+        
+        Args:
+            name: Metric name
+            value: New value
+            **labels: Metric labels
+        """
+        with self.lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+    
+    def observe(self, name, value, **labels):
+        """
+        Record a value in a histogram.
+        
+        Args:
+            name: Metric name
+            value: Observed value (seconds for *_seconds metrics)
+            **labels: Metric labels
+        """
+        key = _label_key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+    
+    def timer(self, name, **labels):
+        """
+        Time a block into a histogram.
+        
+        Args:
+            name: Histogram name
+            **labels: Metric labels
+            
+        Returns:
+            Timer context manager
+        """
+        return Timer(self, name, labels)
+    
+    def timed(self, name, **labels):
+        """
+        Decorator timing every call of a function into a histogram.
+        
+        Args:
+            name: Histogram name
+            **labels: Metric labels
+            
+        Returns:
+            Function decorator
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with Timer(self, name, labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    def reset(self):
+        """Clear every metric (used by benchmarks between runs)."""
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.start_time = time.monotonic()
+    
+    def snapshot(self):
+        """
+        Build a JSON-serializable view of all metrics.
+        
+        Returns:
+            Dictionary with run information, counters, gauges and histograms
+        """
+        def series(values, convert):
+            return [dict(key, value=convert(value)) for key, value in values.items()]
+            
+        with self.lock:
+            return {
+                'started_at': self.started_at,
+                'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'elapsed_seconds': round(time.monotonic() - self.start_time, 3),
+                'counters': {name: series(values, lambda v: v) for name, values in self.counters.items()},
+                'gauges': {name: series(values, lambda v: v) for name, values in self.gauges.items()},
+                'histograms': {name: series(values, Histogram.snapshot) for name, values in self.histograms.items()},
+            }
+    
+    def to_prometheus(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+        
+        Returns:
+            String in text format version 0.0.4
+        """
+        lines = []
+        
+        def header(name, kind):
+            if name in HELP:
+                lines.append(f'# HELP {name} {HELP[name]}')
+            lines.append(f'# TYPE {name} {kind}')
+            
+        with self.lock:
+            for name, values in sorted(self.counters.items()):
+                header(name, 'counter')
+                for key, value in values.items():
+                    lines.append(f'{name}{_format_labels(key)} {value}')
+                    
+            for name, values in sorted(self.gauges.items()):
+                header(name, 'gauge')
+                for key, value in values.items():
+                    lines.append(f'{name}{_format_labels(key)} {value}')
+                    
+            for name, values in sorted(self.histograms.items()):
+                header(name, 'histogram')
+                for key, histogram in values.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_format_labels(key, [("le", bound)])} {cumulative}')
+                    lines.append(f'{name}_sum{_format_labels(key)} {histogram.sum}')
+                    lines.append(f'{name}_count{_format_labels(key)} {histogram.count}')
+                    
+        return '\n'.join(lines) + '\n'
+    
+    def write_json(self, path):
+        """
+        Write the snapshot to a JSON file atomically.
+        
+        Args:
+            path: Output file path
+        """
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+# Registry dùng chung cho toàn bộ crawler (giống logging.getLogger)
+metrics = Metrics()
+
+
+def make_handler(registry):
+    """
+    Build the request handler serving /metrics (Prometheus text format) and /stats.json.
+    
+    http.server is only imported here, when the endpoint is enabled, to keep
+    startup of the command line scripts fast.
+    
+    Args:
+        registry: Metrics registry to serve
+        
+    Returns:
+        BaseHTTPRequestHandler subclass
+    """
+    from http.server import BaseHTTPRequestHandler
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Serves /metrics (Prometheus text format) and /stats.json."""
+        
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/metrics':
+                body = self.registry.to_prometheus()
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            elif path == '/stats.json':
+                body = json.dumps(self.registry.snapshot(), ensure_ascii=False)
+                content_type = 'application/json; charset=utf-8'
+            else:
+                self.send_error(404)
+                return
+                
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        
+        def log_message(self, format, *args):
+            # Không in access log ra console
+            pass
+    
+    MetricsHandler.registry = registry
+    return MetricsHandler
+
+
+class MetricsReporter:
+    """Periodically rewrites the JSON stats file and optionally serves a local metrics endpoint."""
+    
+    def __init__(self, stats_file=None, interval=10.0, port=0, host='127.0.0.1', registry=None):
+        """
+        Initialize metrics reporter.
+        
+        Args:
+            stats_file: JSON file rewritten every interval (None = disabled)
+            interval: Seconds between rewrites
+            port: Port of the HTTP endpoint (0 = disabled)
+            host: Address the HTTP endpoint binds to
+            registry: Metrics registry (default: shared registry)
+        """
+        self.stats_file = stats_file
+        self.interval = interval
+        self.port = port
+        self.host = host
+        self.registry = registry or metrics
+        self.logger = logging.getLogger('ThanhNienCrawler')
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.server = None
+    
+    def start(self):
+        """
+        Start the writer thread and the HTTP endpoint.
+        
+        Returns:
+            self
+        """
+        if self.port:
+            from http.server import ThreadingHTTPServer
+            self.server = ThreadingHTTPServer((self.host, self.port), make_handler(self.registry))
+            self.server.daemon_threads = True
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+            self.logger.info(f"Serving metrics at http://{self.host}:{self.server.server_address[1]}/metrics")
+            
+        if self.stats_file:
+            self.thread = threading.Thread(target=self._write_loop, daemon=True)
+            self.thread.start()
+        return self
+    
+    def _write_loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.write()
+    
+    def write(self):
+        """Rewrite the JSON stats file now."""
+        if not self.stats_file:
+            return
+        try:
+            self.registry.write_json(self.stats_file)
+        except OSError as e:
+            self.logger.warning(f"Could not write stats file {self.stats_file}: {e}")
+    
+    def stop(self):
+        """Stop reporting and write the final stats file."""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        self.write()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def start_reporter(port=None):
+    """
+    Start a reporter using the paths and intervals from config.
+    
+    Args:
+        port: Metrics endpoint port (default: config.METRICS_PORT, 0 = disabled)
+        
+    Returns:
+        Started MetricsReporter (call stop() at the end of the run)
+    """
+    os.makedirs(config.OUTPUT_DIR, exist_ok=True)
+    return MetricsReporter(
+        stats_file=os.path.join(config.OUTPUT_DIR, config.STATS_FILE),
+        interval=config.STATS_INTERVAL,
+        port=config.METRICS_PORT if port is None else port,
+    ).start()
@@ -0,0 +1,189 @@
+import os
+import gzip
+import uuid
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+
+def build_warc_record(url, status_code, reason, headers, body, truncated=False):
+    """
+    Build one gzip-compressed WARC/1.0 response record.
+    
+    Args:
+        url: Target URL
+        status_code: HTTP status code
+        reason: HTTP reason phrase
+        headers: Mapping of HTTP response headers
+        body: Raw response body (bytes)
+        truncated: True if the body was not read to the end (adds WARC-Truncated)
+        
+    Returns:
+        Compressed record bytes (a complete gzip member)
+    """
+    http_head = f"HTTP/1.1 {status_code} {reason}\r\n"
+    for name, value in headers.items():
+        # Body đã được giải nén bởi requests nên bỏ các header mô tả encoding gốc
+        if name.lower() in ('content-encoding', 'transfer-encoding', 'content-length'):
+            continue
+        http_head += f"{name}: {value}\r\n"
+    http_head += f"Content-Length: {len(body)}\r\n\r\n"
+    block = http_head.encode('utf-8') + body
+    # Body chỉ được đọc tới hết phần nội dung bài (dừng sớm khi stream)
+    truncation = "WARC-Truncated: length\r\n" if truncated else ""
+    
+    warc_head = (
+        "WARC/1.0\r\n"
+        "WARC-Type: response\r\n"
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+        f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        f"{truncation}"
+        "Content-Type: application/http;msgtype=response\r\n"
+        f"Content-Length: {len(block)}\r\n"
+        "\r\n"
+    ).encode('utf-8')
+    
+    return gzip.compress(warc_head + block + b"\r\n\r\n", compresslevel=6)
+
+
+def parse_warc_record(data):
+    """
+    Parse a compressed WARC response record.
+    
+    Args:
+        data: Compressed record bytes
+        
+    Returns:
+        Tuple (status_code, headers dict, body bytes)
+    """
+    raw = gzip.decompress(data)
+    _, _, rest = raw.partition(b"\r\n\r\n")  # Bỏ qua WARC header
+    http_head, _, body = rest.partition(b"\r\n\r\n")
+    lines = http_head.decode('utf-8', errors='replace').split("\r\n")
+    
+    status_code = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip()] = value.strip()
+    
+    length = int(headers.get('Content-Length', len(body)))
+    return status_code, headers, body[:length]
+
+
+def read_record(path, offset, length):
+    """
+    Read one record from an archive segment.
+    
+    Args:
+        path: Segment file path
+        offset: Byte offset of the record
+        length: Compressed length of the record
+        
+    Returns:
+        Tuple (status_code, headers dict, body bytes)
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return parse_warc_record(f.read(length))
+
+
+class PageArchive:
+    """Append-only, gzip-compressed WARC archive of fetched pages, indexed by URL."""
+    
+    def __init__(self, archive_dir, writer_id=None):
+        """
+        Initialize page archive.
+        
+        Args:
+            archive_dir: Directory holding segment files and the URL index
+            writer_id: Identifier used to name this process's segment file
+        """
+        self.archive_dir = archive_dir
+        os.makedirs(archive_dir, exist_ok=True)
+        
+        # Mỗi process ghi vào segment riêng để không xen kẽ dữ liệu
+        self.segment_name = f"pages-{writer_id or uuid.uuid4().hex}.warc.gz"
+        self.segment_path = os.path.join(archive_dir, self.segment_name)
+        self.lock = threading.Lock()
+        
+        self.index = sqlite3.connect(os.path.join(archive_dir, 'index.db'), check_same_thread=False, timeout=30)
+        self.index.execute('PRAGMA journal_mode=WAL')
+        self.index.execute('PRAGMA synchronous=NORMAL')
+        with self.index:
+            self.index.execute('''
+                CREATE TABLE IF NOT EXISTS records (
+                    url TEXT PRIMARY KEY,
+                    segment TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    status INTEGER,
+                    archived_at TEXT
+                )
+            ''')
+    
+    def add(self, url, response, body=None, truncated=False):
+        """
+        Append a fetched response to the archive.
+        
+        Args:
+            url: Requested URL
+            response: requests.Response object
+            body: Body read from a streamed response (default: response.content)
+            truncated: True if reading stopped before the end of the body
+        """
+        if body is None:
+            body = response.content
+        record = build_warc_record(url, response.status_code, response.reason or '',
+                                   response.headers, body, truncated)
+        
+        with self.lock:
+            with open(self.segment_path, 'ab') as f:
+                offset = f.tell()
+                f.write(record)
+            # Index chỉ ghi sau khi record đã nằm trên đĩa; bản mới nhất của URL được giữ lại
+            with self.index:
+                self.index.execute(
+                    'INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)',
+                    (url, self.segment_name, offset, len(record), response.status_code,
+                     datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                )
+    
+    def locate(self, url):
+        """
+        Find where a URL is stored.
+        
+        Args:
+            url: Archived URL
+            
+        Returns:
+            Tuple (segment path, offset, length) or None if not archived
+        """
+        with self.lock:
+            row = self.index.execute(
+                'SELECT segment, offset, length FROM records WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return os.path.join(self.archive_dir, row[0]), row[1], row[2]
+    
+    def get(self, url):
+        """
+        Read the archived response of a URL.
+        
+        Args:
+            url: Archived URL
+            
+        Returns:
+            Tuple (status_code, headers dict, body bytes) or None if not archived
+        """
+        location = self.locate(url)
+        if location is None:
+            return None
+        return read_record(*location)
+    
+    def close(self):
+        """Close the URL index."""
+        with self.lock:
+            self.index.close()
@@ -0,0 +1,250 @@
+import time
+import queue
+import logging
+import threading
+from collections import Counter
+from tqdm import tqdm
+
+import config
+
+
+# Đánh dấu kết thúc một hàng đợi
+_DONE = object()
+
+
+class CrawlPipeline:
+    """
+    Runs URL collection, fetching, extraction and writing as overlapped stages.
+    
+    Stages are connected by bounded queues, so a slow stage blocks the ones
+    before it instead of letting work pile up in memory:
+    
+        RSS feeds -> claim -> fetch (MAX_WORKERS threads) -> extract
+        (PIPELINE_PARSE_WORKERS threads) -> write (calling thread)
+        
+    URLs saved by the collector are claimed and queued right away; once
+    collection ends, the remaining frontier in the database is drained.
+    Each article goes to the train split of its category until the train
+    quota is full, then to test.
+    """
+    
+    def __init__(self, collector, crawler, queue_size=None, parse_workers=None):
+        """
+        Initialize pipeline.
+        
+        Args:
+            collector: URLCollector
+            crawler: ArticleCrawler
+            queue_size: Capacity of each queue between stages (default: config.PIPELINE_QUEUE_SIZE)
+            parse_workers: Number of extraction threads (default: config.PIPELINE_PARSE_WORKERS)
+        """
+        self.collector = collector
+        self.crawler = crawler
+        self.db = crawler.db
+        self.queue_size = queue_size or config.PIPELINE_QUEUE_SIZE
+        self.parse_workers = max(1, parse_workers or config.PIPELINE_PARSE_WORKERS)
+        self.logger = logging.getLogger('ThanhNienCrawler')
+        
+        categories = list(dict.fromkeys(list(config.TRAIN_SAMPLES) + list(config.TEST_SAMPLES)))
+        # Thứ tự split: train trước, test sau
+        self.slots = {
+            category: [('train', config.TRAIN_SAMPLES.get(category, 0)), ('test', config.TEST_SAMPLES.get(category, 0))]
+            for category in categories
+        }
+        
+        self.url_queue = queue.Queue(self.queue_size)
+        self.page_queue = queue.Queue(self.queue_size)
+        self.result_queue = queue.Queue(self.queue_size)
+        
+        self.lock = threading.Condition()
+        self.inflight = Counter()  # {category: số bài đã claim nhưng chưa ghi xong}
+        self.full = set()          # Các category đã đủ quota train và test
+        self.stopping = False
+        self.fetchers_done = 0
+        self.new_urls = 0
+    
+    def needed(self, category):
+        """Number of articles still missing from the quotas of a category."""
+        return sum(max(0, quota - self.db.count_used(category, split)) for split, quota in self.slots[category])
+    
+    def enqueue(self, rows):
+        """Put claimed rows on the fetch queue, blocking while it is full."""
+        for article_id, url, category in rows:
+            with self.lock:
+                if category in self.full or self.stopping:
+                    self.db.release_claim(article_id)
+                    continue
+                self.inflight[category] += 1
+            self.url_queue.put((article_id, url, category))
+    
+    def on_collected(self, articles):
+        """Collector sink: claim newly saved URLs and start fetching them."""
+        by_category = {}
+        for article in articles:
+            by_category.setdefault(article['category'], []).append(article['url'])
+            
+        for category, urls in by_category.items():
+            if category not in self.slots:
+                continue
+            with self.lock:
+                # Chỉ claim số bài còn thiếu; phần còn lại nằm trong frontier cho bước drain
+                room = 0 if category in self.full else self.needed(category) - self.inflight[category]
+            if room > 0:
+                self.enqueue(self.db.claim_listed(self.crawler.worker_id, urls[:room]))
+    
+    def feed(self):
+        """Stage 1: collect URLs from RSS, then drain the remaining frontier."""
+        try:
+            self.new_urls = self.collector.collect_all(sink=self.on_collected)
+            
+            active = [category for category in self.slots if category not in self.full]
+            while active and not self.stopping:
+                for category in list(active):
+                    with self.lock:
+                        need = 0 if category in self.full else self.needed(category) - self.inflight[category]
+                    rows = self.db.claim_urls(self.crawler.worker_id, category, min(need, self.crawler.max_workers)) if need > 0 else []
+                    self.enqueue(rows)
+                    
+                    with self.lock:
+                        if category in self.full or (not rows and need > 0 and not self.inflight[category]):
+                            # Đủ quota, hoặc frontier đã hết và không còn bài nào đang xử lý
+                            active.remove(category)
+                        elif not rows:
+                            # Chờ các bài đang xử lý xong rồi tính lại số bài còn thiếu
+                            self.lock.wait(timeout=1)
+        finally:
+            for _ in range(self.crawler.max_workers):
+                self.url_queue.put(_DONE)
+    
+    def fetch(self):
+        """Stage 2: download pages."""
+        try:
+            while True:
+                item = self.url_queue.get()
+                if item is _DONE:
+                    return
+                    
+                article_id, url, category = item
+                html, skip = None, True
+                try:
+                    with self.lock:
+                        skip = category in self.full or self.stopping
+                    # Category đã đủ quota: không tải nữa, trả URL lại cho frontier
+                    html = None if skip else self.crawler.fetch_page(url)
+                except Exception as e:
+                    # Lỗi bất kỳ (archive, mạng...) chỉ làm hỏng bài này: chuyển tiếp như một lần tải thất bại
+                    self.logger.error(f"Error fetching {url}: {e}")
+                    html, skip = None, False
+                self.page_queue.put((article_id, url, category, html, skip))
+        finally:
+            # Luồng fetch cuối cùng kết thúc báo cho tất cả luồng parse, kể cả khi luồng dừng vì lỗi
+            with self.lock:
+                self.fetchers_done += 1
+                last = self.fetchers_done == self.crawler.max_workers
+            for _ in range(self.parse_workers if last else 0):
+                self.page_queue.put(_DONE)
+    
+    def parse(self):
+        """Stage 3: extract content and compute fingerprints."""
+        try:
+            while True:
+                item = self.page_queue.get()
+                if item is _DONE:
+                    return
+                    
+                article_id, url, category, html, skip = item
+                content, signature = None, None
+                try:
+                    content = None if skip or not html else self.crawler.extract_html(html, url)
+                    signature = self.crawler.fingerprint(content)
+                except Exception as e:
+                    self.logger.error(f"Error extracting {url}: {e}")
+                    content, signature = None, None
+                self.result_queue.put((article_id, url, category, content, signature, skip))
+        finally:
+            self.result_queue.put(_DONE)
+    
+    def run(self):
+        """
+        Run all stages until every quota is full or no URLs are left.
+        
+        Returns:
+            Dictionary with per-split article counts saved by this run and the number of new URLs
+        """
+        if not self.crawler.resumed:
+            self.crawler.resume()
+            
+        totals = {category: sum(quota for _, quota in slots) for category, slots in self.slots.items()}
+        used = {category: sum(min(quota, self.db.count_used(category, split)) for split, quota in slots)
+                for category, slots in self.slots.items()}
+        with self.lock:
+            self.full.update(category for category in self.slots if used[category] >= totals[category])
+            
+        threads = [threading.Thread(target=self.feed, name='pipeline-feed', daemon=True)]
+        threads += [threading.Thread(target=self.fetch, name=f'pipeline-fetch-{i}', daemon=True)
+                    for i in range(self.crawler.max_workers)]
+        threads += [threading.Thread(target=self.parse, name=f'pipeline-parse-{i}', daemon=True)
+                    for i in range(self.parse_workers)]
+        for thread in threads:
+            thread.start()
+            
+        stats = {'train': Counter(), 'test': Counter()}
+        last_heartbeat = time.monotonic()
+        remaining = self.parse_workers
+        
+        try:
+            with tqdm(total=sum(totals.values()), initial=sum(used.values()), desc="Pipeline") as pbar:
+                # Stage 4 (luồng gọi): ghi bài và cập nhật database
+                while remaining:
+                    try:
+                        item = self.result_queue.get(timeout=1)
+                    except queue.Empty:
+                        item = None
+                        
+                    if item is _DONE:
+                        remaining -= 1
+                    elif item is not None:
+                        article_id, url, category, content, signature, skip = item
+                        try:
+                            if skip:
+                                self.db.release_claim(article_id)
+                            else:
+                                result, split = self.crawler.store_article(article_id, url, category, content,
+                                                                           signature, self.slots[category])
+                                if result == 'saved':
+                                    stats[split][category] += 1
+                                    used[category] += 1
+                                    pbar.update(1)
+                        except Exception as e:
+                            # Claim còn giữ được trả lại khi kết thúc, slot dở dang được resume() xử lý
+                            self.logger.error(f"Error storing {url}: {e}")
+                        finally:
+                            with self.lock:
+                                self.inflight[category] -= 1
+                                if used[category] >= totals[category]:
+                                    self.full.add(category)
+                                self.lock.notify_all()
+                            
+                    # Gia hạn lease cho các URL đang giữ
+                    if time.monotonic() - last_heartbeat > config.LEASE_SECONDS / 3:
+                        self.db.heartbeat(self.crawler.worker_id)
+                        last_heartbeat = time.monotonic()
+        finally:
+            with self.lock:
+                self.stopping = True
+                self.lock.notify_all()
+            # Khi dừng giữa chừng: tiếp tục lấy kết quả để các stage trước không bị chặn ở put()
+            while any(thread.is_alive() for thread in threads):
+                try:
+                    self.result_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            # Trả lại các URL đã claim nhưng không dùng tới
+            self.db.release_claims(self.crawler.worker_id)
+            
+        self.crawler.log_bytes_saved()
+        return {
+            'train': {category: stats['train'][category] for category in self.slots},
+            'test': {category: stats['test'][category] for category in self.slots},
+            'new_urls': self.new_urls,
+        }
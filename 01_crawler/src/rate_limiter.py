@@ -0,0 +1,301 @@
+import threading
+import time
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Token bucket limiting the request rate to a single host."""
+    
+    def __init__(self, rate, capacity=1):
+        """
+        Initialize token bucket.
+        
+        Args:
+            rate: Number of tokens added per second (0 = unlimited)
+            capacity: Maximum number of tokens that can be accumulated
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """
+        Take one token, blocking until it becomes available.
+        
+        Returns:
+            Number of seconds spent waiting
+        """
+        if not self.rate or self.rate <= 0:
+            return 0.0
+        
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Đặt trước token: số token âm nghĩa là đang có request xếp hàng chờ
+            self.tokens -= 1
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+
+class HostRateLimiter:
+    """Per-host rate limiter backed by one token bucket per host."""
+    
+    def __init__(self, rate, capacity=1):
+        """
+        Initialize host rate limiter.
+        
+        Args:
+            rate: Requests per second allowed for each host (0 = unlimited)
+            capacity: Burst size allowed for each host
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets = {}
+        self.lock = threading.Lock()
+    
+    def get_bucket(self, host):
+        """
+        Get (or create) the token bucket of a host.
+        
+        Args:
+            host: Host name
+            
+        Returns:
+            TokenBucket object
+        """
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.capacity)
+                self.buckets[host] = bucket
+            return bucket
+    
+    def wait(self, url):
+        """
+        Block until a request to the host of url is allowed.
+        
+        Args:
+            url: URL about to be requested
+            
+        Returns:
+            Number of seconds spent waiting
+        """
+        host = urlparse(url).netloc
+        return self.get_bucket(host).acquire()
+
+
+def backoff_delay(attempt, base, cap):
+    """
+    Exponential backoff with full jitter.
+    
+    Args:
+        attempt: Zero-based retry attempt
+        base: Delay of the first attempt (seconds)
+        cap: Maximum delay (seconds)
+        
+    Returns:
+        Random delay in [0, min(cap, base * 2 ** attempt)]
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header.
+    
+    Args:
+        value: Header value, either delay-seconds or an HTTP-date
+        
+    Returns:
+        Number of seconds to wait, or None if missing or invalid
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit for a single host (additive increase, multiplicative decrease).
+    
+    The limit grows by about `increase` per window of `limit` successful
+    requests while latency stays close to the best observed latency, and is
+    multiplied by `decrease` on throttling (429/503), on a high error rate or
+    when latency inflates. A Retry-After or backoff pause blocks the whole host.
+    """
+    
+    def __init__(self, max_limit, initial=1, min_limit=1, increase=1.0, decrease=0.5,
+                 latency_tolerance=2.0, error_threshold=0.15, adaptive=True):
+        """
+        Initialize AIMD limiter.
+        
+        Args:
+            max_limit: Upper bound of concurrent requests
+            initial: Starting concurrency limit
+            min_limit: Lower bound of concurrent requests
+            increase: Additive increase per window of successful requests
+            decrease: Multiplicative decrease factor on congestion signals
+            latency_tolerance: Latency EWMA / best latency ratio treated as congestion
+            error_threshold: Error rate EWMA above which the limit is cut
+            adaptive: If False, the limit stays at max_limit (only pauses apply)
+        """
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(max_limit if not adaptive else min(max(initial, self.min_limit), self.max_limit))
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.error_threshold = error_threshold
+        self.adaptive = adaptive
+        
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.latency = None  # EWMA latency
+        self.best_latency = None
+        self.error_rate = 0.0
+        self.stats = {'ok': 0, 'throttled': 0, 'error': 0, 'decreases': 0}
+        self.cond = threading.Condition()
+    
+    def acquire(self):
+        """
+        Take a concurrency slot, blocking while the host is paused or at its limit.
+        
+        Returns:
+            Number of seconds spent waiting
+        """
+        start = time.monotonic()
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    self.cond.wait(self.paused_until - now)
+                elif self.in_flight >= int(self.limit):
+                    self.cond.wait()
+                else:
+                    self.in_flight += 1
+                    return time.monotonic() - start
+    
+    def pause(self, seconds):
+        """
+        Block new requests to the host for a number of seconds.
+        
+        Args:
+            seconds: Pause duration
+        """
+        with self.cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+    
+    def _cut(self, now):
+        # Chỉ giảm một lần mỗi khoảng latency, tránh nhiều lỗi đồng thời làm limit sụp về min
+        window = self.latency or 0.0
+        if now - self.last_decrease < window:
+            return
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self.last_decrease = now
+        self.stats['decreases'] += 1
+    
+    def release(self, latency, outcome='ok', retry_after=None):
+        """
+        Return a concurrency slot and feed the outcome to the controller.
+        
+        Args:
+            latency: Duration of the request (seconds)
+            outcome: 'ok', 'throttled' (429/503) or 'error' (5xx, timeout, connection error)
+            retry_after: Seconds requested by a Retry-After header (optional)
+        """
+        with self.cond:
+            now = time.monotonic()
+            self.in_flight -= 1
+            self.stats[outcome] += 1
+            
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+            
+            self.error_rate = 0.9 * self.error_rate + (0.1 if outcome != 'ok' else 0.0)
+            if outcome == 'ok':
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+                # Latency tốt nhất trôi lên chậm để thích nghi khi server thay đổi
+                if self.best_latency is None or latency < self.best_latency:
+                    self.best_latency = latency
+                else:
+                    self.best_latency += (latency - self.best_latency) * 0.01
+            
+            if self.adaptive:
+                if outcome == 'throttled':
+                    self._cut(now)
+                elif outcome == 'error' and self.error_rate > self.error_threshold:
+                    self._cut(now)
+                elif outcome == 'ok':
+                    if self.latency > self.best_latency * self.latency_tolerance:
+                        self._cut(now)
+                    else:
+                        self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            
+            self.cond.notify_all()
+
+
+class HostAIMDController:
+    """Per-host adaptive concurrency backed by one AIMDLimiter per host."""
+    
+    def __init__(self, max_limit, **options):
+        """
+        Initialize host controller.
+        
+        Args:
+            max_limit: Upper bound of concurrent requests per host
+            **options: Keyword arguments passed to each AIMDLimiter
+        """
+        self.max_limit = max_limit
+        self.options = options
+        self.limiters = {}
+        self.lock = threading.Lock()
+    
+    def get_limiter(self, host):
+        """
+        Get (or create) the limiter of a host.
+        
+        Args:
+            host: Host name
+            
+        Returns:
+            AIMDLimiter object
+        """
+        with self.lock:
+            limiter = self.limiters.get(host)
+            if limiter is None:
+                limiter = AIMDLimiter(self.max_limit, **self.options)
+                self.limiters[host] = limiter
+            return limiter
+    
+    def for_url(self, url):
+        """
+        Get the limiter of the host of url.
+        
+        Args:
+            url: URL about to be requested
+            
+        Returns:
+            AIMDLimiter object
+        """
+        return self.get_limiter(urlparse(url).netloc)
@@ -1,76 +1,158 @@
 import requests
+from requests.adapters import HTTPAdapter
 import xml.etree.ElementTree as ET
 from datetime import datetime
-import time
+from itertools import islice
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 
 import config
 from .database import DatabaseManager
+from .http_cache import ValidatorCache
+from .rate_limiter import HostRateLimiter
+from .url_filter import URLFilter, canonicalize_url
+from .metrics import metrics
 
 
 class URLCollector:
     """Collector for URLs from RSS feeds."""
     
-    def __init__(self):
-        """Initialize URL collector."""
+    def __init__(self, max_workers=None):
+        """
+        Initialize URL collector.
+        
+        Args:
+            max_workers: Number of feeds fetched concurrently (default: config.RSS_MAX_WORKERS)
+        """
+        self.max_workers = max(1, max_workers or config.RSS_MAX_WORKERS)
         self.logger = logging.getLogger('ThanhNienCrawler')
         self.db = DatabaseManager()
+        self.http_cache = ValidatorCache(config.RSS_CACHE_FILE)
+        self.session = requests.Session()
+        self.session.headers.update(config.HEADERS)
+        adapter = HTTPAdapter(pool_maxsize=max(10, self.max_workers))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.rate_limiter = HostRateLimiter(config.RATE_LIMIT_PER_HOST, config.RATE_LIMIT_BURST)
+        # Bloom filter các URL đã biết: loại URL trùng mà không cần truy vấn database
+        self.url_filter = URLFilter(config.URL_FILTER_FILE, config.URL_FILTER_CAPACITY, config.URL_FILTER_ERROR_RATE)
+        self.prepare_url_filter()
         
-    def parse_rss(self, rss_url, category):
+    def prepare_url_filter(self):
+        """Seed the URL filter from the database if it is new or out of date."""
+        if not self.url_filter.needs_seed and len(self.url_filter.bloom) > self.db.get_stats()['total']:
+            # Filter chứa nhiều URL hơn database (database đã bị xóa/thay): dựng lại
+            self.logger.warning(f"URL filter {config.URL_FILTER_FILE} does not match the database, rebuilding")
+            self.url_filter.reset()
+        if self.url_filter.needs_seed:
+            self.url_filter.seed(canonicalize_url(url, config.TRACKING_PARAMS) for url in self.db.iter_urls())
+    
+    def parse_item(self, item, category):
         """
-        Parse RSS feed and extract article information.
+        Extract article information from an RSS <item> element.
         
         Args:
-            rss_url: URL of RSS feed
+            item: ElementTree element of the item
             category: Category name (thoisu, kinhte, congnghe)
             
         Returns:
-            List of dictionaries containing article information
+            Dictionary containing article information
         """
-        try:
-            response = requests.get(rss_url, headers=config.HEADERS, timeout=config.TIMEOUT)
-            response.raise_for_status()
-            
-            # Parse XML
-            root = ET.fromstring(response.content)
+        article = {
+            'category': category,
+            'collected_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        
+        # Title
+        title = item.find('title')
+        article['title'] = title.text if title is not None else ''
+        
+        # Link/URL
+        link = item.find('link')
+        # Chuẩn hóa để các biến thể (tham số tracking, fragment, dấu / cuối) của cùng một bài trùng nhau
+        article['url'] = canonicalize_url(link.text or '', config.TRACKING_PARAMS) if link is not None else ''
+        
+        # Description
+        description = item.find('description')
+        article['description'] = description.text if description is not None else ''
+        
+        # Published date
+        pub_date = item.find('pubDate')
+        if pub_date is not None:
+            # Parse RFC 2822 date format
+            try:
+                dt = datetime.strptime(pub_date.text, '%a, %d %b %Y %H:%M:%S %z')
+                article['published_date'] = dt.strftime('%Y-%m-%d %H:%M:%S')
+            except:
+                article['published_date'] = pub_date.text
+        else:
+            article['published_date'] = ''
+        
+        return article
+    
+    def iter_rss(self, rss_url, category):
+        """
+        Stream articles from an RSS feed as its <item> elements are parsed.
+        
+        Items are parsed incrementally from the response stream and dropped
+        once yielded, so memory stays flat regardless of feed size. Yields
+        nothing if the feed has not changed since the last run.
+        
+        Args:
+            rss_url: URL of RSS feed
+            category: Category name (thoisu, kinhte, congnghe)
             
-            articles = []
+        Yields:
+            Dictionaries containing article information
+        """
+        # Conditional GET với ETag/Last-Modified đã lưu
+        headers = self.http_cache.request_headers(rss_url)
+        self.rate_limiter.wait(rss_url)
+        
+        with self.session.get(rss_url, headers=headers, timeout=config.TIMEOUT, stream=True) as response:
+            if response.status_code == 304:
+                self.http_cache.record_not_modified()
+                self.logger.info(f"RSS feed for {category} not modified, skipping")
+                return
+            response.raise_for_status()
+            response.raw.decode_content = True
             
-            # Tìm tất cả items trong channel
-            for item in root.findall('.//item'):
-                article = {
-                    'category': category,
-                    'collected_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                # Title
-                title = item.find('title')
-                article['title'] = title.text if title is not None else ''
+            parents = []
+            for event, elem in ET.iterparse(response.raw, events=('start', 'end')):
+                if event == 'start':
+                    parents.append(elem)
+                    continue
                 
-                # Link/URL
-                link = item.find('link')
-                article['url'] = link.text if link is not None else ''
+                parents.pop()
+                if elem.tag != 'item':
+                    continue
                 
-                # Description
-                description = item.find('description')
-                article['description'] = description.text if description is not None else ''
-                
-                # Published date
-                pub_date = item.find('pubDate')
-                if pub_date is not None:
-                    # Parse RFC 2822 date format
-                    try:
-                        dt = datetime.strptime(pub_date.text, '%a, %d %b %Y %H:%M:%S %z')
-                        article['published_date'] = dt.strftime('%Y-%m-%d %H:%M:%S')
-                    except:
-                        article['published_date'] = pub_date.text
-                else:
-                    article['published_date'] = ''
+                article = self.parse_item(elem, category)
+                # Bỏ item đã xử lý khỏi cây để bộ nhớ không tăng theo kích thước feed
+                if parents:
+                    parents[-1].remove(elem)
                 
                 if article['url']:
-                    articles.append(article)
+                    yield article
+            
+            # Chỉ lưu validator khi feed đã parse thành công
+            self.http_cache.update(rss_url, response)
+    
+    def parse_rss(self, rss_url, category):
+        """
+        Parse RSS feed and extract article information.
+        
+        Args:
+            rss_url: URL of RSS feed
+            category: Category name (thoisu, kinhte, congnghe)
             
+        Returns:
+            List of dictionaries containing article information
+            (empty if the feed has not changed since the last run)
+        """
+        try:
+            articles = list(self.iter_rss(rss_url, category))
             self.logger.info(f"Parsed {len(articles)} articles from {category}")
             return articles
             
@@ -78,67 +160,118 @@ class URLCollector:
             self.logger.error(f"Error parsing RSS feed {rss_url}: {e}")
             return []
     
-    def save_to_database(self, articles):
+    def save_to_database(self, articles, sink=None):
         """
-        Save articles to database.
+        Save articles to database in one bulk transaction.
+        
+        URLs already in the URL filter are dropped before the database is
+        touched; the rest are inserted and added to the filter.
         
         Args:
             articles: List of article dictionaries
+            sink: Callable receiving the list of articles that passed the URL filter,
+                after they are in the database (optional)
             
         Returns:
             Number of new articles saved
         """
-        new_count = 0
-        
-        for article in articles:
-            if self.db.insert_article(article):
-                new_count += 1
+        fresh = self.url_filter.filter_new(articles)
+        if not fresh:
+            return 0
         
+        new_count, duplicate_count = self.db.insert_articles(fresh)
+        # Chỉ thêm vào filter sau khi đã ghi database: filter không bao giờ chứa URL chưa có trong database
+        self.url_filter.add_all(fresh)
+        self.logger.debug(f"Inserted {new_count} new articles, skipped {len(articles) - len(fresh)} "
+                          f"duplicates in the URL filter and {duplicate_count} in the database")
+        if sink:
+            sink(fresh)
         return new_count
     
-    def collect_from_rss(self, category, rss_url):
+    def collect_from_rss(self, category, rss_url, sink=None):
         """
         Collect URLs from a single RSS feed.
         
+        Items are inserted in batches of config.RSS_INSERT_BATCH while the
+        feed is still being parsed.
+        
         Args:
             category: Category name
             rss_url: URL of RSS feed
+            sink: Callable receiving each batch of newly saved articles (optional)
             
         Returns:
             Number of new articles collected
         """
         self.logger.info(f"Collecting URLs from {category} RSS feed...")
         
-        articles = self.parse_rss(rss_url, category)
+        parsed_count = 0
+        new_count = 0
+        
+        try:
+            with metrics.timer('crawler_rss_fetch_seconds', category=category):
+                items = self.iter_rss(rss_url, category)
+                while True:
+                    batch = list(islice(items, config.RSS_INSERT_BATCH))
+                    if not batch:
+                        break
+                    parsed_count += len(batch)
+                    new_count += self.save_to_database(batch, sink)
+        except Exception as e:
+            self.logger.error(f"Error parsing RSS feed {rss_url}: {e}")
         
-        if articles:
-            new_count = self.save_to_database(articles)
-            self.logger.info(f"Saved {new_count} new articles from {category}")
-            return new_count
+        metrics.inc('crawler_rss_items_total', parsed_count, category=category)
+        metrics.inc('crawler_rss_new_total', new_count, category=category)
         
-        return 0
+        self.logger.info(f"Parsed {parsed_count} articles, saved {new_count} new articles from {category}")
+        return new_count
     
-    def collect_all(self):
+    def collect_all(self, sink=None):
         """
-        Collect URLs from all RSS feeds defined in config.
+        Collect URLs from all RSS feeds defined in config, concurrently.
         
+        Args:
+            sink: Callable receiving each batch of newly saved articles, e.g. to
+                start crawling them before collection ends (optional)
+            
         Returns:
             Total number of new articles collected
         """
         total_new = 0
         
-        for category, rss_url in tqdm(config.RSS_FEEDS.items(), desc="Collecting URLs"):
-            new_count = self.collect_from_rss(category, rss_url)
-            total_new += new_count
-            time.sleep(config.DELAY_BETWEEN_REQUESTS)
+        # Mỗi category có thể có một hoặc nhiều feed
+        feeds = []
+        for category, rss_urls in config.RSS_FEEDS.items():
+            if isinstance(rss_urls, str):
+                rss_urls = [rss_urls]
+            feeds.extend((category, rss_url) for rss_url in rss_urls)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.collect_from_rss, category, rss_url, sink) for category, rss_url in feeds]
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Collecting URLs"):
+                total_new += future.result()
+        
+        self.http_cache.save()
+        self.url_filter.save()
         
         # In thống kê
         stats = self.db.get_stats()
+        cache_stats = self.http_cache.stats
         self.logger.info(f"\n{'='*50}")
         self.logger.info(f"Collection Summary:")
         self.logger.info(f"  Total articles in database: {stats['total']}")
         self.logger.info(f"  New articles collected: {total_new}")
         self.logger.info(f"  By category: {stats['by_category']}")
+        self.logger.info(f"  HTTP cache: {cache_stats['hit']} hits, {cache_stats['miss']} misses, "
+                         f"{cache_stats['not_modified']} not modified (304)")
+        filter_stats = self.url_filter.summary()
+        self.logger.info(f"  URL filter: {self.url_filter.stats['rejected']} duplicates rejected before the database, "
+                         f"{self.url_filter.stats['passed']} passed; {filter_stats['urls']} URLs in "
+                         f"{filter_stats['memory_mb']:.1f} MB, estimated false positive rate "
+                         f"{filter_stats['false_positive_rate']:.2e}")
+        if filter_stats['over_capacity']:
+            self.logger.warning(f"URL filter holds more than URL_FILTER_CAPACITY ({config.URL_FILTER_CAPACITY}) URLs; "
+                                f"raise it to keep the false positive rate low (the filter is rebuilt from the database when resized)")
         self.logger.info(f"{'='*50}\n")
         
         return total_new
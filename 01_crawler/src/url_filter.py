@@ -0,0 +1,275 @@
+import os
+import math
+import struct
+import fnmatch
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# Header file Bloom filter: magic, số bit, số hàm hash, số phần tử đã thêm
+HEADER = struct.Struct('<4sQIQ')
+MAGIC = b'BLM1'
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url, tracking_params=()):
+    """
+    Normalize a URL so that variants of the same article compare equal.
+    
+    Lowercases the scheme and host, drops the default port, the fragment,
+    tracking parameters and trailing slashes, and sorts the remaining
+    query parameters.
+    
+    Args:
+        url: URL as found in the feed
+        tracking_params: Query parameter names to drop (shell-style patterns, e.g. 'utm_*')
+        
+    Returns:
+        Canonical URL string (the input stripped of whitespace if it cannot be parsed)
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.hostname:
+        return url
+        
+    scheme = parts.scheme.lower()
+    netloc = parts.hostname.lower()
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc += f':{port}'
+        
+    path = parts.path or '/'
+    while '//' in path:
+        path = path.replace('//', '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+        
+    # Bỏ tham số tracking, sắp xếp phần còn lại để thứ tự không ảnh hưởng
+    query = [
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not any(fnmatch.fnmatchcase(name.lower(), pattern) for pattern in tracking_params)
+    ]
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(query)), ''))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings that can be saved to disk."""
+    
+    def __init__(self, capacity=1_000_000, error_rate=0.001, num_bits=None, num_hashes=None):
+        """
+        Initialize an empty filter.
+        
+        Args:
+            capacity: Expected number of elements
+            error_rate: Target false positive rate at capacity
+            num_bits: Size of the bit array (default: derived from capacity and error_rate)
+            num_hashes: Number of hash functions (default: derived from capacity and error_rate)
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = num_bits or max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = num_hashes or max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.lock = threading.Lock()
+    
+    def _positions(self, item):
+        # Double hashing: k vị trí từ hai giá trị hash 64-bit
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+    
+    def __len__(self):
+        return self.count
+    
+    def add(self, item):
+        """
+        Add an element.
+        
+        Args:
+            item: String to add
+            
+        Returns:
+            True if the element was not in the filter before
+        """
+        positions = self._positions(item)
+        with self.lock:
+            added = False
+            for position in positions:
+                mask = 1 << (position & 7)
+                if not self.bits[position >> 3] & mask:
+                    self.bits[position >> 3] |= mask
+                    added = True
+            if added:
+                self.count += 1
+            return added
+    
+    def false_positive_rate(self):
+        """
+        Estimate the current false positive rate from the number of elements.
+        
+        Returns:
+            Probability that an element never added is reported as present
+        """
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+    
+    @property
+    def memory_bytes(self):
+        """Size of the bit array in bytes."""
+        return len(self.bits)
+    
+    def save(self, path):
+        """
+        Write the filter to disk atomically.
+        
+        Args:
+            path: Output file path
+        """
+        tmp_path = path + '.tmp'
+        with self.lock:
+            with open(tmp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, self.num_bits, self.num_hashes, self.count))
+                f.write(self.bits)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path, capacity, error_rate):
+        """
+        Read a filter saved by save().
+        
+        Args:
+            path: Filter file path
+            capacity: Expected number of elements
+            error_rate: Target false positive rate
+            
+        Returns:
+            BloomFilter, or None if the file is missing, unreadable or was
+            sized for a different capacity/error rate
+        """
+        if not os.path.exists(path):
+            return None
+            
+        bloom = cls(capacity, error_rate)
+        try:
+            with open(path, 'rb') as f:
+                magic, num_bits, num_hashes, count = HEADER.unpack(f.read(HEADER.size))
+                bits = f.read()
+        except (OSError, struct.error) as e:
+            logging.getLogger('ThanhNienCrawler').warning(f"Ignoring unreadable URL filter {path}: {e}")
+            return None
+            
+        if magic != MAGIC or (num_bits, num_hashes) != (bloom.num_bits, bloom.num_hashes) or len(bits) != len(bloom.bits):
+            return None
+        bloom.bits = bytearray(bits)
+        bloom.count = count
+        return bloom
+
+
+class URLFilter:
+    """Persistent Bloom filter of canonical URLs already stored in the database."""
+    
+    def __init__(self, filter_file, capacity=1_000_000, error_rate=0.001):
+        """
+        Initialize URL filter.
+        
+        Args:
+            filter_file: Path of the saved filter
+            capacity: Expected number of URLs
+            error_rate: Target false positive rate at capacity
+        """
+        self.filter_file = filter_file
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.logger = logging.getLogger('ThanhNienCrawler')
+        self.bloom = BloomFilter.load(filter_file, capacity, error_rate)
+        # Filter mới (hoặc đổi kích thước): cần nạp lại các URL có sẵn trong database
+        self.needs_seed = self.bloom is None
+        if self.bloom is None:
+            self.bloom = BloomFilter(capacity, error_rate)
+        self.stats = {'rejected': 0, 'passed': 0}
+    
+    def reset(self):
+        """Discard all URLs so the filter can be seeded again."""
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        self.needs_seed = True
+    
+    def seed(self, urls):
+        """
+        Add URLs that are already in the database.
+        
+        Args:
+            urls: Iterable of canonical URLs
+            
+        Returns:
+            Number of URLs added
+        """
+        added = sum(1 for url in urls if self.bloom.add(url))
+        self.needs_seed = False
+        self.logger.info(f"Seeded URL filter with {added} URLs from the database")
+        return added
+    
+    def filter_new(self, articles):
+        """
+        Drop articles whose URL is (probably) already known.
+        
+        A Bloom filter has no false negatives, so every URL it rejects was
+        seen before, except for the estimated false positive rate. URLs
+        repeated within the list are dropped as well.
+        
+        Args:
+            articles: List of article dictionaries with canonical 'url'
+            
+        Returns:
+            List of articles whose URL is not in the filter
+        """
+        fresh = []
+        seen = set()
+        for article in articles:
+            # URL lặp lại trong cùng một lô cũng bị loại luôn
+            if article['url'] in seen or article['url'] in self.bloom:
+                continue
+            seen.add(article['url'])
+            fresh.append(article)
+            
+        with self.bloom.lock:
+            self.stats['rejected'] += len(articles) - len(fresh)
+            self.stats['passed'] += len(fresh)
+        return fresh
+    
+    def add_all(self, articles):
+        """
+        Remember the URLs of articles written to the database.
+        
+        Args:
+            articles: List of article dictionaries with canonical 'url'
+        """
+        for article in articles:
+            self.bloom.add(article['url'])
+    
+    def summary(self):
+        """
+        Describe the filter for the collection summary.
+        
+        Returns:
+            Dictionary with URL count, memory use and estimated false positive rate
+        """
+        return {
+            'urls': len(self.bloom),
+            'memory_mb': self.bloom.memory_bytes / 2**20,
+            'false_positive_rate': self.bloom.false_positive_rate(),
+            'over_capacity': len(self.bloom) > self.capacity,
+        }
+    
+    def save(self):
+        """Write the filter to disk."""
+        self.bloom.save(self.filter_file)
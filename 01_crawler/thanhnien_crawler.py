@@ -5,7 +5,7 @@ This script combines URL collection and article crawling.
 """
 
 import argparse
-from src import setup_logger, URLCollector, ArticleCrawler, DatabaseManager
+from src import setup_logger, DatabaseManager, start_reporter
 
 
 def main():
@@ -18,15 +18,24 @@ Examples:
   python thanhnien_crawler.py --collect-only      # Chỉ thu thập URLs
   python thanhnien_crawler.py --crawl-only        # Chỉ crawl articles
   python thanhnien_crawler.py                     # Chạy toàn bộ pipeline
+  python thanhnien_crawler.py --pipeline          # Thu thập và crawl chồng lên nhau
         '''
     )
     parser.add_argument('--collect-only', action='store_true', 
                         help='Only collect URLs from RSS feeds')
     parser.add_argument('--crawl-only', action='store_true', 
                         help='Only crawl articles from database')
+    parser.add_argument('--pipeline', action='store_true', 
+                        help='Crawl articles while URLs are still being collected (overlapped stages)')
     parser.add_argument('--stats', action='store_true', 
                         help='Show database statistics only')
+    parser.add_argument('--workers', '-w', type=int, 
+                        help='Number of concurrent fetch workers (overrides config)')
+    parser.add_argument('--metrics-port', type=int, 
+                        help='Serve Prometheus metrics on this local port (overrides config)')
     args = parser.parse_args()
+    if args.pipeline and (args.collect_only or args.crawl_only):
+        parser.error('--pipeline cannot be combined with --collect-only or --crawl-only')
     
     # Setup logger
     logger = setup_logger()
@@ -41,12 +50,43 @@ Examples:
         print(f"Total articles: {stats['total']}")
         print(f"Crawled: {stats['crawled']}")
         print(f"Uncrawled: {stats['uncrawled']}")
+        print(f"Near-duplicates skipped: {stats['duplicates']}")
         print(f"\nBy category:")
         for category, count in stats['by_category'].items():
             print(f"  - {category}: {count}")
         print("="*60 + "\n")
         return
     
+    # Ghi thống kê theo giai đoạn ra file JSON (và endpoint Prometheus nếu bật)
+    reporter = start_reporter(args.metrics_port)
+    
+    try:
+        run_pipeline(args, logger)
+    finally:
+        reporter.stop()
+
+
+def run_pipeline(args, logger):
+    """Run URL collection and/or article crawling according to arguments."""
+    # Import ở đây để --help và --stats không phải tải requests, bs4, numpy...
+    from src import URLCollector, ArticleCrawler, CrawlPipeline
+    
+    if args.pipeline:
+        logger.info("="*60)
+        logger.info("Collecting URLs and crawling articles (pipelined)")
+        logger.info("="*60)
+        
+        pipeline = CrawlPipeline(URLCollector(), ArticleCrawler(max_workers=args.workers))
+        stats = pipeline.run()
+        
+        logger.info("\n" + "="*60)
+        logger.info("Pipeline completed successfully!")
+        logger.info(f"New URLs: {stats['new_urls']}")
+        logger.info(f"Train: {stats['train']}")
+        logger.info(f"Test: {stats['test']}")
+        logger.info("="*60 + "\n")
+        return
+    
     # Bước 1: Thu thập URLs
     if not args.crawl_only:
         logger.info("="*60)
@@ -63,7 +103,7 @@ Examples:
         logger.info("STEP 2: Crawling article content")
         logger.info("="*60)
         
-        crawler = ArticleCrawler()
+        crawler = ArticleCrawler(max_workers=args.workers)
         stats = crawler.crawl_all()
         
         logger.info("\n" + "="*60)
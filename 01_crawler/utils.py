@@ -3,11 +3,10 @@ Các hàm tiện ích cho Thanh Niên Crawler
 """
 
 import os
-import json
-import csv
 import logging
 from datetime import datetime
 import config
+from src import file_utils
 
 
 def setup_logger():
@@ -34,7 +33,7 @@ def setup_logger():
     # File handler
     if not os.path.exists(config.OUTPUT_DIR):
         os.makedirs(config.OUTPUT_DIR)
-    
+        
     file_handler = logging.FileHandler(
         os.path.join(config.OUTPUT_DIR, config.LOG_FILE),
         encoding='utf-8'
@@ -60,17 +59,8 @@ def save_to_csv(articles, filepath):
         articles: List các dictionary chứa thông tin bài viết
         filepath: Đường dẫn file CSV
     """
-    if not articles:
-        return
-    
-    keys = articles[0].keys()
-    
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=keys)
-        writer.writeheader()
-        writer.writerows(articles)
-    
-    print(f"Đã lưu {len(articles)} bài viết vào {filepath}")
+    # Ghi từng dòng bằng bản streaming trong src.file_utils, giữ thông báo tiếng Việt như trước
+    file_utils.save_to_csv(articles, filepath, message="Đã lưu {count} bài viết vào {filepath}")
 
 
 def save_to_json(articles, filepath):
@@ -81,10 +71,8 @@ def save_to_json(articles, filepath):
         articles: List các dictionary chứa thông tin bài viết
         filepath: Đường dẫn file JSON
     """
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(articles, f, ensure_ascii=False, indent=2)
-    
-    print(f"Đã lưu {len(articles)} bài viết vào {filepath}")
+    # Giữ định dạng thụt lề 2 khoảng trắng và thông báo tiếng Việt như trước
+    file_utils.save_to_json(articles, filepath, indent=2, message="Đã lưu {count} bài viết vào {filepath}")
 
 
 def clean_text(text):
@@ -99,7 +87,7 @@ def clean_text(text):
     """
     if not text:
         return ""
-    
+        
     # Loại bỏ khoảng trắng thừa
     text = ' '.join(text.split())
     
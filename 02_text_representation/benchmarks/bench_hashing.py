@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Accuracy and size of HashingVectorizer against the dict-based vectorizers.
+
+Documents of each class mix common words (one Zipf distribution shared
+by all classes) with a few topical words (a Zipf distribution over a
+class-specific permutation of the vocabulary), so classes overlap and
+hash collisions can cost accuracy. Every vectorizer is fitted on the
+train split and scored with Logistic Regression on the test split. The
+vectorizer size is its pickled state (vocabulary and/or IDF); peak RSS
+is measured by bench_memory --vectorizer hashing.
+
+Usage (from 02_text_representation/):
+    python -m benchmarks.bench_hashing
+    python -m benchmarks.bench_hashing --docs 20000 --n-features 1024 65536 262144
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_labeled_corpus(n_docs, words_per_doc, vocab, n_classes, topical, seed=42):
+    """
+    Generate word-segmented documents of n_classes classes.
+    
+    Returns:
+        Tuple (texts, labels)
+    """
+    import numpy as np
+    
+    rng = np.random.default_rng(seed)
+    # Mỗi class có thứ tự từ phổ biến riêng cho các từ chủ đề
+    topics = [rng.permutation(vocab) for _ in range(n_classes)]
+    labels = rng.integers(n_classes, size=n_docs)
+    texts = []
+    for label in labels.tolist():
+        word_ids = rng.zipf(1.2, size=words_per_doc) % vocab
+        is_topical = rng.random(words_per_doc) < topical
+        word_ids[is_topical] = topics[label][word_ids[is_topical]]
+        texts.append(' '.join(f"w{word_id}" for word_id in word_ids.tolist()))
+    return texts, labels
+
+
+def run_once(name, vectorizer, X_train, y_train, X_test, y_test):
+    """
+    Fit a vectorizer and a Logistic Regression, then score the test split.
+    
+    Returns:
+        Dictionary of measurements
+    """
+    from sklearn.linear_model import LogisticRegression
+    
+    start = time.perf_counter()
+    train = vectorizer.fit_transform(X_train)
+    test = vectorizer.transform(X_test)
+    seconds = time.perf_counter() - start
+    
+    clf = LogisticRegression(max_iter=1000, random_state=42)
+    clf.fit(train, y_train)
+    return {
+        'name': name,
+        'features': vectorizer.vocab_size,
+        'size_mb': len(pickle.dumps(vectorizer)) / 2**20,
+        'matrix_mb': (train.data.nbytes + train.indices.nbytes + train.indptr.nbytes) / 2**20,
+        'seconds': seconds,
+        'accuracy': clf.score(test, y_test),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Accuracy and size of HashingVectorizer vs BagOfWords/TFIDF')
+    parser.add_argument('--docs', type=int, default=5000, help='Number of documents (80%% train, 20%% test)')
+    parser.add_argument('--words', type=int, default=100, help='Words per document')
+    parser.add_argument('--vocab', type=int, default=50000, help='Number of distinct word types')
+    parser.add_argument('--classes', type=int, default=3, help='Number of classes')
+    parser.add_argument('--topical', type=float, default=0.05, help='Share of class-specific words per document')
+    parser.add_argument('--n-features', type=int, nargs='+', default=[2**10, 2**14, 2**18],
+                        help='Hash bucket counts to test')
+    args = parser.parse_args()
+    
+    sys.path.insert(0, ROOT)
+    from src import BagOfWords, TFIDF, HashingVectorizer
+    
+    texts, labels = make_labeled_corpus(args.docs, args.words, args.vocab, args.classes, args.topical)
+    split = int(0.8 * args.docs)
+    data = (texts[:split], labels[:split], texts[split:], labels[split:])
+    
+    vectorizers = [('bow', BagOfWords(tokenizer=str.split)), ('tfidf', TFIDF(tokenizer=str.split))]
+    for n_features in args.n_features:
+        vectorizers.append((f"hashing 2^{n_features.bit_length() - 1}" if n_features & (n_features - 1) == 0
+                            else f"hashing {n_features}",
+                            HashingVectorizer(n_features=n_features, use_idf=True, tokenizer=str.split)))
+                            
+    results = []
+    for name, vectorizer in vectorizers:
+        results.append(run_once(name, vectorizer, *data))
+        
+    print("="*88)
+    print(f"Hashing benchmark: {args.docs} documents x {args.words} words, {args.vocab} word types, "
+          f"{args.classes} classes, {args.topical:.0%} topical words")
+    print("="*88)
+    print(f"{'Vectorizer':<16} {'Features':>9} {'Size (MB)':>10} {'Matrix (MB)':>12} {'Time (s)':>9} {'Test Acc':>9}")
+    print("-"*88)
+    for result in results:
+        print(f"{result['name']:<16} {result['features']:>9} {result['size_mb']:>10.2f} {result['matrix_mb']:>12.1f} "
+              f"{result['seconds']:>9.2f} {result['accuracy']:>9.4f}")
+    print("="*88)
+
+
+if __name__ == "__main__":
+    main()
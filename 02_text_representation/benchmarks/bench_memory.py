@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Peak memory of the manual vectorizers on synthetic corpora.
+
+Each measurement runs fit_transform in a fresh process, so ru_maxrss only
+covers that run. Documents are generated from a Zipf distribution over
+--vocab word types and are already word-segmented, so they are split on
+whitespace instead of running underthesea (which would take hours at
+100k documents and does not change the size of the matrix); with
+--tokenizer cached the split goes through the default CachedTokenizer, so
+its in-memory memo is part of the measurement. Dense runs,
+the old behaviour, are skipped when the estimated float64 matrix is
+larger than --dense-limit-mb. Stream runs never hold the corpus or the
+whole matrix: the documents are generated lazily, read once by fit and
+once by transform_chunks, and only one block of rows exists at a time
+(the matrix column then shows the largest block).
+
+Usage (from 02_text_representation/):
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --docs 1000 10000 --mode sparse dense
+    python -m benchmarks.bench_memory --docs 100000 1000000 --mode stream
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VECTORIZERS = {'onehot': 'OneHotEncoder', 'bow': 'BagOfWords', 'tfidf': 'TFIDF', 'hashing': 'HashingVectorizer'}
+
+
+def iter_corpus(n_docs, words_per_doc, vocab, seed=42):
+    """
+    Lazily generate word-segmented documents with a Zipf word distribution.
+    
+    The same seed always yields the same documents, so the corpus can be
+    generated again instead of being kept in memory.
+    
+    Yields:
+        Texts
+    """
+    import numpy as np
+    
+    rng = np.random.default_rng(seed)
+    # Sinh theo lô để mảng tạm không làm tăng peak RSS
+    for start in range(0, n_docs, 1000):
+        word_ids = rng.zipf(1.2, size=(min(1000, n_docs - start), words_per_doc)) % vocab
+        for row in word_ids.tolist():
+            yield ' '.join(f"w{word_id}" for word_id in row)
+
+
+def make_corpus(n_docs, words_per_doc, vocab, seed=42):
+    """
+    Generate word-segmented documents with a Zipf word distribution.
+    
+    Returns:
+        List of texts
+    """
+    return list(iter_corpus(n_docs, words_per_doc, vocab, seed))
+
+
+def matrix_bytes(X):
+    return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+
+
+def peak_rss_mb():
+    # ru_maxrss tính bằng KB trên Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_child(options):
+    """Vectorize one corpus in this process (the benchmark's child) and print the measurements as JSON."""
+    sys.path.insert(0, ROOT)
+    import src
+    
+    corpus = (options['docs'], options['words'], options['vocab'])
+    tokenizer = src.CachedTokenizer(str.split) if options['tokenizer'] == 'cached' else str.split
+    vectorizer = getattr(src, VECTORIZERS[options['vectorizer']])(tokenizer=tokenizer)
+    
+    if options['mode'] == 'stream':
+        corpus_rss = peak_rss_mb()
+        start = time.perf_counter()
+        vectorizer.fit(iter_corpus(*corpus))
+        nnz, size = 0, 0
+        for block in vectorizer.transform_chunks(iter_corpus(*corpus), chunk_size=options['block']):
+            nnz += block.nnz
+            size = max(size, matrix_bytes(block))
+    else:
+        texts = make_corpus(*corpus)
+        corpus_rss = peak_rss_mb()
+        start = time.perf_counter()
+        X = vectorizer.fit_transform(texts, dense=options['mode'] == 'dense')
+        if options['mode'] == 'dense':
+            nnz, size = int((X != 0).sum()), X.nbytes
+        else:
+            nnz, size = X.nnz, matrix_bytes(X)
+    elapsed = time.perf_counter() - start
+    
+    print(json.dumps({
+        'features': vectorizer.vocab_size,
+        'nnz': nnz,
+        'matrix_mb': size / 2**20,
+        'corpus_rss_mb': corpus_rss,
+        'peak_rss_mb': peak_rss_mb(),
+        'seconds': elapsed,
+    }))
+
+
+def run_once(options):
+    """
+    Run one measurement in a fresh process.
+    
+    Returns:
+        Dictionary of measurements printed by run_child
+    """
+    process = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_memory', '--child', json.dumps(options)],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Benchmark run failed:\n{process.stderr[-2000:]}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak RSS of the manual vectorizers (sparse, dense and streamed output)')
+    parser.add_argument('--docs', type=int, nargs='+', default=[1000, 10000, 100000], help='Corpus sizes to test')
+    parser.add_argument('--words', type=int, default=200, help='Words per document')
+    parser.add_argument('--vocab', type=int, default=100000, help='Number of distinct word types')
+    parser.add_argument('--vectorizer', nargs='+', choices=list(VECTORIZERS), default=list(VECTORIZERS),
+                        help='Vectorizers to test')
+    parser.add_argument('--mode', nargs='+', choices=['sparse', 'dense', 'stream'], default=['sparse', 'dense'],
+                        help='Output type (stream: generator input, transform_chunks output)')
+    parser.add_argument('--tokenizer', choices=['split', 'cached'], default='split',
+                        help='Plain str.split, or str.split behind the default CachedTokenizer memo')
+    parser.add_argument('--block', type=int, default=10000, help='Rows per block in stream mode')
+    parser.add_argument('--dense-limit-mb', type=float, default=1024,
+                        help='Skip dense runs whose matrix would be larger than this')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        run_child(json.loads(args.child))
+        return
+        
+    print("="*112)
+    print(f"Vectorizer memory: {args.words} words/document, {args.vocab} word types (Zipf), "
+          f"tokenizer {args.tokenizer}")
+    print("="*112)
+    print(f"{'Vectorizer':<11} {'Docs':>8} {'Mode':<7} {'Features':>9} {'Non-zeros':>11} {'Matrix (MB)':>12} "
+          f"{'Corpus RSS (MB)':>16} {'Peak RSS (MB)':>14} {'Time (s)':>9}")
+    print("-"*112)
+    
+    for name in args.vectorizer:
+        for n_docs in args.docs:
+            for mode in args.mode:
+                options = {'vectorizer': name, 'docs': n_docs, 'words': args.words, 'vocab': args.vocab,
+                           'mode': mode, 'block': args.block, 'tokenizer': args.tokenizer}
+                if mode == 'dense':
+                    # Kích thước ước lượng: số từ khác nhau không vượt quá vocab và tổng số từ
+                    estimate_mb = n_docs * min(args.vocab, n_docs * args.words) * 8 / 2**20
+                    if estimate_mb > args.dense_limit_mb:
+                        print(f"{name:<11} {n_docs:>8} {mode:<7} skipped (dense matrix up to {estimate_mb / 1024:.1f} GB)")
+                        continue
+                result = run_once(options)
+                print(f"{name:<11} {n_docs:>8} {mode:<7} {result['features']:>9} {result['nnz']:>11} "
+                      f"{result['matrix_mb']:>12.1f} {result['corpus_rss_mb']:>16.1f} {result['peak_rss_mb']:>14.1f} "
+                      f"{result['seconds']:>9.2f}")
+                      
+    print("="*112)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Speedup of the manual vectorizers with n_jobs on a synthetic corpus.
+
+Documents are random sentences of Vietnamese syllables, tokenized with
+underthesea (no token cache) as in text_classification.py, so the timings
+are dominated by word segmentation. Each run fit_transforms the same
+corpus and checks the matrix is identical to the serial one.
+
+Usage (from 02_text_representation/):
+    python -m benchmarks.bench_parallel
+    python -m benchmarks.bench_parallel --docs 2000 --jobs 1 2 4 8 --vectorizer bow
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VECTORIZERS = {'onehot': 'OneHotEncoder', 'bow': 'BagOfWords', 'tfidf': 'TFIDF'}
+SYLLABLES = ('nhà nước kinh tế công nghệ thời sự phát triển người dân thị trường giá vàng học sinh '
+             'chính phủ quốc hội điện thoại trí tuệ nhân tạo doanh nghiệp ngân hàng lãi suất').split()
+
+
+def make_corpus(n_docs, words_per_doc, seed=42):
+    """
+    Generate random Vietnamese documents.
+    
+    Returns:
+        List of texts
+    """
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(SYLLABLES) for _ in range(words_per_doc)) + '.' for _ in range(n_docs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Speedup of fit_transform with n_jobs')
+    parser.add_argument('--docs', type=int, default=400, help='Number of documents')
+    parser.add_argument('--words', type=int, default=150, help='Words per document')
+    parser.add_argument('--vectorizer', choices=list(VECTORIZERS), default='tfidf', help='Vectorizer to test')
+    parser.add_argument('--jobs', type=int, nargs='+', help='n_jobs values to test (default: 1, 2, 4... up to the CPU count)')
+    args = parser.parse_args()
+    
+    sys.path.insert(0, ROOT)
+    import src
+    from src import tokenize
+    
+    cpus = os.cpu_count() or 1
+    jobs = args.jobs or sorted({1} | {2 ** i for i in range(1, cpus.bit_length()) if 2 ** i <= cpus} | {cpus})
+    texts = make_corpus(args.docs, args.words)
+    # Import underthesea trước khi đo để lần chạy đầu không bị tính thêm
+    tokenize(texts[0])
+    
+    print("="*70)
+    print(f"n_jobs benchmark: {VECTORIZERS[args.vectorizer]}.fit_transform, {args.docs} documents x "
+          f"{args.words} words, {cpus} CPUs")
+    print("="*70)
+    print(f"{'n_jobs':<8} {'Time (s)':>10} {'Docs/s':>10} {'Speedup':>9} {'Efficiency':>11}  Identical")
+    print("-"*70)
+    
+    reference = None
+    serial_seconds = None
+    for n_jobs in jobs:
+        vectorizer = getattr(src, VECTORIZERS[args.vectorizer])(tokenizer=tokenize, n_jobs=n_jobs)
+        start = time.perf_counter()
+        X = vectorizer.fit_transform(texts)
+        elapsed = time.perf_counter() - start
+        
+        if reference is None:
+            reference, serial_seconds = X, elapsed
+        identical = X.shape == reference.shape and (X != reference).nnz == 0
+        speedup = serial_seconds / elapsed
+        print(f"{n_jobs:<8} {elapsed:>10.2f} {args.docs / elapsed:>10.1f} {speedup:>8.2f}x "
+              f"{100 * speedup / n_jobs:>10.0f}%  {'yes' if identical else 'NO'}")
+              
+    print("="*70)
+
+
+if __name__ == "__main__":
+    main()
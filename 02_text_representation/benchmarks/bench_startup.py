@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Startup-time budget for the command line entry points.
+
+Each entry point is started in a fresh interpreter several times; the
+median wall time minus the median of a bare `python -c pass` is the cost
+of its imports. The script exits with status 1 (so CI fails) when an entry
+point goes over its budget or imports one of the heavy libraries it should
+only load on demand, and prints the slowest imports from `-X importtime`.
+
+Usage (from 02_text_representation/):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --budget-ms 150 --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (lệnh, budget mặc định tính bằng ms)
+ENTRY_POINTS = [
+    (['text_classification.py', '--help'], 100),
+    (['compare_with_sklearn.py', '--help'], 100),
+]
+
+# Các thư viện nặng chỉ được import khi thật sự cần
+HEAVY_MODULES = {'underthesea', 'sklearn', 'numpy', 'scipy'}
+
+
+def script_command(command):
+    """Make the script path of a command absolute so it can run from another directory."""
+    return [os.path.join(ROOT, command[0])] + command[1:]
+
+
+def time_command(command, runs, workdir):
+    """
+    Run a command in fresh interpreters.
+    
+    Returns:
+        Median wall time in seconds
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + command, cwd=workdir, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def import_profile(command, workdir):
+    """
+    Collect -X importtime output of a command.
+    
+    Returns:
+        List of (cumulative microseconds, module name) of top-level imports
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime'] + command, cwd=workdir,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    profile = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        profile.append((int(cumulative), name.rstrip()))
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check cold startup time of the command line scripts')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per entry point (median is used)')
+    parser.add_argument('--budget-ms', type=float, help='Budget for every entry point (overrides defaults)')
+    args = parser.parse_args()
+    
+    failures = []
+    # Thư mục làm việc tạm: file do các lệnh tạo ra không lẫn vào repo
+    with tempfile.TemporaryDirectory() as workdir:
+        baseline = time_command(['-c', 'pass'], args.runs, workdir)
+        
+        print("="*78)
+        print(f"Startup budget: median of {args.runs} runs, bare interpreter {baseline * 1000:.0f} ms")
+        print("="*78)
+        print(f"{'Command':<34} {'Imports (ms)':>13} {'Budget (ms)':>12}  Result")
+        print("-"*78)
+        
+        for command, budget in ENTRY_POINTS:
+            budget = args.budget_ms or budget
+            elapsed_ms = max(0.0, time_command(script_command(command), args.runs, workdir) - baseline) * 1000
+            profile = import_profile(script_command(command), workdir)
+            heavy = sorted({name.strip() for _, name in profile} & HEAVY_MODULES)
+            
+            problems = []
+            if elapsed_ms > budget:
+                problems.append('over budget')
+            if heavy:
+                problems.append(f"imports {', '.join(heavy)}")
+            print(f"{' '.join(command):<34} {elapsed_ms:>13.0f} {budget:>12.0f}  {'; '.join(problems) or 'ok'}")
+            if problems:
+                failures.append((command, profile))
+        print("="*78)
+        
+    for command, profile in failures:
+        print(f"\nSlowest imports of {' '.join(command)}:")
+        # Module cấp cao nhất không bị thụt lề trong output của -X importtime
+        top_level = [(cumulative, name) for cumulative, name in profile if not name.startswith('  ')]
+        for cumulative, name in sorted(top_level, reverse=True)[:10]:
+            print(f"  {cumulative / 1000:>8.1f} ms  {name.strip()}")
+            
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,12 @@
 import argparse
-import numpy as np
 import os
 from pathlib import Path
-from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
-from underthesea import word_tokenize
-from src import BagOfWords, TFIDF
 
 
 def underthesea_tokenizer(text):
     """Custom tokenizer using underthesea for sklearn"""
-    return word_tokenize(text.lower(), format="text").split()
+    from src import tokenize
+    return tokenize(text)
 
 
 def load_train_data(data_dir="data/train", max_files_per_category=50):
@@ -23,31 +20,23 @@ def load_train_data(data_dir="data/train", max_files_per_category=50):
         texts: List of texts
         labels: List of corresponding labels
     """
+    from src import load_text_files, get_category_names
+    
     texts = []
     labels = []
     
     data_path = Path(data_dir)
     
-    # Duyệt qua từng category
-    for category_dir in sorted(data_path.iterdir()):
-        if category_dir.is_dir():
-            category_name = category_dir.name
-            print(f"Loading {category_name}...", end=" ")
-            
-            # Đọc các file trong category
-            files = sorted(list(category_dir.glob("*.txt")))[:max_files_per_category]
-            
-            for file_path in files:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        text = f.read().strip()
-                        if text:  # Chỉ thêm nếu không rỗng
-                            texts.append(text)
-                            labels.append(category_name)
-                except Exception as e:
-                    print(f"\nError reading {file_path}: {e}")
-            
-            print(f"{len(files)} files")
+    # Duyệt qua từng category (đọc corpus dạng shard nếu có, ngược lại đọc các file .txt)
+    for category_name in get_category_names():
+        print(f"Loading {category_name}...", end=" ")
+        
+        category_texts = load_text_files(str(data_path.parent), category_name, data_path.name)
+        category_texts = category_texts[:max_files_per_category]
+        texts.extend(category_texts)
+        labels.extend([category_name] * len(category_texts))
+        
+        print(f"{len(category_texts)} files")
     
     print(f"\nTotal: {len(texts)} documents from {len(set(labels))} categories")
     return texts, labels
@@ -55,6 +44,11 @@ def load_train_data(data_dir="data/train", max_files_per_category=50):
 
 def compare_bow_values():
     """Compare specific values of Bag of Words"""
+    # Import ở đây để `--help` khởi động nhanh
+    import numpy as np
+    from sklearn.feature_extraction.text import CountVectorizer
+    from src import BagOfWords
+    
     print("="*80)
     print("COMPARE BAG OF WORDS VALUES")
     print("="*80)
@@ -65,25 +59,28 @@ def compare_bow_values():
     # Manual implementation
     bow_manual = BagOfWords()
     X_bow = bow_manual.fit_transform(texts)
+    # Chỉ chuyển document đầu tiên sang dense
+    first_bow = X_bow[0].toarray().ravel()
     
     # Sklearn implementation (sử dụng underthesea tokenizer)
     count_vec = CountVectorizer(tokenizer=underthesea_tokenizer, lowercase=False)
-    X_count = count_vec.fit_transform(texts).toarray()
+    X_count = count_vec.fit_transform(texts)
+    first_count = X_count[0].toarray().ravel()
     
     print(f"\nExample first document: '{texts[0]}'")
     print(f"\nManual BoW - Top 5 words with counts:")
     manual_vocab_inv = {v: k for k, v in bow_manual.vocabulary.items()}
-    top_indices = np.argsort(X_bow[0])[-5:][::-1]
+    top_indices = np.argsort(first_bow)[-5:][::-1]
     for idx in top_indices:
-        if X_bow[0, idx] > 0:
-            print(f"  '{manual_vocab_inv[idx]}': {X_bow[0, idx]:.0f}")
+        if first_bow[idx] > 0:
+            print(f"  '{manual_vocab_inv[idx]}': {first_bow[idx]:.0f}")
     
     print(f"\nSklearn CountVectorizer - Top 5 words with counts:")
     sklearn_vocab_inv = {v: k for k, v in count_vec.vocabulary_.items()}
-    top_indices_sk = np.argsort(X_count[0])[-5:][::-1]
+    top_indices_sk = np.argsort(first_count)[-5:][::-1]
     for idx in top_indices_sk:
-        if X_count[0, idx] > 0:
-            print(f"  '{sklearn_vocab_inv[idx]}': {X_count[0, idx]:.0f}")
+        if first_count[idx] > 0:
+            print(f"  '{sklearn_vocab_inv[idx]}': {first_count[idx]:.0f}")
     
     print("\nEXPLANATION:")
     print("- Value = word frequency in document")  # Giá trị = số lần xuất hiện của từ trong document
@@ -93,6 +90,10 @@ def compare_bow_values():
 
 def compare_tfidf_values():
     """Compare TF-IDF values"""
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from src import TFIDF
+    
     print("="*80)
     print("COMPARE TF-IDF VALUES")
     print("="*80)
@@ -103,25 +104,28 @@ def compare_tfidf_values():
     # Manual implementation
     tfidf_manual = TFIDF()
     X_tfidf = tfidf_manual.fit_transform(texts)
+    # Chỉ chuyển document đầu tiên sang dense
+    first_tfidf = X_tfidf[0].toarray().ravel()
     
     # Sklearn implementation (sử dụng underthesea tokenizer)
     tfidf_vec = TfidfVectorizer(tokenizer=underthesea_tokenizer, lowercase=False)
-    X_tfidf_sk = tfidf_vec.fit_transform(texts).toarray()
+    X_tfidf_sk = tfidf_vec.fit_transform(texts)
+    first_tfidf_sk = X_tfidf_sk[0].toarray().ravel()
     
     print(f"\nExample first document: '{texts[0]}'")
     print(f"\nManual TFIDF - Top 5 words with scores:")
     manual_vocab_inv = {v: k for k, v in tfidf_manual.vocabulary.items()}
-    top_indices = np.argsort(X_tfidf[0])[-5:][::-1]
+    top_indices = np.argsort(first_tfidf)[-5:][::-1]
     for idx in top_indices:
-        if X_tfidf[0, idx] > 0:
-            print(f"  '{manual_vocab_inv[idx]}': {X_tfidf[0, idx]:.4f}")
+        if first_tfidf[idx] > 0:
+            print(f"  '{manual_vocab_inv[idx]}': {first_tfidf[idx]:.4f}")
     
     print(f"\nSklearn TfidfVectorizer - Top 5 words with scores:")
     sklearn_vocab_inv = {v: k for k, v in tfidf_vec.vocabulary_.items()}
-    top_indices_sk = np.argsort(X_tfidf_sk[0])[-5:][::-1]
+    top_indices_sk = np.argsort(first_tfidf_sk)[-5:][::-1]
     for idx in top_indices_sk:
-        if X_tfidf_sk[0, idx] > 0:
-            print(f"  '{sklearn_vocab_inv[idx]}': {X_tfidf_sk[0, idx]:.4f}")
+        if first_tfidf_sk[idx] > 0:
+            print(f"  '{sklearn_vocab_inv[idx]}': {first_tfidf_sk[idx]:.4f}")
     
     print("\nEXPLANATION:")
     print("- TF-IDF = TF * IDF")
@@ -27,9 +27,9 @@ def demo_bow():
     print("BAG OF WORDS DEMO")
     print("="*60)
     
-    # Fit trên toàn bộ corpus
+    # Fit trên toàn bộ corpus (ma trận dense để in ra màn hình)
     bow = BagOfWords()
-    X = bow.fit_transform(CORPUS)
+    X = bow.fit_transform(CORPUS, dense=True)
     
     # In thông tin về câu đầu tiên
     first_sentence = CORPUS[0]
@@ -60,9 +60,9 @@ def demo_tfidf():
     print("TF-IDF DEMO")
     print("="*60)
     
-    # Fit trên toàn bộ corpus
+    # Fit trên toàn bộ corpus (ma trận dense để in ra màn hình)
     tfidf = TFIDF()
-    X = tfidf.fit_transform(CORPUS)
+    X = tfidf.fit_transform(CORPUS, dense=True)
     
     # In thông tin về câu đầu tiên
     first_sentence = CORPUS[0]
@@ -93,9 +93,9 @@ def demo_onehot():
     print("ONE-HOT ENCODING DEMO")
     print("="*60)
     
-    # Fit trên toàn bộ corpus
+    # Fit trên toàn bộ corpus (ma trận dense để in ra màn hình)
     ohe = OneHotEncoder()
-    X = ohe.fit_transform(CORPUS)
+    X = ohe.fit_transform(CORPUS, dense=True)
     
     # In thông tin về câu đầu tiên
     first_sentence = CORPUS[0]
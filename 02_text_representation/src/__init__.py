@@ -1,13 +1,34 @@
-from .data_loader import load_dataset, load_text_files, get_category_names
-from .one_hot_encoder import OneHotEncoder
-from .bag_of_words import BagOfWords
-from .tfidf import TFIDF
-
-__all__ = [
-    'load_dataset',
-    'load_text_files',
-    'get_category_names',
-    'OneHotEncoder',
-    'BagOfWords',
-    'TFIDF',
-]
+import importlib
+
+# Import lười (PEP 562): submodule chỉ được import khi truy cập tên lần đầu,
+# nên `--help` không phải tải numpy/underthesea
+_EXPORTS = {
+    'load_dataset': 'data_loader',
+    'load_text_files': 'data_loader',
+    'load_corpus_texts': 'data_loader',
+    'iter_text_files': 'data_loader',
+    'DocumentStream': 'data_loader',
+    'get_category_names': 'data_loader',
+    'ShardedCorpus': 'corpus_reader',
+    'tokenize': 'tokenizer',
+    'CachedTokenizer': 'tokenizer',
+    'OneHotEncoder': 'one_hot_encoder',
+    'BagOfWords': 'bag_of_words',
+    'TFIDF': 'tfidf',
+    'HashingVectorizer': 'hashing_vectorizer',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    # Lưu lại để các lần truy cập sau không gọi __getattr__ nữa
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,7 +1,10 @@
 import numpy as np
-from typing import List
+from typing import Callable, Iterable, Iterator, List, Union
 from collections import Counter
-from underthesea import word_tokenize
+from scipy import sparse
+from .tokenizer import CachedTokenizer
+from .sparse_rows import SparseRowBuilder
+from .parallel import map_chunks, BLOCK_SIZE
 
 
 class BagOfWords:
@@ -11,74 +14,116 @@ class BagOfWords:
     Represent text using word frequency vectors
     """
     
-    def __init__(self, max_features: int = None, min_df: int = 1):
+    def __init__(self, max_features: int = None, min_df: int = 1, tokenizer: Callable[[str], List[str]] = None,
+                 n_jobs: int = 1):
         """
         Args:
             max_features: Maximum number of features (keep most common words)
             min_df: Minimum document frequency (remove rare words)
+            tokenizer: Function splitting a text into tokens (default: underthesea word segmentation,
+                with a small in-memory memo; pass CachedTokenizer(cache_dir=...) so that fit and transform
+                tokenize each text once on large corpora or with n_jobs > 1)
+            n_jobs: Number of processes for tokenization and counting (-1 = all CPUs)
         """
+        self.tokenizer = tokenizer or CachedTokenizer()
+        self.n_jobs = n_jobs
         self.max_features = max_features
         self.min_df = min_df
         self.vocabulary = {}  # {word: index}
         self.vocab_size = 0
-        
-    def fit(self, texts: List[str]):
+    
+    def _count_chunk(self, texts: List[str]):
+        """Word counts and document frequencies of a chunk of texts"""
+        word_counts = Counter()
+        doc_freq = Counter()
+        for text in texts:
+            tokens = self.tokenizer(text)
+            word_counts.update(tokens)
+            # Đếm document frequency (mỗi doc chỉ đếm 1 lần)
+            doc_freq.update(set(tokens))
+        return word_counts, doc_freq
+    
+    def _transform_chunk(self, texts: List[str]) -> SparseRowBuilder:
+        """Word-count rows of a chunk of texts"""
+        rows = SparseRowBuilder(self.vocab_size)
+        for text in texts:
+            tokens = self.tokenizer(text)
+            # Đếm tần suất mỗi từ
+            token_counts = Counter(token for token in tokens if token in self.vocabulary)
+            rows.add_row((self.vocabulary[token] for token in token_counts), token_counts.values())
+        return rows
+    
+    def fit(self, texts: Iterable[str]):
         """
         Build vocabulary from corpus
         
         Args:
-            texts: List of texts
+            texts: List of texts, or any iterable/generator (read once, chunk by chunk)
         """
-        # Đếm tần suất từ trong toàn bộ corpus
+        # Đếm tần suất từ trong toàn bộ corpus: đếm từng chunk (song song nếu n_jobs > 1) rồi cộng dồn
         word_counts = Counter()
         doc_freq = Counter()  # Số documents chứa từ
         
-        for text in texts:
-            tokens = word_tokenize(text.lower(), format="text").split()
-            word_counts.update(tokens)
-            # Đếm document frequency (mỗi doc chỉ đếm 1 lần)
-            doc_freq.update(set(tokens))
-        
+        for chunk_counts, chunk_freq in map_chunks(BagOfWords._count_chunk, self, texts, self.n_jobs):
+            word_counts.update(chunk_counts)
+            doc_freq.update(chunk_freq)
+            
         # Lọc từ theo min_df
         valid_words = [word for word, freq in doc_freq.items() if freq >= self.min_df]
         
         # Lọc theo max_features (giữ các từ phổ biến nhất)
         if self.max_features and len(valid_words) > self.max_features:
-            # Sắp xếp theo tần suất giảm dần
-            valid_words = sorted(valid_words, key=lambda w: word_counts[w], reverse=True)
+            # Sắp xếp theo tần suất giảm dần, cùng tần suất thì theo thứ tự chữ cái để kết quả không phụ thuộc thứ tự đếm
+            valid_words = sorted(valid_words, key=lambda w: (-word_counts[w], w))
             valid_words = valid_words[:self.max_features]
-        
+            
         # Tạo vocabulary
         self.vocabulary = {word: idx for idx, word in enumerate(sorted(valid_words))}
         self.vocab_size = len(self.vocabulary)
         
         print(f"Bag of Words fitted with vocabulary size: {self.vocab_size}")
-        
-    def transform(self, texts: List[str]) -> np.ndarray:
+    
+    def transform(self, texts: Iterable[str], dense: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
         """
         Convert texts to BoW vectors
         
         Args:
-            texts: List of texts
+            texts: List of texts, or any iterable (read once)
+            dense: Return a dense numpy array instead of a sparse matrix
             
         Returns:
-            Matrix shape (n_texts, vocab_size) with values as word frequencies
+            CSR matrix shape (n_texts, vocab_size) with values as word frequencies, or np.ndarray if dense
         """
-        result = np.zeros((len(texts), self.vocab_size))
-        
-        for i, text in enumerate(texts):
-            tokens = word_tokenize(text.lower(), format="text").split()
-            # Đếm tần suất mỗi từ
-            token_counts = Counter(tokens)
+        # Chỉ lưu các vị trí khác 0, không cấp phát ma trận dense; các chunk được nối theo thứ tự
+        rows = SparseRowBuilder(self.vocab_size)
+        for chunk_rows in map_chunks(BagOfWords._transform_chunk, self, texts, self.n_jobs):
+            rows.extend(chunk_rows)
             
-            for token, count in token_counts.items():
-                if token in self.vocabulary:
-                    idx = self.vocabulary[token]
-                    result[i, idx] = count
+        result = rows.build()
+        return result.toarray() if dense else result
+    
+    def transform_chunks(self, texts: Iterable[str], chunk_size: int = BLOCK_SIZE) -> Iterator[sparse.csr_matrix]:
+        """
+        Convert texts to BoW vectors block by block
+        
+        Only one block is held in memory at a time, so a corpus larger than
+        memory can be streamed from a generator
         
-        return result
+        Args:
+            texts: Any iterable of texts
+            chunk_size: Maximum number of rows per block
+            
+        Yields:
+            CSR matrices shape (<= chunk_size, vocab_size), in document order
+        """
+        for chunk_rows in map_chunks(BagOfWords._transform_chunk, self, texts, self.n_jobs, chunk_size):
+            yield chunk_rows.build()
     
-    def fit_transform(self, texts: List[str]) -> np.ndarray:
+    def fit_transform(self, texts: List[str], dense: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
         """Fit and transform in one step"""
+        # Iterator chỉ đọc được một lần: không đủ cho fit rồi transform
+        if iter(texts) is texts:
+            raise TypeError("fit_transform reads the documents twice: pass a list or a re-iterable such as "
+                            "DocumentStream, or call fit and transform_chunks on fresh iterators")
         self.fit(texts)
-        return self.transform(texts)
+        return self.transform(texts, dense)
@@ -0,0 +1,56 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+
+# Định dạng corpus (record, index, shard) chỉ định nghĩa một lần trong module của crawler
+CRAWLER_CORPUS = Path(__file__).resolve().parents[2] / '01_crawler' / 'src' / 'corpus.py'
+
+
+def _load_crawler_corpus():
+    """
+    Load 01_crawler/src/corpus.py as the module 'crawler_corpus'
+    
+    Both projects name their package 'src', so the file is loaded by path
+    instead of being imported as src.corpus. It only uses the standard
+    library and does not import the rest of the crawler.
+    """
+    module = sys.modules.get('crawler_corpus')
+    if module is not None:
+        return module
+    if not CRAWLER_CORPUS.exists():
+        raise ImportError(f"Corpus format module not found: {CRAWLER_CORPUS} "
+                          "(01_crawler is required to read data/corpus)")
+        
+    spec = importlib.util.spec_from_file_location('crawler_corpus', CRAWLER_CORPUS)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['crawler_corpus'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_corpus = _load_crawler_corpus()
+INDEX_ENTRY = _corpus.INDEX_ENTRY
+SHARD_PATTERN = _corpus.SHARD_PATTERN
+decode_record = _corpus.decode_record
+
+
+class ShardedCorpus(_corpus.CorpusReader):
+    """
+    Read-only access to the sharded corpus written by the crawler
+    
+    Layout: corpus/<split>/<category>/shard-*.jsonl[.gz] with a binary
+    .idx file of (article_id, offset, length, written_at) entries per shard.
+    This is the crawler's CorpusReader, so the two projects cannot drift
+    apart: len, in, ids(), get(article_id) through mmap, iter_records(split,
+    category) in shard order and close()
+    """
+    
+    def __init__(self, corpus_dir: str):
+        """
+        Load the offset indexes of all shards
+        
+        Args:
+            corpus_dir: Root directory of the corpus (e.g., 'data/corpus')
+        """
+        super().__init__(str(corpus_dir))
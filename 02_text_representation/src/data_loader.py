@@ -1,11 +1,40 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple, List
+from typing import Iterator, List, Sequence, Tuple
 import numpy as np
 
+from .corpus_reader import ShardedCorpus
+
+
+@lru_cache(maxsize=None)
+def open_corpus(corpus_dir: str) -> ShardedCorpus:
+    """Open a sharded corpus once and reuse its index"""
+    return ShardedCorpus(corpus_dir)
+
+
+def load_corpus_texts(corpus_dir: str, category: str, split: str = 'train') -> List[str]:
+    """
+    Load texts of one category from the sharded corpus
+    
+    Args:
+        corpus_dir: Corpus directory (e.g., 'data/corpus')
+        category: Category name ('thoisu', 'kinhte', 'congnghe')
+        split: 'train' or 'test'
+        
+    Returns:
+        List of text contents, ordered by article id
+    """
+    records = open_corpus(str(corpus_dir)).iter_records(split, category)
+    # Sắp theo id để thứ tự giống như khi đọc các file .txt đã sort
+    return [record['text'].strip() for record in sorted(records, key=lambda r: r['id']) if record['text'].strip()]
+
 
 def load_text_files(data_dir: str, category: str, split: str = 'train') -> List[str]:
     """
-    Load all text files from one category
+    Load all texts from one category
+    
+    Reads the sharded corpus (data_dir/corpus) when it exists, otherwise
+    the one-file-per-article tree data_dir/<split>/<category>/*.txt.
     
     Args:
         data_dir: Directory containing data (e.g., 'data')
@@ -15,13 +44,17 @@ def load_text_files(data_dir: str, category: str, split: str = 'train') -> List[
     Returns:
         List of text contents
     """
+    corpus_dir = Path(data_dir) / 'corpus'
+    if corpus_dir.is_dir():
+        return load_corpus_texts(str(corpus_dir), category, split)
+        
     category_path = Path(data_dir) / split / category
     texts = []
     
     if not category_path.exists():
         print(f"Warning: {category_path} does not exist!")
         return texts
-    
+        
     # Đọc tất cả file .txt
     for file_path in sorted(category_path.glob('*.txt')):
         try:
@@ -31,10 +64,77 @@ def load_text_files(data_dir: str, category: str, split: str = 'train') -> List[
                     texts.append(content)
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
-    
+            
     return texts
 
 
+def iter_text_files(data_dir: str, category: str, split: str = 'train') -> Iterator[str]:
+    """
+    Stream the texts of one category without loading them all into memory
+    
+    Same sources as load_text_files: the sharded corpus (in shard order)
+    when data_dir/corpus exists, otherwise the .txt files in name order
+    
+    Args:
+        data_dir: Directory containing data (e.g., 'data')
+        category: Category name ('thoisu', 'kinhte', 'congnghe')
+        split: 'train' or 'test'
+        
+    Yields:
+        Non-empty text contents
+    """
+    corpus_dir = Path(data_dir) / 'corpus'
+    if corpus_dir.is_dir():
+        for record in open_corpus(str(corpus_dir)).iter_records(split, category):
+            text = record['text'].strip()
+            if text:
+                yield text
+        return
+        
+    # Chỉ giữ danh sách đường dẫn, nội dung được đọc từng file một
+    for file_path in sorted((Path(data_dir) / split / category).glob('*.txt')):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
+            continue
+        if content:
+            yield content
+
+
+class DocumentStream:
+    """
+    Re-iterable stream of the texts of one split
+    
+    Every iteration reads the documents from disk again, so a vectorizer
+    can fit on it and then transform it (two passes) while only one chunk
+    of documents is in memory at a time
+    """
+    
+    def __init__(self, data_dir: str = 'data', split: str = 'train', categories: Sequence[str] = None):
+        """
+        Args:
+            data_dir: Directory containing data
+            split: 'train' or 'test'
+            categories: Categories to read, in order (default: get_category_names())
+        """
+        self.data_dir = data_dir
+        self.split = split
+        self.categories = list(categories or get_category_names())
+    
+    def __iter__(self) -> Iterator[str]:
+        for category in self.categories:
+            yield from iter_text_files(self.data_dir, category, self.split)
+    
+    def iter_labels(self) -> Iterator[int]:
+        """Category index of each document, in iteration order"""
+        for category in self.categories:
+            category_id = get_category_names().index(category)
+            for _ in iter_text_files(self.data_dir, category, self.split):
+                yield category_id
+
+
 def load_dataset(data_dir: str = 'data') -> Tuple[List[str], np.ndarray, List[str], np.ndarray]:
     """
     Load entire dataset (train and test)
@@ -61,7 +161,7 @@ def load_dataset(data_dir: str = 'data') -> Tuple[List[str], np.ndarray, List[st
         X_train.extend(texts)
         y_train.extend([category_to_id[category]] * len(texts))
         print(f"  - {category}: {len(texts)} samples")
-    
+        
     # Load test data
     print("\nLoading test data...")
     for category in categories:
@@ -69,7 +169,7 @@ def load_dataset(data_dir: str = 'data') -> Tuple[List[str], np.ndarray, List[st
         X_test.extend(texts)
         y_test.extend([category_to_id[category]] * len(texts))
         print(f"  - {category}: {len(texts)} samples")
-    
+        
     # Convert to numpy array
     y_train = np.array(y_train)
     y_test = np.array(y_test)
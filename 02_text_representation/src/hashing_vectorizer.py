@@ -0,0 +1,182 @@
+import zlib
+import numpy as np
+from typing import Callable, Iterable, Iterator, List, Union
+from collections import Counter
+from scipy import sparse
+from .tokenizer import CachedTokenizer
+from .sparse_rows import SparseRowBuilder
+from .parallel import map_chunks, BLOCK_SIZE
+
+
+# Số cột mặc định (2^18 như Vowpal Wabbit): đủ cho vài trăm nghìn từ với ít va chạm
+DEFAULT_N_FEATURES = 2 ** 18
+# Bit dấu: bit cao nhất của CRC32, độc lập với các bit thấp dùng làm index khi n_features <= 2^31
+_SIGN_BIT = 1 << 31
+
+
+class HashingVectorizer:
+    """
+    Feature hashing ("hashing trick") vectorizer
+    
+    Each token goes to column crc32(token) % n_features, with a sign taken
+    from the top bit of the same hash so that colliding tokens cancel out
+    on average instead of always adding up. There is no vocabulary:
+    memory does not grow with the number of distinct words, transform
+    needs no fit and every chunk is hashed independently. CRC32 (unlike
+    Python's hash()) gives the same columns in every process and run
+    
+    Values are word counts like BagOfWords, or TF * IDF like TFIDF when
+    use_idf is set (fit then only counts document frequencies per column)
+    """
+    
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES, alternate_sign: bool = True, use_idf: bool = False,
+                 tokenizer: Callable[[str], List[str]] = None, n_jobs: int = 1):
+        """
+        Args:
+            n_features: Number of columns (hash buckets), at most 2^31
+            alternate_sign: Give each token a +1/-1 sign from its hash (turn off for MultinomialNB,
+                which needs non-negative values)
+            use_idf: Weight counts by IDF, computed by fit on document frequencies per column
+            tokenizer: Function splitting a text into tokens (default: underthesea word segmentation,
+                with a small in-memory memo; pass CachedTokenizer(cache_dir=...) so that fit and transform
+                tokenize each text once on large corpora or with n_jobs > 1)
+            n_jobs: Number of processes for tokenization and hashing (-1 = all CPUs)
+        """
+        if not 0 < n_features <= _SIGN_BIT:
+            raise ValueError(f"n_features must be between 1 and 2^31, got {n_features}")
+        self.tokenizer = tokenizer or CachedTokenizer()
+        self.n_jobs = n_jobs
+        self.n_features = n_features
+        self.alternate_sign = alternate_sign
+        self.use_idf = use_idf
+        self.idf = None  # IDF của từng cột (chỉ khi use_idf)
+        self.vocab_size = n_features  # Cùng tên thuộc tính với các vectorizer khác
+    
+    def _hash_counts(self, tokens: List[str]) -> dict:
+        """Signed token counts of one document, summed per column"""
+        n_features = self.n_features
+        alternate_sign = self.alternate_sign
+        row = {}
+        for token, count in Counter(tokens).items():
+            h = zlib.crc32(token.encode('utf-8'))
+            index = h % n_features
+            if alternate_sign and h & _SIGN_BIT:
+                count = -count
+            row[index] = row.get(index, 0) + count
+        return row
+    
+    def _count_chunk(self, texts: List[str]):
+        """Number of documents and document frequencies per column of a chunk of texts"""
+        doc_freq = Counter()
+        for text in texts:
+            # Mỗi document chỉ đếm 1 lần cho mỗi cột có token, kể cả khi các dấu triệt tiêu nhau
+            doc_freq.update(self._hash_counts(self.tokenizer(text)).keys())
+        return len(texts), doc_freq
+    
+    def _transform_chunk(self, texts: List[str]):
+        """Hashed count rows and document lengths of a chunk of texts"""
+        rows = SparseRowBuilder(self.n_features)
+        total_words = []  # Số từ của mỗi document
+        for text in texts:
+            tokens = self.tokenizer(text)
+            # Va chạm có dấu ngược nhau có thể triệt tiêu về 0: không lưu các giá trị đó
+            row = {index: count for index, count in self._hash_counts(tokens).items() if count}
+            rows.add_row(row.keys(), row.values())
+            total_words.append(len(tokens))
+        return rows, total_words
+    
+    def fit(self, texts: Iterable[str]):
+        """
+        Calculate IDF for each column (nothing to learn without use_idf)
+        
+        Args:
+            texts: List of texts, or any iterable/generator (read once, chunk by chunk)
+        """
+        if not self.use_idf:
+            print(f"Hashing vectorizer needs no fit ({self.n_features} features)")
+            return
+            
+        N = 0  # Tổng số documents
+        doc_freq = np.zeros(self.n_features)
+        for chunk_docs, chunk_freq in map_chunks(HashingVectorizer._count_chunk, self, texts, self.n_jobs):
+            N += chunk_docs
+            doc_freq[np.fromiter(chunk_freq.keys(), dtype=np.int64, count=len(chunk_freq))] += \
+                np.fromiter(chunk_freq.values(), dtype=np.float64, count=len(chunk_freq))
+                
+        # Cùng công thức smoothing với TFIDF: log((N + 1) / (df + 1)) + 1
+        self.idf = np.log((N + 1) / (doc_freq + 1)) + 1
+        
+        print(f"Hashing vectorizer fitted IDF on {N} documents ({int((doc_freq > 0).sum())} of "
+              f"{self.n_features} features used)")
+    
+    def transform(self, texts: Iterable[str], normalize: bool = True, dense: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
+        """
+        Convert texts to hashed vectors
+        
+        Args:
+            texts: List of texts, or any iterable (read once)
+            normalize: Whether to normalize with L2 norm
+            dense: Return a dense numpy array instead of a sparse matrix
+            
+        Returns:
+            CSR matrix shape (n_texts, n_features), or np.ndarray if dense
+        """
+        self._check_fitted()
+        # Chỉ lưu các vị trí khác 0; các chunk được nối theo thứ tự
+        rows = SparseRowBuilder(self.n_features)
+        total_words = []
+        for chunk_rows, chunk_total_words in map_chunks(HashingVectorizer._transform_chunk, self, texts, self.n_jobs):
+            rows.extend(chunk_rows)
+            total_words.extend(chunk_total_words)
+            
+        return self._weight(rows.build(), total_words, normalize, dense)
+    
+    def transform_chunks(self, texts: Iterable[str], normalize: bool = True,
+                         chunk_size: int = BLOCK_SIZE) -> Iterator[sparse.csr_matrix]:
+        """
+        Convert texts to hashed vectors block by block
+        
+        Args:
+            texts: Any iterable of texts
+            normalize: Whether to normalize with L2 norm
+            chunk_size: Maximum number of rows per block
+            
+        Yields:
+            CSR matrices shape (<= chunk_size, n_features), in document order
+        """
+        self._check_fitted()
+        for chunk_rows, total_words in map_chunks(HashingVectorizer._transform_chunk, self, texts,
+                                                  self.n_jobs, chunk_size):
+            yield self._weight(chunk_rows.build(), total_words, normalize)
+    
+    def _check_fitted(self):
+        if self.use_idf and self.idf is None:
+            raise ValueError("HashingVectorizer with use_idf=True must be fitted before transform")
+    
+    def _weight(self, result: sparse.csr_matrix, total_words: List[int], normalize: bool = True,
+                dense: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
+        """Turn a matrix of hashed counts into TF-IDF values and/or L2-normalized rows"""
+        row_lengths = np.diff(result.indptr)
+        
+        # TF = count / total_words, TF-IDF = TF * IDF (tính tại chỗ trên các giá trị khác 0)
+        if self.use_idf:
+            result.data /= np.repeat(np.asarray(total_words, dtype=np.float64), row_lengths)
+            result.data *= self.idf[result.indices]
+            
+        # L2 normalization theo từng dòng (dòng rỗng giữ nguyên)
+        if normalize:
+            squares = sparse.csr_matrix((result.data ** 2, result.indices, result.indptr), shape=result.shape)
+            norms = np.sqrt(np.asarray(squares.sum(axis=1)).ravel())
+            result.data /= np.repeat(norms, row_lengths)
+            
+        return result.toarray() if dense else result
+    
+    def fit_transform(self, texts: List[str], normalize: bool = True, dense: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
+        """Fit (IDF only) and transform in one step"""
+        if self.use_idf:
+            # Iterator chỉ đọc được một lần: không đủ cho fit rồi transform
+            if iter(texts) is texts:
+                raise TypeError("fit_transform with use_idf reads the documents twice: pass a list or a "
+                                "re-iterable such as DocumentStream, or call fit and transform_chunks on fresh iterators")
+            self.fit(texts)
+        return self.transform(texts, normalize, dense)
@@ -1,6 +1,9 @@
 import numpy as np
-from typing import List
-from underthesea import word_tokenize
+from typing import Callable, Iterable, Iterator, List, Union
+from scipy import sparse
+from .tokenizer import CachedTokenizer
+from .sparse_rows import SparseRowBuilder
+from .parallel import map_chunks, BLOCK_SIZE
 
 
 class OneHotEncoder:
@@ -11,51 +14,95 @@ class OneHotEncoder:
     with one value as 1, rest are 0
     """
     
-    def __init__(self):
+    def __init__(self, tokenizer: Callable[[str], List[str]] = None, n_jobs: int = 1):
+        """
+        Args:
+            tokenizer: Function splitting a text into tokens (default: underthesea word segmentation,
+                with a small in-memory memo; pass CachedTokenizer(cache_dir=...) so that fit and transform
+                tokenize each text once on large corpora or with n_jobs > 1)
+            n_jobs: Number of processes for tokenization and counting (-1 = all CPUs)
+        """
+        self.tokenizer = tokenizer or CachedTokenizer()
+        self.n_jobs = n_jobs
         self.vocabulary = {}  # {word: index}
         self.vocab_size = 0
-        
-    def fit(self, texts: List[str]):
+    
+    def _words_chunk(self, texts: List[str]) -> set:
+        """Unique words of a chunk of texts"""
+        words = set()
+        for text in texts:
+            tokens = self.tokenizer(text)
+            words.update(tokens)
+        return words
+    
+    def _transform_chunk(self, texts: List[str]) -> SparseRowBuilder:
+        """One-hot rows of a chunk of texts"""
+        rows = SparseRowBuilder(self.vocab_size)
+        for text in texts:
+            tokens = self.tokenizer(text)
+            # Mỗi từ xuất hiện chỉ được đánh dấu 1 lần
+            rows.add_row({self.vocabulary[token] for token in tokens if token in self.vocabulary})
+        return rows
+    
+    def fit(self, texts: Iterable[str]):
         """
         Build vocabulary from corpus
         
         Args:
-            texts: List of texts
+            texts: List of texts, or any iterable/generator (read once, chunk by chunk)
         """
-        # Thu thập tất cả các từ unique
+        # Thu thập tất cả các từ unique (theo chunk, song song nếu n_jobs > 1)
         all_words = set()
-        for text in texts:
-            tokens = word_tokenize(text.lower(), format="text").split()
-            all_words.update(tokens)
-        
+        for words in map_chunks(OneHotEncoder._words_chunk, self, texts, self.n_jobs):
+            all_words.update(words)
+            
         # Tạo mapping từ word -> index
         self.vocabulary = {word: idx for idx, word in enumerate(sorted(all_words))}
         self.vocab_size = len(self.vocabulary)
         
         print(f"One-Hot Encoder fitted with vocabulary size: {self.vocab_size}")
-        
-    def transform(self, texts: List[str]) -> np.ndarray:
+    
+    def transform(self, texts: Iterable[str], dense: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
         """
         Convert texts to one-hot vectors
         
         Args:
-            texts: List of texts
+            texts: List of texts, or any iterable (read once)
+            dense: Return a dense numpy array instead of a sparse matrix
             
         Returns:
-            Matrix shape (n_texts, vocab_size)
+            CSR matrix shape (n_texts, vocab_size), or np.ndarray if dense
+        """
+        # Chỉ lưu các vị trí khác 0, không cấp phát ma trận dense; các chunk được nối theo thứ tự
+        rows = SparseRowBuilder(self.vocab_size)
+        for chunk_rows in map_chunks(OneHotEncoder._transform_chunk, self, texts, self.n_jobs):
+            rows.extend(chunk_rows)
+            
+        result = rows.build()
+        return result.toarray() if dense else result
+    
+    def transform_chunks(self, texts: Iterable[str], chunk_size: int = BLOCK_SIZE) -> Iterator[sparse.csr_matrix]:
         """
-        result = np.zeros((len(texts), self.vocab_size))
+        Convert texts to one-hot vectors block by block
         
-        for i, text in enumerate(texts):
-            tokens = word_tokenize(text.lower(), format="text").split()
-            for token in tokens:
-                if token in self.vocabulary:
-                    idx = self.vocabulary[token]
-                    result[i, idx] = 1  # Đánh dấu từ xuất hiện
+        Only one block is held in memory at a time, so a corpus larger than
+        memory can be streamed from a generator
         
-        return result
+        Args:
+            texts: Any iterable of texts
+            chunk_size: Maximum number of rows per block
+            
+        Yields:
+            CSR matrices shape (<= chunk_size, vocab_size), in document order
+        """
+        for chunk_rows in map_chunks(OneHotEncoder._transform_chunk, self, texts, self.n_jobs, chunk_size):
+            yield chunk_rows.build()
     
-    def fit_transform(self, texts: List[str]) -> np.ndarray:
+    def fit_transform(self, texts: List[str], dense: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
         """Fit and transform in one step"""
+        # Iterator chỉ đọc được một lần: không đủ cho fit rồi transform
+        if iter(texts) is texts:
+            raise TypeError("fit_transform reads the documents twice: pass a list or a re-iterable such as "
+                            "DocumentStream, or call fit and transform_chunks on fresh iterators")
         self.fit(texts)
-        return self.transform(texts)
+        return self.transform(texts, dense)
@@ -0,0 +1,112 @@
+import os
+import pickle
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List
+
+
+# Số document mỗi chunk gửi cho một process
+CHUNK_SIZE = 256
+# Số document mỗi block ma trận của transform_chunks
+BLOCK_SIZE = 10000
+
+# Vectorizer của process con, được gán một lần bởi _init_worker
+_worker_owner = None
+
+
+def resolve_n_jobs(n_jobs: int = None) -> int:
+    """
+    Number of processes to use
+    
+    Args:
+        n_jobs: None or 1 for serial, -1 for all CPUs, otherwise the number of processes
+        
+    Returns:
+        Positive number of processes
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+def chunked(texts: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+    """Split texts into lists of at most chunk_size documents"""
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _token_stats(owner):
+    """Hit and miss counts of the owner's tokenizer cache (0 for plain functions)"""
+    tokenizer = getattr(owner, 'tokenizer', None)
+    return getattr(tokenizer, 'hits', 0), getattr(tokenizer, 'misses', 0)
+
+
+def _init_worker(payload: bytes):
+    """Process pool initializer: receive the owner once per process"""
+    global _worker_owner
+    # Unpickle tường minh (kể cả khi fork) để tokenizer mở lại cache trên disk trong process con
+    _worker_owner = pickle.loads(payload)
+
+
+def _run_chunk(func: Callable, chunk: List[str]):
+    """Run func on one chunk in a worker process"""
+    hits, misses = _token_stats(_worker_owner)
+    result = func(_worker_owner, chunk)
+    # Process con không chạy atexit: ghi cache token xuống disk sau mỗi chunk
+    flush = getattr(getattr(_worker_owner, 'tokenizer', None), 'flush', None)
+    if flush:
+        flush()
+    new_hits, new_misses = _token_stats(_worker_owner)
+    return result, new_hits - hits, new_misses - misses
+
+
+def map_chunks(func: Callable, owner, texts: Iterable[str], n_jobs: int = 1,
+               chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """
+    Apply func(owner, chunk) to consecutive chunks of texts
+    
+    With n_jobs > 1 the chunks run in a process pool; each process gets
+    its own copy of owner (e.g. the vectorizer with its vocabulary and
+    tokenizer) once. Results are yielded in chunk order either way, so
+    merging them gives the same result as the serial path
+    
+    Args:
+        func: Module-level function or unbound method taking (owner, chunk)
+        owner: Object passed to func
+        texts: Documents
+        n_jobs: Number of processes (see resolve_n_jobs)
+        chunk_size: Documents per chunk
+        
+    Yields:
+        func results, one per chunk
+    """
+    n_jobs = resolve_n_jobs(n_jobs)
+    if n_jobs == 1:
+        for chunk in chunked(texts, chunk_size):
+            yield func(owner, chunk)
+        return
+        
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    
+    tokenizer = getattr(owner, 'tokenizer', None)
+    with ProcessPoolExecutor(n_jobs, initializer=_init_worker, initargs=(pickle.dumps(owner),)) as pool:
+        # Giới hạn số chunk đang chờ để không đọc hết texts vào bộ nhớ khi texts là generator
+        pending = deque()
+        chunks = chunked(texts, chunk_size)
+        while True:
+            for chunk in islice(chunks, 2 * n_jobs - len(pending)):
+                pending.append(pool.submit(_run_chunk, func, chunk))
+            if not pending:
+                return
+            result, hits, misses = pending.popleft().result()
+            # Cộng số hit/miss của cache token trong process con vào tokenizer của process cha
+            if hasattr(tokenizer, 'hits'):
+                tokenizer.hits += hits
+                tokenizer.misses += misses
+            yield result
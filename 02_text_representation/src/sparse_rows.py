@@ -0,0 +1,69 @@
+import numpy as np
+from array import array
+from typing import Iterable
+from scipy import sparse
+
+
+class SparseRowBuilder:
+    """
+    Builds a CSR matrix row by row
+    
+    Column indices and values are appended to compact typed arrays
+    (4 + 8 bytes per non-zero), so no dense matrix and no Python list
+    of numbers is ever allocated
+    """
+    
+    def __init__(self, n_cols: int):
+        """
+        Args:
+            n_cols: Number of columns of the matrix
+        """
+        self.n_cols = n_cols
+        self.indptr = array('q', [0])  # Vị trí bắt đầu của mỗi dòng trong indices/data
+        self.indices = array('i')
+        self.data = array('d')
+    
+    def add_row(self, indices: Iterable[int], values: Iterable[float] = None):
+        """
+        Append one row
+        
+        Args:
+            indices: Column indices of the non-zero values (unique)
+            values: Values in the same order (default: all 1)
+        """
+        start = len(self.indices)
+        self.indices.extend(indices)
+        if values is None:
+            self.data.extend([1.0] * (len(self.indices) - start))
+        else:
+            self.data.extend(values)
+        self.indptr.append(len(self.indices))
+    
+    def extend(self, other: 'SparseRowBuilder'):
+        """
+        Append all rows of another builder (e.g. one chunk built in a worker process)
+        
+        Args:
+            other: Builder with the same number of columns
+        """
+        offset = len(self.indices)
+        self.indptr.extend(offset + end for end in other.indptr[1:])
+        self.indices.extend(other.indices)
+        self.data.extend(other.data)
+    
+    def build(self) -> sparse.csr_matrix:
+        """
+        Create the matrix from the rows added so far
+        
+        Returns:
+            CSR matrix shape (n_rows, n_cols) with sorted indices
+        """
+        matrix = sparse.csr_matrix(
+            (np.frombuffer(self.data, dtype=np.float64),
+             np.frombuffer(self.indices, dtype=np.int32),
+             np.frombuffer(self.indptr, dtype=np.int64)),
+            shape=(len(self.indptr) - 1, self.n_cols)
+        )
+        # Thứ tự cột trong mỗi dòng theo thứ tự từ trong văn bản, sắp xếp lại một lần ở cuối
+        matrix.sort_indices()
+        return matrix
@@ -1,7 +1,10 @@
 import numpy as np
-from typing import List
+from typing import Callable, Iterable, Iterator, List, Union
 from collections import Counter
-from underthesea import word_tokenize
+from scipy import sparse
+from .tokenizer import CachedTokenizer
+from .sparse_rows import SparseRowBuilder
+from .parallel import map_chunks, BLOCK_SIZE
 
 
 class TFIDF:
@@ -13,45 +16,73 @@ class TFIDF:
     - IDF: log(N / df) - Measures word importance in corpus
     """
     
-    def __init__(self, max_features: int = None, min_df: int = 1):
+    def __init__(self, max_features: int = None, min_df: int = 1, tokenizer: Callable[[str], List[str]] = None,
+                 n_jobs: int = 1):
         """
         Args:
             max_features: Maximum number of features
             min_df: Minimum document frequency
+            tokenizer: Function splitting a text into tokens (default: underthesea word segmentation,
+                with a small in-memory memo; pass CachedTokenizer(cache_dir=...) so that fit and transform
+                tokenize each text once on large corpora or with n_jobs > 1)
+            n_jobs: Number of processes for tokenization and counting (-1 = all CPUs)
         """
+        self.tokenizer = tokenizer or CachedTokenizer()
+        self.n_jobs = n_jobs
         self.max_features = max_features
         self.min_df = min_df
         self.vocabulary = {}  # {word: index}
         self.idf = None  # IDF values
         self.vocab_size = 0
-        
-    def fit(self, texts: List[str]):
+    
+    def _count_chunk(self, texts: List[str]):
+        """Number of documents, word counts and document frequencies of a chunk of texts"""
+        doc_freq = Counter()
+        word_counts = Counter()
+        for text in texts:
+            tokens = self.tokenizer(text)
+            word_counts.update(tokens)
+            # Mỗi document chỉ đếm 1 lần
+            doc_freq.update(set(tokens))
+        return len(texts), word_counts, doc_freq
+    
+    def _transform_chunk(self, texts: List[str]):
+        """Raw count rows and document lengths of a chunk of texts"""
+        rows = SparseRowBuilder(self.vocab_size)
+        total_words = []  # Số từ của mỗi document (kể cả từ ngoài vocabulary)
+        for text in texts:
+            tokens = self.tokenizer(text)
+            token_counts = Counter(token for token in tokens if token in self.vocabulary)
+            rows.add_row((self.vocabulary[token] for token in token_counts), token_counts.values())
+            total_words.append(len(tokens))
+        return rows, total_words
+    
+    def fit(self, texts: Iterable[str]):
         """
         Calculate IDF for each word in vocabulary
         
         Args:
-            texts: List of texts
+            texts: List of texts, or any iterable/generator (read once, chunk by chunk)
         """
-        N = len(texts)  # Tổng số documents
+        N = 0  # Tổng số documents
         
-        # Đếm document frequency
+        # Đếm document frequency: đếm từng chunk (song song nếu n_jobs > 1) rồi cộng dồn
         doc_freq = Counter()
         word_counts = Counter()  # Để lọc theo max_features
         
-        for text in texts:
-            tokens = word_tokenize(text.lower(), format="text").split()
-            word_counts.update(tokens)
-            # Mỗi document chỉ đếm 1 lần
-            doc_freq.update(set(tokens))
-        
+        for chunk_docs, chunk_counts, chunk_freq in map_chunks(TFIDF._count_chunk, self, texts, self.n_jobs):
+            N += chunk_docs
+            word_counts.update(chunk_counts)
+            doc_freq.update(chunk_freq)
+            
         # Lọc từ theo min_df
         valid_words = [word for word, freq in doc_freq.items() if freq >= self.min_df]
         
-        # Lọc theo max_features
+        # Lọc theo max_features (cùng tần suất thì theo thứ tự chữ cái để kết quả không phụ thuộc thứ tự đếm)
         if self.max_features and len(valid_words) > self.max_features:
-            valid_words = sorted(valid_words, key=lambda w: word_counts[w], reverse=True)
+            valid_words = sorted(valid_words, key=lambda w: (-word_counts[w], w))
             valid_words = valid_words[:self.max_features]
-        
+            
         # Tạo vocabulary
         self.vocabulary = {word: idx for idx, word in enumerate(sorted(valid_words))}
         self.vocab_size = len(self.vocabulary)
@@ -62,48 +93,70 @@ class TFIDF:
             df = doc_freq[word]
             # Thêm smoothing: log((N + 1) / (df + 1)) + 1
             self.idf[idx] = np.log((N + 1) / (df + 1)) + 1
-        
+            
         print(f"TF-IDF fitted with vocabulary size: {self.vocab_size}")
-        
-    def transform(self, texts: List[str], normalize: bool = True) -> np.ndarray:
+    
+    def transform(self, texts: Iterable[str], normalize: bool = True, dense: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
         """
         Convert texts to TF-IDF vectors
         
         Args:
-            texts: List of texts
+            texts: List of texts, or any iterable (read once)
             normalize: Whether to normalize with L2 norm
+            dense: Return a dense numpy array instead of a sparse matrix
             
         Returns:
-            Matrix shape (n_texts, vocab_size)
+            CSR matrix shape (n_texts, vocab_size), or np.ndarray if dense
         """
-        result = np.zeros((len(texts), self.vocab_size))
-        
-        for i, text in enumerate(texts):
-            tokens = word_tokenize(text.lower(), format="text").split()
-            token_counts = Counter(tokens)
+        # Chỉ lưu các vị trí khác 0, không cấp phát ma trận dense; các chunk được nối theo thứ tự
+        rows = SparseRowBuilder(self.vocab_size)
+        total_words = []
+        for chunk_rows, chunk_total_words in map_chunks(TFIDF._transform_chunk, self, texts, self.n_jobs):
+            rows.extend(chunk_rows)
+            total_words.extend(chunk_total_words)
             
-            # Tính TF
-            total_words = len(tokens)
-            if total_words == 0:
-                continue
-                
-            for token, count in token_counts.items():
-                if token in self.vocabulary:
-                    idx = self.vocabulary[token]
-                    # TF = count / total_words
-                    tf = count / total_words
-                    # TF-IDF = TF * IDF
-                    result[i, idx] = tf * self.idf[idx]
+        return self._weight(rows.build(), total_words, normalize, dense)
+    
+    def transform_chunks(self, texts: Iterable[str], normalize: bool = True,
+                         chunk_size: int = BLOCK_SIZE) -> Iterator[sparse.csr_matrix]:
+        """
+        Convert texts to TF-IDF vectors block by block
+        
+        Only one block is held in memory at a time, so a corpus larger than
+        memory can be streamed from a generator
+        
+        Args:
+            texts: Any iterable of texts
+            normalize: Whether to normalize with L2 norm
+            chunk_size: Maximum number of rows per block
             
-            # L2 normalization
-            if normalize:
-                norm = np.linalg.norm(result[i])
-                if norm > 0:
-                    result[i] = result[i] / norm
+        Yields:
+            CSR matrices shape (<= chunk_size, vocab_size), in document order
+        """
+        for chunk_rows, total_words in map_chunks(TFIDF._transform_chunk, self, texts, self.n_jobs, chunk_size):
+            yield self._weight(chunk_rows.build(), total_words, normalize)
+    
+    def _weight(self, result: sparse.csr_matrix, total_words: List[int], normalize: bool = True,
+                dense: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
+        """Turn a matrix of raw counts into TF-IDF values"""
+        # TF = count / total_words, TF-IDF = TF * IDF (tính tại chỗ trên các giá trị khác 0)
+        row_lengths = np.diff(result.indptr)
+        result.data /= np.repeat(np.asarray(total_words, dtype=np.float64), row_lengths)
+        result.data *= self.idf[result.indices]
         
-        return result
+        # L2 normalization theo từng dòng
+        if normalize:
+            squares = sparse.csr_matrix((result.data ** 2, result.indices, result.indptr), shape=result.shape)
+            norms = np.sqrt(np.asarray(squares.sum(axis=1)).ravel())
+            result.data /= np.repeat(norms, row_lengths)
+            
+        return result.toarray() if dense else result
     
-    def fit_transform(self, texts: List[str], normalize: bool = True) -> np.ndarray:
+    def fit_transform(self, texts: List[str], normalize: bool = True, dense: bool = False) -> Union[sparse.csr_matrix, np.ndarray]:
         """Fit and transform in one step"""
+        # Iterator chỉ đọc được một lần: không đủ cho fit rồi transform
+        if iter(texts) is texts:
+            raise TypeError("fit_transform reads the documents twice: pass a list or a re-iterable such as "
+                            "DocumentStream, or call fit and transform_chunks on fresh iterators")
         self.fit(texts)
-        return self.transform(texts, normalize)
+        return self.transform(texts, normalize, dense)
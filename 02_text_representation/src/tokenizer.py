@@ -0,0 +1,204 @@
+import os
+import atexit
+import hashlib
+import sqlite3
+from collections import OrderedDict
+from typing import Callable, List
+
+
+# Tăng khi thay đổi cách tokenize để cache cũ tự động không dùng nữa
+TOKENIZER_VERSION = 1
+TOKENIZE_OPTIONS = {'lowercase': True, 'format': 'text'}
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'tokens')
+# Số danh sách token giữ trong memo: vài chunk gần nhất, không phải cả corpus
+DEFAULT_MEMO_ITEMS = 1000
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase and word-segment a Vietnamese text with underthesea
+    
+    underthesea is slow to import, so it is loaded on the first call
+    instead of when the package is imported
+    
+    Args:
+        text: Raw text
+        
+    Returns:
+        List of tokens (syllables of a word are joined by '_')
+    """
+    from underthesea import word_tokenize
+    if TOKENIZE_OPTIONS['lowercase']:
+        text = text.lower()
+    return word_tokenize(text, format=TOKENIZE_OPTIONS['format']).split()
+
+
+def _code_digest(code) -> str:
+    """Hash of a code object's bytecode, constants and names (nested functions included)"""
+    digest = hashlib.blake2b(code.co_code, digest_size=8)
+    for const in code.co_consts:
+        # repr của code object lồng nhau chứa địa chỉ bộ nhớ: băm đệ quy thay vì dùng repr
+        digest.update((_code_digest(const) if hasattr(const, 'co_code') else repr(const)).encode('utf-8'))
+    digest.update(repr(code.co_names).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def tokenizer_fingerprint(tokenizer: Callable[[str], List[str]], version: str = None) -> str:
+    """
+    Identify a tokenizer, its version and its options
+    
+    Custom tokenizers are identified by module, qualified name and a hash
+    of their code (functions, methods and objects with a Python __call__),
+    so editing the function starts a new cache. Changes the hash cannot
+    see, such as in functions it calls, its data files or a builtin like
+    str.split, need a new version (or --no-cache)
+    
+    Args:
+        tokenizer: Tokenizer function
+        version: User-supplied version of the tokenizer (optional)
+        
+    Returns:
+        Hex digest that changes whenever cached tokens may no longer be valid
+    """
+    from importlib import metadata
+    
+    name = f"{getattr(tokenizer, '__module__', '')}.{getattr(tokenizer, '__qualname__', repr(tokenizer))}"
+    parts = [name]
+    function = getattr(tokenizer, '__func__', tokenizer)  # Bound method: code của hàm bên dưới
+    code = getattr(function, '__code__', None) or getattr(getattr(type(tokenizer), '__call__', None), '__code__', None)
+    if code is not None:
+        parts.append(f"code={_code_digest(code)}")
+    if version is not None:
+        parts.append(f"version={version}")
+    if tokenizer is tokenize:
+        try:
+            underthesea_version = metadata.version('underthesea')
+        except metadata.PackageNotFoundError:
+            underthesea_version = 'unknown'
+        parts += [f"v{TOKENIZER_VERSION}", f"underthesea={underthesea_version}",
+                  ','.join(f"{key}={value}" for key, value in sorted(TOKENIZE_OPTIONS.items()))]
+    return hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+
+class CachedTokenizer:
+    """
+    Tokenizer with an in-memory memo and an optional on-disk cache
+    
+    Token lists are keyed by a hash of the text. The disk cache is a SQLite
+    file named after the tokenizer fingerprint (tokenizer name and code,
+    version and options), so changing any of them starts a new cache
+    instead of returning stale tokens. Pass a new version when a change
+    does not show in the tokenizer's own code (see tokenizer_fingerprint)
+    
+    The memo only keeps the most recent max_items token lists, so memory
+    stays bounded on large corpora and fit_transform re-tokenizes a corpus
+    larger than the memo. To tokenize each text once across fit and
+    transform on any corpus size, and across processes when n_jobs > 1
+    (each process has its own memo), set cache_dir
+    """
+    
+    def __init__(self, tokenizer: Callable[[str], List[str]] = None, cache_dir: str = None,
+                 max_items: int = DEFAULT_MEMO_ITEMS, batch_size: int = 1000, version: str = None):
+        """
+        Args:
+            tokenizer: Function splitting a text into tokens (default: underthesea word segmentation)
+            cache_dir: Directory of the on-disk cache (default: memory only)
+            max_items: Maximum number of token lists kept in memory (least recently used are dropped)
+            batch_size: Number of new entries written to disk in one transaction
+            version: Version of the tokenizer, part of the cache file name (change it to drop old tokens)
+        """
+        self.tokenizer = tokenizer or tokenize
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_items = max_items
+        self.batch_size = batch_size
+        self.memo = OrderedDict()  # {hash: tokens}
+        self.pending = []          # Các entry mới chưa ghi xuống disk: [(hash, tokens)]
+        self.hits = 0
+        self.misses = 0
+        self.conn = None
+        self.path = None
+        
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.path = os.path.join(cache_dir, f"tokens-{tokenizer_fingerprint(self.tokenizer, version)}.sqlite")
+            self.conn = sqlite3.connect(self.path, timeout=30)  # Nhiều process có thể ghi cùng lúc
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS tokens (key BLOB PRIMARY KEY, tokens TEXT NOT NULL)')
+            atexit.register(self.close)
+    
+    def __getstate__(self):
+        # Connection SQLite và memo không chuyển sang process khác; process con mở lại cache trên disk
+        return {'tokenizer': self.tokenizer, 'cache_dir': self.cache_dir,
+                'max_items': self.max_items, 'batch_size': self.batch_size, 'version': self.version}
+    
+    def __setstate__(self, state):
+        self.__init__(**state)
+    
+    @staticmethod
+    def key(text: str) -> bytes:
+        """Content hash of a text"""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    
+    def remember(self, key: bytes, tokens: List[str]):
+        """Keep tokens in memory, dropping the least recently used entry when full"""
+        self.memo[key] = tokens
+        self.memo.move_to_end(key)
+        if len(self.memo) > self.max_items:
+            self.memo.popitem(last=False)
+    
+    def __call__(self, text: str) -> List[str]:
+        """
+        Tokenize a text, reusing cached tokens when the same text was seen before
+        
+        Args:
+            text: Raw text
+            
+        Returns:
+            List of tokens (must not be modified by the caller)
+        """
+        key = self.key(text)
+        tokens = self.memo.get(key)
+        if tokens is not None:
+            self.memo.move_to_end(key)
+            self.hits += 1
+            return tokens
+            
+        if self.conn is not None:
+            row = self.conn.execute('SELECT tokens FROM tokens WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                # Token không chứa khoảng trắng nên lưu dạng chuỗi nối bằng ' '
+                tokens = row[0].split(' ') if row[0] else []
+                self.remember(key, tokens)
+                self.hits += 1
+                return tokens
+                
+        tokens = self.tokenizer(text)
+        self.misses += 1
+        self.remember(key, tokens)
+        if self.conn is not None:
+            self.pending.append((key, ' '.join(tokens)))
+            if len(self.pending) >= self.batch_size:
+                self.flush()
+        return tokens
+    
+    def flush(self):
+        """Write new entries to the on-disk cache"""
+        if self.conn is None or not self.pending:
+            return
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO tokens (key, tokens) VALUES (?, ?)', self.pending)
+        self.pending = []
+    
+    def close(self):
+        """Flush and close the on-disk cache"""
+        if self.conn is None:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
+    
+    def stats(self) -> dict:
+        """Number of cache hits and misses (texts actually tokenized)"""
+        return {'hits': self.hits, 'misses': self.misses}
@@ -1,20 +1,32 @@
 import argparse
-import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-from src import OneHotEncoder, BagOfWords, TFIDF
-from src import load_dataset, get_category_names
 
 
-def train_and_evaluate(representation='bow', classifier='lr'):
+def vectorizer_size_mb(vectorizer):
+    """Size of the fitted vectorizer state (vocabulary, IDF) when pickled, in MB"""
+    import pickle
+    return len(pickle.dumps(vectorizer)) / 2**20
+
+
+def train_and_evaluate(representation='bow', classifier='lr', tokenizer=None, n_jobs=1, n_features=None):
     """
     Train and evaluate text classification
     
     Args:
-        representation: Type of text representation ('onehot', 'bow', 'tfidf')
+        representation: Type of text representation ('onehot', 'bow', 'tfidf', 'hashing')
         classifier: Type of classifier ('lr' for Logistic Regression, 'nb' for MultinomialNB)
+        tokenizer: Tokenizer shared by the vectorizers (default: a new in-memory CachedTokenizer)
+        n_jobs: Number of processes for tokenization and counting (-1 = all CPUs)
+        n_features: Number of hash buckets of the 'hashing' representation (default: 2^18)
     """
+    # Import ở đây để `--help` khởi động nhanh (không phải tải numpy, sklearn, underthesea)
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+    from src import OneHotEncoder, BagOfWords, TFIDF, HashingVectorizer
+    from src import load_dataset, get_category_names, CachedTokenizer
+    
+    tokenizer = tokenizer or CachedTokenizer()
+    
     print("="*80)
     print(f"TEXT CLASSIFICATION - {representation.upper()} + {classifier.upper()}")
     print("="*80)
@@ -28,14 +40,18 @@ def train_and_evaluate(representation='bow', classifier='lr'):
     print(f"Classifier: {classifier.upper()}")
     
     if representation == 'onehot':
-        vectorizer = OneHotEncoder()
+        vectorizer = OneHotEncoder(tokenizer=tokenizer, n_jobs=n_jobs)
     elif representation == 'bow':
-        vectorizer = BagOfWords()
+        vectorizer = BagOfWords(tokenizer=tokenizer, n_jobs=n_jobs)
     elif representation == 'tfidf':
-        vectorizer = TFIDF()
+        vectorizer = TFIDF(tokenizer=tokenizer, n_jobs=n_jobs)
+    elif representation == 'hashing':
+        # TF-IDF trên các cột hash; MultinomialNB cần giá trị không âm nên bỏ dấu khi dùng NB
+        vectorizer = HashingVectorizer(n_features=n_features or 2**18, alternate_sign=classifier != 'nb',
+                                       use_idf=True, tokenizer=tokenizer, n_jobs=n_jobs)
     else:
         raise ValueError(f"Unknown representation: {representation}")
-    
+        
     # Fit trên train data
     print(f"\nFitting {representation.upper()} on training data...")
     X_train_vec = vectorizer.fit_transform(X_train)
@@ -47,6 +63,9 @@ def train_and_evaluate(representation='bow', classifier='lr'):
     print(f"\nTraining set shape: {X_train_vec.shape}")
     print(f"Test set shape: {X_test_vec.shape}")
     print(f"Number of features: {vectorizer.vocab_size}")
+    print(f"Vectorizer size: {vectorizer_size_mb(vectorizer):.2f} MB")
+    token_stats = tokenizer.stats()
+    print(f"Tokenization cache: {token_stats['hits']} hits, {token_stats['misses']} texts tokenized")
     
     # Chọn classifier
     if classifier == 'lr':
@@ -57,7 +76,7 @@ def train_and_evaluate(representation='bow', classifier='lr'):
         clf = MultinomialNB()
     else:
         raise ValueError(f"Unknown classifier: {classifier}")
-    
+        
     # Train classifier
     print(f"\nTraining {clf_name}...")
     clf.fit(X_train_vec, y_train)
@@ -83,8 +102,8 @@ def train_and_evaluate(representation='bow', classifier='lr'):
     print("Classification Report (Test Set)")
     print(f"{'-'*80}")
     print(classification_report(
-        y_test, 
-        y_test_pred, 
+        y_test,
+        y_test_pred,
         target_names=category_names,
         digits=4
     ))
@@ -106,7 +125,7 @@ def train_and_evaluate(representation='bow', classifier='lr'):
         for j in range(len(category_names)):
             print(f"{cm[i, j]:>12}", end='')
         print()
-    
+        
     print("\n" + "="*80 + "\n")
     
     return {
@@ -117,39 +136,47 @@ def train_and_evaluate(representation='bow', classifier='lr'):
     }
 
 
-def compare_all_methods(classifier='lr'):
+def compare_all_methods(classifier='lr', tokenizer=None, n_jobs=1, n_features=None):
     """
     Compare all representation methods
     
     Args:
         classifier: Type of classifier ('lr' or 'nb')
+        tokenizer: Tokenizer shared by the vectorizers (default: a new in-memory CachedTokenizer)
+        n_jobs: Number of processes for tokenization and counting (-1 = all CPUs)
+        n_features: Number of hash buckets of the 'hashing' representation (default: 2^18)
     """
+    from src import CachedTokenizer
+    
+    # Dùng chung một tokenizer: qua cache trên disk, mỗi văn bản chỉ được tách từ một lần cho cả 4 phương pháp
+    tokenizer = tokenizer or CachedTokenizer()
     clf_name = 'Logistic Regression' if classifier == 'lr' else 'Multinomial Naive Bayes'
     print("\n" + "="*80)
     print(f"COMPARING ALL REPRESENTATION METHODS - {clf_name.upper()}")
     print("="*80 + "\n")
     
-    methods = ['onehot', 'bow', 'tfidf']
+    methods = ['onehot', 'bow', 'tfidf', 'hashing']
     results = {}
     
     for method in methods:
-        result = train_and_evaluate(method, classifier)
+        result = train_and_evaluate(method, classifier, tokenizer, n_jobs, n_features)
         results[method] = result
         print("\n")
-    
+        
     # Summary
     print("="*80)
     print("SUMMARY COMPARISON")
     print("="*80)
-    print(f"\n{'Method':<15} {'Train Acc':<15} {'Test Acc':<15} {'Features':<15}")
-    print("-"*60)
+    print(f"\n{'Method':<15} {'Train Acc':<15} {'Test Acc':<15} {'Features':<15} {'Size (MB)':<10}")
+    print("-"*72)
     
     for method in methods:
         train_acc = results[method]['train_accuracy']
         test_acc = results[method]['test_accuracy']
-        n_features = results[method]['vectorizer'].vocab_size
-        print(f"{method.upper():<15} {train_acc:.4f} ({train_acc*100:.2f}%)  {test_acc:.4f} ({test_acc*100:.2f}%)  {n_features:<15}")
-    
+        vectorizer = results[method]['vectorizer']
+        print(f"{method.upper():<15} {train_acc:.4f} ({train_acc*100:.2f}%)  {test_acc:.4f} ({test_acc*100:.2f}%)  "
+              f"{vectorizer.vocab_size:<15} {vectorizer_size_mb(vectorizer):<10.2f}")
+              
     print("="*80 + "\n")
 
 
@@ -164,6 +191,9 @@ Examples:
   python text_classification.py -r bow -clf nb              # BoW + Naive Bayes
   python text_classification.py --compare -clf lr           # Compare all (LR)
   python text_classification.py --compare -clf nb           # Compare all (NB)
+  python text_classification.py -r tfidf --no-cache         # Tokenize again, ignore the cache
+  python text_classification.py -r tfidf -j -1              # Tokenize on all CPUs
+  python text_classification.py -r hashing -clf lr          # Feature hashing + Logistic Regression
         """
     )
     
@@ -171,7 +201,7 @@ Examples:
     group.add_argument(
         '--representation', '-r',
         type=str,
-        choices=['onehot', 'bow', 'tfidf'],
+        choices=['onehot', 'bow', 'tfidf', 'hashing'],
         help='Text representation method'
     )
     group.add_argument(
@@ -188,12 +218,46 @@ Examples:
         help='Classifier: lr (Logistic Regression) or nb (Multinomial Naive Bayes)'
     )
     
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Number of processes for tokenization and counting (-1 = all CPUs)'
+    )
+    parser.add_argument(
+        '--n-features',
+        type=int,
+        default=None,
+        help='Number of hash buckets for -r hashing (default: 2^18)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=None,
+        help='Directory of the on-disk tokenization cache (default: .cache/tokens)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not read or write the on-disk tokenization cache (texts beyond the small '
+             'in-memory memo are tokenized again by every pass); needed after changes to the tokenizer '
+             'outside its own code, e.g. in underthesea dictionaries'
+    )
+    
     args = parser.parse_args()
     
-    if args.compare:
-        compare_all_methods(args.classifier)
-    else:
-        train_and_evaluate(args.representation, args.classifier)
+    # Cache token trên disk: chạy lại trên dataset không đổi thì không phải tách từ nữa
+    from src import CachedTokenizer
+    from src.tokenizer import DEFAULT_CACHE_DIR
+    tokenizer = CachedTokenizer(cache_dir=None if args.no_cache else (args.cache_dir or DEFAULT_CACHE_DIR))
+    
+    try:
+        if args.compare:
+            compare_all_methods(args.classifier, tokenizer, args.jobs, args.n_features)
+        else:
+            train_and_evaluate(args.representation, args.classifier, tokenizer, args.jobs, args.n_features)
+    finally:
+        tokenizer.close()
 
 
 if __name__ == "__main__":